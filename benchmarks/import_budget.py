@@ -0,0 +1,59 @@
+"""Import time of the entry modules against a budget.
+
+Runs ``python -X importtime -c "import <module>"`` in fresh interpreters and
+keeps the best cumulative time of each module over a few runs, so one slow
+run does not fail it. The optional backends (NumPy, CuPy, the compiled
+readers), asyncio and the process pool are imported on first use, which is
+what keeps these figures low; a module that starts importing them at load
+time shows up here. Exits with status 1 when a module is over its budget.
+
+    python -m benchmarks.import_budget [--runs 5] [--scale 1.0]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Milliseconds of cumulative import time, measured at about 130 and 45 on a single-core runner.
+BUDGETS_MS = {
+    "business_logic.messages_extractor": 175,
+    "business_logic.worker": 80,
+}
+# Loaded lazily, so none of them may appear in the import of the modules above.
+LAZY_MODULES = ["numpy", "cupy", "asyncio", "multiprocessing.pool", "concurrent.futures.thread", "flet"]
+
+
+def import_time(module: str) -> tuple[float, set[str]]:
+    """Cumulative import time of ``module`` in milliseconds and every module it loaded."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    loaded = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        loaded[name.strip()] = int(cumulative) / 1000
+    return loaded[module], set(loaded)
+
+
+def run(runs: int, scale: float) -> bool:
+    ok = True
+    print(f"{'module':<40}{'ms':>8}{'budget':>8}  eager optional imports")
+    for module, budget in BUDGETS_MS.items():
+        measured = [import_time(module) for _ in range(runs)]
+        best = min(ms for ms, _ in measured)
+        eager = sorted(set(LAZY_MODULES) & measured[0][1])
+        ok &= best <= budget * scale and not eager
+        print(f"{module:<40}{best:>8.1f}{budget * scale:>8.0f}  {', '.join(eager) or '-'}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module, the best one counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the budgets, for slow machines")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.runs, args.scale) else 1)
@@ -0,0 +1,72 @@
+"""Resync cost on corrupted logs.
+
+Decodes synthetic logs damaged in several ways at growing sizes and prints
+the time per megabyte. A linear resync keeps that figure flat as the size
+doubles; the previous copy-the-rest-of-the-buffer search grew with it.
+
+    python -m benchmarks.resync_fuzz [--sizes 1 2 4 8] [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.old_reader import Reader
+from tests.synthetic_log import build_log
+
+SECONDS_PER_MB = 22  # synthetic log rate, about 45 kB/s
+
+
+def headers_only(data: bytes, rng: random.Random) -> bytes:
+    """Valid FMT block followed by dense fake headers of known types."""
+    fmt_end = data.find(b"\xA3\x95\x81")
+    fakes = bytes([0xA3, 0x95, 0x83, 0x00]) * ((len(data) - fmt_end) // 4)
+    return data[:fmt_end] + fakes
+
+
+def random_bursts(data: bytes, rng: random.Random) -> bytes:
+    """One random burst of 1-64 bytes every kilobyte on average."""
+    damaged = bytearray(data)
+    for _ in range(len(data) // 1024):
+        pos = rng.randrange(len(damaged) - 64)
+        size = rng.randint(1, 64)
+        damaged[pos:pos + size] = rng.randbytes(size)
+    return bytes(damaged)
+
+
+def zeroed_tail(data: bytes, rng: random.Random) -> bytes:
+    """Second half of the file lost, with an unknown header every 100 bytes."""
+    half = len(data) // 2
+    tail = bytearray(len(data) - half)
+    for pos in range(0, len(tail) - 3, 100):
+        tail[pos:pos + 3] = b"\xA3\x95\xFE"
+    return data[:half] + bytes(tail)
+
+
+CORRUPTIONS = {"headers_only": headers_only, "random_bursts": random_bursts, "zeroed_tail": zeroed_tail}
+
+
+def run(sizes: list[float], seed: int) -> None:
+    print(f"{'corruption':<16}{'MB':>6}{'messages':>10}{'skipped MB':>12}{'s/MB':>8}")
+    for name, corrupt in CORRUPTIONS.items():
+        for size in sizes:
+            rng = random.Random(seed)
+            data = corrupt(build_log(size * SECONDS_PER_MB, seed), rng)
+            reader = Reader()
+            start = time.perf_counter()
+            count = sum(1 for _ in reader.read_messages(data, False))
+            elapsed = time.perf_counter() - start
+            skipped = sum(end - begin for begin, end in reader.skipped)
+            megabytes = len(data) / 1e6
+            print(f"{name:<16}{megabytes:>6.1f}{count:>10}{skipped / 1e6:>12.2f}{elapsed / megabytes:>8.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 2, 4, 8], help="Log sizes in MB")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.sizes, args.seed)
@@ -0,0 +1,7 @@
+import sys
+
+from business_logic.cli import main
+
+# Guarded: the process pool workers import __main__ again under spawn.
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""Map-reduce statistics over one or many logs.
+
+A spec maps ``"TYPE.Field"`` to the reducers to run on that field,
+``"TYPE"`` or ``"*"`` to ``["count"]`` for message counts, e.g.
+``{"GPS.Alt": ["min", "max", "mean"], "*": ["count"]}``. Reducers are the
+built-in names or :class:`Reducer` objects.
+
+Files are cut into chunks at message boundaries and every chunk is reduced
+in a worker: headers are walked, only the requested fields of the requested
+types are unpacked, and the worker sends back the reducer states alone. The
+parent merges the states in file and chunk order, so ``first``/``last`` and
+user reducers see a deterministic order.
+"""
+
+import mmap
+import os
+import sys
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Iterable
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.header_walk import HeaderWalker, read_fmt_table
+from business_logic.old_reader import Reader
+from business_logic.parallel_plan import CHUNKS_PER_WORKER, MIN_CHUNK_SIZE, SERIAL_BELOW, available_cpus, pool_context
+from business_logic.schema_cache import decoder_for
+from business_logic.chunk_splitter import ChunkSplitter
+
+ALL_TYPES = "*"
+
+
+class Reducer(ABC):
+    """A mergeable statistic.
+
+    States must be picklable, ``add`` receives the values of one chunk in
+    file order and ``merge`` combines the state of a chunk with the state of
+    the chunk that follows it.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def start(self) -> Any:
+        ...
+
+    @abstractmethod
+    def add(self, state: Any, values: list) -> Any:
+        ...
+
+    @abstractmethod
+    def merge(self, state: Any, other: Any) -> Any:
+        ...
+
+    def result(self, state: Any) -> Any:
+        return state
+
+
+class Count(Reducer):
+    name = "count"
+
+    def start(self) -> int:
+        return 0
+
+    def add(self, state: int, values: list) -> int:
+        return state + len(values)
+
+    def merge(self, state: int, other: int) -> int:
+        return state + other
+
+
+class Sum(Reducer):
+    name = "sum"
+
+    def start(self) -> float:
+        return 0
+
+    def add(self, state, values: list):
+        return state + sum(values)
+
+    def merge(self, state, other):
+        return state + other
+
+
+class Min(Reducer):
+    name = "min"
+
+    def start(self) -> None:
+        return None
+
+    def add(self, state, values: list):
+        return self.merge(state, min(values) if values else None)
+
+    def merge(self, state, other):
+        if state is None or other is None:
+            return other if state is None else state
+        return min(state, other)
+
+
+class Max(Min):
+    name = "max"
+
+    def add(self, state, values: list):
+        return self.merge(state, max(values) if values else None)
+
+    def merge(self, state, other):
+        if state is None or other is None:
+            return other if state is None else state
+        return max(state, other)
+
+
+class Mean(Reducer):
+    name = "mean"
+
+    def start(self) -> tuple:
+        return 0, 0
+
+    def add(self, state: tuple, values: list) -> tuple:
+        return state[0] + sum(values), state[1] + len(values)
+
+    def merge(self, state: tuple, other: tuple) -> tuple:
+        return state[0] + other[0], state[1] + other[1]
+
+    def result(self, state: tuple) -> float | None:
+        return state[0] / state[1] if state[1] else None
+
+
+class First(Reducer):
+    name = "first"
+
+    def start(self) -> tuple:
+        return ()
+
+    def add(self, state: tuple, values: list) -> tuple:
+        return self.merge(state, (values[0],) if values else ())
+
+    def merge(self, state: tuple, other: tuple) -> tuple:
+        return state or other
+
+    def result(self, state: tuple):
+        return state[0] if state else None
+
+
+class Last(First):
+    name = "last"
+
+    def add(self, state: tuple, values: list) -> tuple:
+        return self.merge(state, (values[-1],) if values else ())
+
+    def merge(self, state: tuple, other: tuple) -> tuple:
+        return other or state
+
+
+REDUCERS = {reducer.name: reducer for reducer in (Count(), Sum(), Min(), Max(), Mean(), First(), Last())}
+
+
+def parse_spec(spec: dict[str, Iterable[str | Reducer]]) -> dict[tuple[str, str | None], list[Reducer]]:
+    """``{(type, field or None): [Reducer, ...]}``; ``type`` may be ``"*"`` for counts."""
+    plan = {}
+    for key, reducers in spec.items():
+        name, _, field = key.partition(".")
+        resolved = []
+        for reducer in reducers:
+            if isinstance(reducer, str):
+                if reducer not in REDUCERS:
+                    raise ValueError(f"Unknown reducer {reducer!r} for {key}, expected one of {sorted(REDUCERS)}")
+                reducer = REDUCERS[reducer]
+            resolved.append(reducer)
+        if (not field or name == ALL_TYPES) and any(reducer.name != "count" for reducer in resolved):
+            raise ValueError(f"{key} aggregates whole messages, only 'count' applies")
+        if name == ALL_TYPES and field:
+            raise ValueError(f"{key}: fields need a message type")
+        plan[(name, field or None)] = resolved
+    return plan
+
+
+def _type_name(fmt_messages: dict, type_msg: int) -> str:
+    return "FMT" if type_msg == HeaderWalker.FMT_TYPE else fmt_messages[type_msg]["Name"]
+
+
+def reduce_chunk(path: str, start: int, end: int, fmt_messages: dict, spec: dict, to_round: bool) -> dict:
+    """Reducer states of ``path[start:end]``, keyed like :func:`parse_spec` plus the type for ``"*"``."""
+    plan = parse_spec(spec)
+    fields = defaultdict(list)
+    for name, field in plan:
+        if field is not None:
+            fields[name].append(field)
+
+    walker = HeaderWalker(fmt_messages)
+    names = {type_msg: config["Name"] for type_msg, config in fmt_messages.items()}
+    wanted = {type_msg for type_msg, name in names.items() if name in fields}
+    counts = defaultdict(int)
+    positions = defaultdict(list)
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for pos, type_msg in walker.walk(data, start, end):
+            counts[type_msg] += 1
+            if type_msg in wanted:
+                positions[type_msg].append(pos)
+
+        values = defaultdict(list)
+        reader = Reader()
+        for type_msg, offsets in positions.items():
+            msg_config = fmt_messages[type_msg]
+            name = msg_config["Name"]
+            config, unpacker = reader.compile_projection(msg_config, fields[name])
+            decode = decoder_for(config, to_round)
+            rows = [decode(unpacker.unpack_from(data, pos + 3)) for pos in offsets]
+            for field in fields[name]:
+                values[(name, field)].extend(row[field] for row in rows)
+
+    type_counts = {_type_name(walker.fmt_messages, type_msg): count for type_msg, count in counts.items()}
+    states = {}
+    for (name, field), reducers in plan.items():
+        if name == ALL_TYPES:
+            for type_name, count in type_counts.items():
+                states[(name, type_name)] = [count for _ in reducers]
+        elif field is None:
+            states[(name, None)] = [type_counts.get(name, 0) for _ in reducers]
+        else:
+            column = values.get((name, field), [])
+            states[(name, field)] = [reducer.add(reducer.start(), column) for reducer in reducers]
+    return states
+
+
+def merge_states(plan: dict, states: dict, other: dict) -> dict:
+    for key, chunk_states in other.items():
+        reducers = plan[(ALL_TYPES, None)] if key[0] == ALL_TYPES else plan[key]
+        if key not in states:
+            states[key] = chunk_states
+        else:
+            states[key] = [reducer.merge(state, chunk_state)
+                           for reducer, state, chunk_state in zip(reducers, states[key], chunk_states)]
+    return states
+
+
+def results(plan: dict, states: dict) -> dict:
+    """``{"TYPE.Field": {reducer: value}, "TYPE": {"count": n}, "*": {"count": {type: n}}}``."""
+    output = {}
+    for (name, field), reducers in plan.items():
+        key = name if field is None else f"{name}.{field}"
+        if name == ALL_TYPES:
+            per_type = {type_name: chunk_states for (star, type_name), chunk_states in states.items()
+                        if star == ALL_TYPES}
+            output[key] = {reducer.name: {type_name: reducer.result(chunk_states[i])
+                                          for type_name, chunk_states in sorted(per_type.items())}
+                           for i, reducer in enumerate(reducers)}
+        else:
+            chunk_states = states.get((name, field)) or [reducer.start() for reducer in reducers]
+            output[key] = {reducer.name: reducer.result(state) for reducer, state in zip(reducers, chunk_states)}
+    return output
+
+
+def plan_chunks(paths: list[str], num_workers: int) -> list[tuple[str, int, int, dict]]:
+    """``(path, start, end, fmt_messages)`` work units in file order."""
+    units = []
+    for path in paths:
+        size = os.path.getsize(path)
+        if not size:
+            continue
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            fmt_messages = {type_msg: dict(config) for type_msg, config in read_fmt_table(data).items()}
+        num_chunks = max(1, min(num_workers * CHUNKS_PER_WORKER, size // MIN_CHUNK_SIZE))
+        bounds = ChunkSplitter.boundaries(path, num_chunks, fmt_messages) if num_chunks > 1 else [0, size]
+        units.extend((path, start, end, fmt_messages) for start, end in zip(bounds[:-1], bounds[1:]))
+    return units
+
+
+def aggregate(paths: str | list[str], spec: dict[str, Iterable[str | Reducer]], to_round: bool = False,
+              num_workers: int | None = None) -> dict:
+    """Run ``spec`` over all messages of ``paths`` with one parallel scan.
+
+    Small inputs are reduced in this process; otherwise every chunk is
+    reduced on a process pool of ``num_workers`` (all available CPUs by
+    default) and only reducer states cross process boundaries.
+    """
+    paths = [paths] if isinstance(paths, (str, os.PathLike)) else list(paths)
+    plan = parse_spec(spec)
+    num_workers = num_workers or available_cpus()
+    units = plan_chunks(paths, num_workers)
+    jobs = [(path, start, end, fmt_messages, spec, to_round) for path, start, end, fmt_messages in units]
+
+    total = sum(end - start for _, start, end, _ in units)
+    if num_workers <= 1 or len(jobs) <= 1 or total < SERIAL_BELOW:
+        partials = [reduce_chunk(*job) for job in jobs]
+    else:
+        with pool_context().Pool(min(num_workers, len(jobs))) as pool:
+            partials = pool.starmap(reduce_chunk, jobs, chunksize=1)
+
+    states = {}
+    for partial in partials:
+        merge_states(plan, states, partial)
+    return results(plan, states)
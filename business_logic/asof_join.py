@@ -0,0 +1,131 @@
+"""Time alignment of several message types on the columnar tables.
+
+Every row of a base type (e.g. ``GPS``) gets the columns of the other types
+(``ATT``, ``BARO``, ...) at the base row's ``TimeUS``, matched on NumPy
+arrays with ``searchsorted``; no per-message dict is built. Joined columns
+are named ``<TYPE>.<column>``.
+
+Methods:
+
+* ``backward``: the last sample at or before the base time (an as-of join);
+* ``nearest``: the closest sample on either side, the earlier one on ties;
+* ``linear``: numeric columns interpolated between the samples around the
+  base time, other columns as ``backward``. Angles are interpolated as plain
+  numbers, without wrapping.
+
+Rows without a match, or whose match is further than ``tolerance_us``, get
+NaN in numeric columns (which are therefore float64) and None in text
+columns.
+"""
+
+import numpy as np
+
+METHODS = ("backward", "nearest", "linear")
+INSTANCE_COL = "I"
+
+
+def _select_instance(name: str, table: dict[str, np.ndarray], instance: int | None) -> dict[str, np.ndarray]:
+    if not table:
+        return table
+    if INSTANCE_COL not in table:
+        if instance:
+            raise ValueError(f"{name} has no {INSTANCE_COL} column, only instance 0")
+        return table
+    keep = table[INSTANCE_COL] == (instance or 0)
+    return {col: values[keep] for col, values in table.items()}
+
+
+def _missing(values: np.ndarray, rows: int) -> np.ndarray:
+    """Column of ``rows`` unmatched values for ``values``: NaN for numbers, None for text, zeros otherwise."""
+    if values.dtype.kind in "iufb":
+        return np.full((rows,) + values.shape[1:], np.nan)
+    if values.dtype.kind == "O":
+        return np.full((rows,) + values.shape[1:], None, dtype=object)
+    return np.zeros((rows,) + values.shape[1:], dtype=values.dtype)
+
+
+def _take(values: np.ndarray, index: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    out = _missing(values, len(index))
+    out[valid] = values[index[valid]]
+    return out
+
+
+def match_rows(times: np.ndarray, sample_times: np.ndarray, method: str = "backward",
+               tolerance_us: int | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Indices into sorted ``sample_times`` for every time of ``times``.
+
+    Returns ``(before, after, matched, weight)``. ``before`` is the matched
+    sample for ``backward``/``nearest``; ``linear`` mixes ``before`` and
+    ``after`` by ``weight`` (the share of ``after``). ``matched`` flags the
+    rows that have a result.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown join method {method!r}, expected one of {METHODS}")
+    times = times.astype(np.int64)
+    sample_times = sample_times.astype(np.int64)
+    count = len(sample_times)
+    after = np.searchsorted(sample_times, times, side="right")
+    before = after - 1
+    has_before = before >= 0
+    has_after = after < count
+    before_time = sample_times[np.maximum(before, 0)] if count else np.zeros_like(times)
+    after_time = sample_times[np.minimum(after, count - 1)] if count else np.zeros_like(times)
+    weight = np.zeros(len(times))
+
+    if method == "backward":
+        matched = has_before
+        distance = times - before_time
+    elif method == "nearest":
+        use_after = has_after & (~has_before | (after_time - times < times - before_time))
+        before = np.where(use_after, after, before)
+        matched = has_before | has_after
+        distance = np.where(use_after, after_time - times, times - before_time)
+    else:
+        exact = has_before & (before_time == times)
+        matched = exact | (has_before & has_after)
+        span = np.where(matched & ~exact, after_time - before_time, 1)
+        weight = np.where(exact | ~matched, 0.0, (times - before_time) / span)
+        distance = np.where(exact, 0, np.maximum(times - before_time, after_time - times))
+    if tolerance_us is not None:
+        matched &= distance <= tolerance_us
+    return before, after, matched, weight
+
+
+def join_asof(tables: dict[str, dict[str, np.ndarray]], base: str, others: list[str] | dict[str, list[str]],
+              method: str = "backward", tolerance_us: int | None = None,
+              instances: dict[str, int] | None = None, time_col: str = "TimeUS") -> dict[str, np.ndarray]:
+    """One table with the rows of ``base`` and the aligned columns of ``others``.
+
+    :param tables: ``{name: {column: ndarray}}``, as from ``MessagesExtractor.from_bin_columns``.
+    :param others: Type names, or per name the columns to join (all columns by default).
+    :param instances: Per type name, the ``I`` value to use; instance 0 by default.
+    :return: The base columns followed by ``<TYPE>.<column>`` columns, in base row order.
+    """
+    instances = instances or {}
+    if isinstance(others, (list, tuple)):
+        others = {name: None for name in others}
+    if base not in tables:
+        raise ValueError(f"No {base} messages to join on")
+    left = _select_instance(base, tables[base], instances.get(base))
+    result = dict(left)
+    times = left[time_col]
+
+    for name, wanted in others.items():
+        table = _select_instance(name, tables.get(name, {}), instances.get(name))
+        if not table:
+            table = {col: np.empty(0) for col in [time_col, *(wanted or [])]}
+        order = np.argsort(table[time_col], kind="stable")
+        before, after, matched, weight = match_rows(times, table[time_col][order], method, tolerance_us)
+        for col in wanted or table:
+            if col not in table:
+                raise ValueError(f"{name} has no column {col!r}")
+            values = table[col][order]
+            if method == "linear" and values.dtype.kind in "iuf" and values.ndim == 1 and col != time_col:
+                column = np.full(len(times), np.nan)
+                low = values[before[matched]].astype(np.float64)
+                high = values[np.minimum(after[matched], len(values) - 1)].astype(np.float64)
+                column[matched] = low + (high - low) * weight[matched]
+            else:
+                column = _take(values, before, matched)
+            result[f"{name}.{col}"] = column
+    return result
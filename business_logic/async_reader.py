@@ -0,0 +1,123 @@
+"""Asyncio front end for decoding logs without blocking the event loop.
+
+The file is read in large blocks on the loop's default executor while the
+previous block is decoded on a decode executor (threads by default, or a
+process pool), so compressed logs are decompressed while the previous block
+is decoded. Messages cut by a block end are carried over to the next block.
+Decoded batches go through a bounded queue, so a slow consumer holds back
+reading instead of growing memory.
+"""
+
+import asyncio
+import os
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, AsyncGenerator, Callable
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.compressed import open_log
+from business_logic.old_reader import Reader
+from business_logic.predicates import Filter
+from business_logic.stream_reader import DEFAULT_BLOCK_SIZE
+from utils.enums import MessageType
+
+DEFAULT_MAX_PENDING = 4
+
+
+def decode_block(data: bytes, fmt_messages: dict, to_round: bool = False, wanted_type: str = "",
+                 columns: dict | None = None, filters: dict | None = None) -> tuple[list[dict], int, dict]:
+    """Decode the complete messages of ``data``.
+
+    Returns the messages, how many bytes were consumed and the FMT table,
+    which now includes the formats met in this block.
+    """
+    reader = Reader()
+    messages = list(reader.read_messages(data, to_round, MessageType.ALL_MESSAGES, fmt_messages,
+                                         wanted_type, columns, filters))
+    return messages, reader.stopped_at, reader.fmt_messages
+
+
+def decode_block_columns(data: bytes, fmt_messages: dict, to_round: bool = False, wanted_types: list[str] | None = None,
+                         columns: dict | None = None, filters: dict | None = None) -> tuple[dict, int, dict]:
+    """Columnar counterpart of :func:`decode_block` (requires numpy)."""
+    from business_logic.columnar_reader import ColumnarReader
+
+    reader = ColumnarReader(fmt_messages)
+    tables = reader.read_columns(data, to_round, wanted_types, columns, filters)
+    return tables, reader.stopped_at, reader.fmt_messages
+
+
+class AsyncReader:
+    """Streams decoded batches of a log to an asyncio consumer."""
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE, max_pending: int = DEFAULT_MAX_PENDING,
+                 executor: Executor | None = None) -> None:
+        """
+        :param block_size: Bytes read per block.
+        :param max_pending: Decoded batches buffered ahead of the consumer.
+        :param executor: Where blocks are decoded; a private one-thread pool when None.
+                         Pass a ProcessPoolExecutor to keep the GIL free for the loop.
+        """
+        self.block_size = block_size
+        self.max_pending = max_pending
+        self.executor = executor
+
+    async def batches(self, path: str, decode: Callable[..., tuple[Any, int, dict]] = decode_block,
+                      *args: Any) -> AsyncGenerator[Any, None]:
+        """Yield ``decode(block, fmt_messages, *args)[0]`` for consecutive blocks of ``path``."""
+        queue: asyncio.Queue = asyncio.Queue(self.max_pending)
+        done = object()
+        producer = asyncio.create_task(self._produce(path, decode, args, queue, done))
+        try:
+            while True:
+                batch = await queue.get()
+                if batch is done:
+                    break
+                yield batch
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+    async def _produce(self, path: str, decode: Callable, args: tuple, queue: asyncio.Queue, done: object) -> None:
+        loop = asyncio.get_running_loop()
+        executor = self.executor or ThreadPoolExecutor(max_workers=1)
+        fmt_messages: dict = {}
+        carry = b""
+        try:
+            with open_log(path) as file:
+                block = await loop.run_in_executor(None, file.read, self.block_size)
+                while block:
+                    data = carry + block
+                    decoding = loop.run_in_executor(executor, decode, data, fmt_messages, *args)
+                    reading = loop.run_in_executor(None, file.read, self.block_size)
+                    batch, consumed, fmt_messages = await decoding
+                    carry = data[consumed:]
+                    await queue.put(batch)
+                    block = await reading
+            await queue.put(done)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await queue.put(done)  # wake the consumer, it re-raises through the task
+            raise
+        finally:
+            if executor is not self.executor:
+                executor.shutdown(wait=False)
+
+    async def messages(self, path: str, to_round: bool = False, wanted_type: str = "",
+                       columns: dict[str, list[str]] | None = None,
+                       filters: dict[str, Filter] | None = None) -> AsyncGenerator[dict, None]:
+        """Yield messages one by one, decoded a block at a time."""
+        async for batch in self.batches(path, decode_block, to_round, wanted_type, columns, filters):
+            for message in batch:
+                yield message
+
+    async def column_batches(self, path: str, to_round: bool = False, wanted_types: list[str] | None = None,
+                             columns: dict[str, list[str]] | None = None,
+                             filters: dict[str, Filter] | None = None) -> AsyncGenerator[dict, None]:
+        """Yield ``{name: {column: ndarray}}`` tables, one per block."""
+        async for tables in self.batches(path, decode_block_columns, to_round, wanted_types, columns, filters):
+            if tables:
+                yield tables
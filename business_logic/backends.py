@@ -0,0 +1,171 @@
+"""Registry of the readers behind ``MessagesExtractor.from_bin``.
+
+Every backend decodes a file into the same message dicts (``mavpackettype``
+key, FMT messages included, 7-digit rounding) and declares what it supports,
+so ``RunMode.AUTO`` can pick one from the file size, the request and what is
+installed. ``reader_cy``, ``reader.py`` and the kuperman parser are not
+registered: they do not produce this output (see tests/test_golden.py).
+"""
+
+import importlib.util
+import os
+import pickle
+import sys
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.compressed import open_log
+from business_logic.parallel_plan import available_cpus
+from business_logic.predicates import Filter
+from business_logic.stream_reader import DEFAULT_BLOCK_SIZE, StreamReader
+from utils.enums import RunMode
+
+# The pool readers are imported on first use, as top-level modules like the rest of the tree does.
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "business_logic"))
+
+# Below this size a process pool costs more than it saves.
+PARALLEL_MIN_SIZE = 32 * 1024 * 1024
+
+Decode = Callable[..., Iterable[dict]]
+
+
+@dataclass(frozen=True)
+class Backend:
+    """A reader and its capabilities.
+
+    ``decode(path, to_round, wanted_type, columns, filters, num_workers, block_size)``
+    returns the messages of the file in file order; streaming backends hold
+    about ``block_size`` bytes of the file at a time. Columnar backends also
+    have ``read_columns(path, to_round, wanted_types, columns, filters, instances, by_instance,
+    lazy_strings)``. Experimental backends are only used when asked for by
+    name, ``RunMode.AUTO`` never selects them.
+    """
+
+    name: str
+    decode: Decode
+    streaming: bool = False
+    parallel: bool = False
+    filtered: bool = False
+    available: Callable[[], bool] = lambda: True
+    experimental: bool = False
+    # Filters are sent to other processes, so they have to pickle.
+    pickles_filters: bool = False
+    read_columns: Callable[..., dict] | None = None
+
+    @property
+    def columnar(self) -> bool:
+        return self.read_columns is not None
+
+    def supports(self, columns: dict | None = None, filters: dict | None = None) -> bool:
+        if self.pickles_filters and not picklable(filters):
+            return False
+        return self.filtered or not (columns or filters)
+
+
+def picklable(filters: dict | None) -> bool:
+    """False when a filter, typically a lambda, cannot be sent to a worker process."""
+    try:
+        pickle.dumps(filters)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+_BACKENDS: dict[str, Backend] = {}
+
+
+def register_backend(backend: Backend) -> Backend:
+    _BACKENDS[backend.name] = backend
+    return backend
+
+
+def get_backend(name: str | RunMode) -> Backend:
+    """Backend by name, or the one a fixed ``RunMode`` stands for."""
+    if isinstance(name, RunMode):
+        name = RUN_MODE_BACKENDS[name]
+    try:
+        return _BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend {name!r}, expected one of {sorted(_BACKENDS)}") from None
+
+
+def available_backends() -> list[Backend]:
+    return [backend for backend in _BACKENDS.values() if backend.available() and not backend.experimental]
+
+
+def select_backend(size: int, wanted_type: str = "", columns: dict[str, list[str]] | None = None,
+                   filters: dict[str, Filter] | None = None, streaming: bool = False) -> Backend:
+    """Fastest available backend for a file of ``size`` bytes.
+
+    Small files are decoded serially. Decoding a single type builds few
+    dicts, so the parallel threshold is raised for ``wanted_type``. Larger
+    files go to the process pool, unless a filter cannot be pickled to it.
+    """
+    candidates = {backend.name: backend for backend in available_backends()
+                  if backend.supports(columns, filters) and (backend.streaming or not streaming)}
+    threshold = PARALLEL_MIN_SIZE * (4 if wanted_type else 1)
+    if size >= threshold and available_cpus() > 1:
+        if "multiprocess" in candidates:
+            return candidates["multiprocess"]
+    for backend in candidates.values():
+        if not backend.parallel:
+            return backend
+    raise ValueError("No installed backend supports this request")
+
+
+def _read_file(path: str) -> bytes:
+    with open_log(path) as file:
+        return file.read()
+
+
+def _decode_normal(path, to_round, wanted_type="", columns=None, filters=None, num_workers=None,
+                   block_size=DEFAULT_BLOCK_SIZE):
+    return StreamReader(block_size).messages(path, to_round, wanted_type, columns, filters)
+
+
+def _columns_normal(path, to_round, wanted_types=None, columns=None, filters=None, instances=None,
+                    by_instance=False, lazy_strings=False):
+    from business_logic.columnar_reader import ColumnarReader
+
+    return ColumnarReader().read_columns(_read_file(path), to_round, wanted_types, columns, filters,
+                                         instances, by_instance, lazy_strings)
+
+
+def _decode_threads(path, to_round, wanted_type="", columns=None, filters=None, num_workers=None,
+                    block_size=None):
+    from multi_thread_reader import ThreadReader
+
+    return ThreadReader().process_in_parallel(path, num_workers or available_cpus(), to_round,
+                                              wanted_type=wanted_type, columns=columns, filters=filters)
+
+
+def _decode_multiprocess(path, to_round, wanted_type="", columns=None, filters=None, num_workers=None,
+                         block_size=None):
+    from multi_process_reader import MultiProcessReader
+
+    if not picklable(filters):
+        raise ValueError("The multiprocess backend needs filters that pickle: use an expression string or a "
+                         "module-level function instead of a lambda or closure, or the threads backend")
+    return MultiProcessReader().process_in_parallel(path, num_workers, to_round, wanted_type=wanted_type,
+                                                    columns=columns, filters=filters)
+
+
+def _decode_gpu(path, to_round, wanted_type="", columns=None, filters=None, num_workers=None, block_size=None):
+    from business_logic.reader_gpu import Reader as GpuReader
+
+    return GpuReader().read_messages(_read_file(path), to_round, wanted_type=wanted_type)
+
+
+register_backend(Backend("normal", _decode_normal, streaming=True, filtered=True, read_columns=_columns_normal))
+register_backend(Backend("threads", _decode_threads, parallel=True, filtered=True))
+register_backend(Backend("multiprocess", _decode_multiprocess, parallel=True, filtered=True, pickles_filters=True))
+# Does not match the serial output yet (see tests/test_golden.py).
+register_backend(Backend("gpu", _decode_gpu, parallel=True, experimental=True,
+                         available=lambda: importlib.util.find_spec("cupy") is not None))
+
+RUN_MODE_BACKENDS = {
+    RunMode.NORMAL: "normal",
+    RunMode.THREADS: "threads",
+    RunMode.MULTIPROCESS: "multiprocess",
+}
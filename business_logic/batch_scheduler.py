@@ -0,0 +1,180 @@
+"""Decoding of whole log directories on one process pool.
+
+Every file is cut into work units: small files stay whole, large ones are
+split at message boundaries with ``ChunkSplitter``. All units of all files go
+to a single pool, largest first, so big files start early and small ones fill
+the gaps at the end instead of leaving cores idle. Workers write their own
+output part, the parent only concatenates parts and collects timings.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.header_walk import read_fmt_table
+from business_logic.old_reader import Reader
+from business_logic.parallel_plan import pool_context
+from business_logic.chunk_splitter import ChunkSplitter
+from utils.enums import MessageType
+from utils.logger import AppLogger
+
+DEFAULT_UNIT_SIZE = 32 * 1024 * 1024
+
+
+@dataclass
+class WorkUnit:
+    """A byte range of one file, decoded by one worker."""
+
+    path: str
+    part: int
+    start: int
+    end: int
+    fmt_messages: dict
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+
+@dataclass
+class FileReport:
+    path: str
+    output: str
+    size: int
+    units: int = 0
+    messages: int = 0
+    cpu_seconds: float = 0.0
+
+
+@dataclass
+class BatchReport:
+    """Per-file results and overall throughput of a scheduler run."""
+
+    files: list[FileReport] = field(default_factory=list)
+    wall_seconds: float = 0.0
+    workers: int = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(report.size for report in self.files)
+
+    @property
+    def total_messages(self) -> int:
+        return sum(report.messages for report in self.files)
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.total_bytes / 1e6 / self.wall_seconds if self.wall_seconds else 0.0
+
+    def to_dict(self) -> dict:
+        return {"files": [asdict(report) for report in self.files], "wall_seconds": self.wall_seconds,
+                "workers": self.workers, "total_bytes": self.total_bytes,
+                "total_messages": self.total_messages, "megabytes_per_second": self.megabytes_per_second}
+
+    def __str__(self) -> str:
+        return (f"{len(self.files)} files, {self.total_bytes / 1e6:.1f} MB, {self.total_messages} messages "
+                f"in {self.wall_seconds:.2f}s on {self.workers} workers ({self.megabytes_per_second:.1f} MB/s)")
+
+
+def _json_default(value):
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _part_path(output_dir: str, path: str, part: int) -> str:
+    return os.path.join(output_dir, f"{Path(path).stem}.part{part:05d}.jsonl")
+
+
+def _decode_unit(unit: WorkUnit, output_dir: str, to_round: bool, wanted_type: str) -> tuple[str, int, int, float]:
+    """Decode one unit into its part file; returns (path, part, messages, seconds)."""
+    start_time = time.perf_counter()
+    count = 0
+    with open(unit.path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        data = mapped[unit.start:unit.end]
+    with open(_part_path(output_dir, unit.path, unit.part), "w", encoding="utf-8") as output:
+        for message in Reader().read_messages(data, to_round, MessageType.ALL_MESSAGES,
+                                              dict(unit.fmt_messages), wanted_type):
+            output.write(json.dumps(message, default=_json_default))
+            output.write("\n")
+            count += 1
+    return unit.path, unit.part, count, time.perf_counter() - start_time
+
+
+class DirectoryScheduler:
+    """Decodes every log of a directory into ``<output_dir>/<stem>.jsonl``."""
+
+    def __init__(self, output_dir: str, num_workers: int | None = None,
+                 unit_size: int = DEFAULT_UNIT_SIZE, pattern: str = "*.bin") -> None:
+        """
+        :param output_dir: Where per-file outputs and report.json are written.
+        :param num_workers: Pool size, all CPUs when None.
+        :param unit_size: Files larger than this are split into units of about this size.
+        :param pattern: Glob of the logs to process.
+        """
+        self.logger = AppLogger(self.__class__.__name__)
+        self.output_dir = output_dir
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.unit_size = unit_size
+        self.pattern = pattern
+
+    def plan(self, paths: list[str]) -> list[WorkUnit]:
+        """Work units of all files, largest first."""
+        units = []
+        for path in paths:
+            size = os.path.getsize(path)
+            if not size:
+                continue
+            with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                fmt_messages = read_fmt_table(mapped)
+            fmt_messages = {type_msg: dict(config) for type_msg, config in fmt_messages.items()}
+            num_units = -(-size // self.unit_size)
+            if num_units == 1:
+                bounds = [0, size]
+            else:
+                bounds = sorted(set(ChunkSplitter.boundaries(path, num_units, fmt_messages)))
+            for part, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+                units.append(WorkUnit(path, part, start, end, fmt_messages))
+        units.sort(key=lambda unit: unit.size, reverse=True)
+        return units
+
+    def run(self, directory: str, to_round: bool = False, wanted_type: str = "") -> BatchReport:
+        """Decode all logs under ``directory`` and write ``report.json``."""
+        start_time = time.perf_counter()
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = sorted(str(path) for path in Path(directory).glob(self.pattern) if path.is_file())
+        units = self.plan(paths)
+        reports = {path: FileReport(path, os.path.join(self.output_dir, f"{Path(path).stem}.jsonl"),
+                                    os.path.getsize(path)) for path in paths}
+        self.logger.info(f"Scheduling {len(units)} units from {len(paths)} files on {self.num_workers} workers")
+
+        with pool_context().Pool(self.num_workers) as pool:
+            for path, part, count, seconds in pool.starmap(
+                    _decode_unit, [(unit, self.output_dir, to_round, wanted_type) for unit in units], chunksize=1):
+                report = reports[path]
+                report.units += 1
+                report.messages += count
+                report.cpu_seconds += seconds
+
+        for report in reports.values():
+            self._join_parts(report)
+
+        batch = BatchReport(list(reports.values()), time.perf_counter() - start_time, self.num_workers)
+        with open(os.path.join(self.output_dir, "report.json"), "w", encoding="utf-8") as file:
+            json.dump(batch.to_dict(), file, indent=2)
+        self.logger.info(str(batch))
+        return batch
+
+    def _join_parts(self, report: FileReport) -> None:
+        with open(report.output, "wb") as output:
+            for part in range(report.units):
+                part_path = _part_path(self.output_dir, report.path, part)
+                with open(part_path, "rb") as part_file:
+                    shutil.copyfileobj(part_file, output)
+                os.remove(part_path)
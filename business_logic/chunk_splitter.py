@@ -0,0 +1,172 @@
+"""Module for splitting binary files into chunks."""
+
+import mmap
+import os
+import sys
+from dataclasses import dataclass, field
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.parallel_plan import pool_context
+from business_logic.resync import message_lengths
+
+FMT_MSG_LENGTH = 89
+# Consecutive messages that must parse from a boundary before it is trusted.
+CHAIN_LENGTH = 4
+FIRST_WINDOW = 4096
+# Splits with at least this many boundaries search them on a process pool.
+PARALLEL_MIN_BOUNDARIES = 256
+
+
+@dataclass
+class BoundaryReport:
+    """Result of a boundary search.
+
+    Attributes:
+        boundaries: Aligned offsets, starting with 0 and ending with the file size
+        unaligned: Nominal offsets where no message chain was found; their
+            chunks are merged into the previous one
+    """
+
+    boundaries: list[int]
+    unaligned: list[int] = field(default_factory=list)
+
+
+def _valid_chain(data: mmap.mmap, pos: int, size: int, lengths: list[int], chain: int) -> bool:
+    """Whether ``chain`` consecutive messages with known types start at ``pos``."""
+    for _ in range(chain):
+        if pos == size:
+            return True
+        if pos + 3 > size or data[pos] != 0xA3 or data[pos + 1] != 0x95:
+            return False
+        length = lengths[data[pos + 2]]
+        if not length:
+            return False
+        pos += length
+        if pos > size:
+            return False
+    return True
+
+
+def align_boundary(data: bytes | mmap.mmap, nominal: int, limit: int, lengths: list[int], chain: int,
+                   header: bytes = b"\xA3\x95") -> int:
+    """First chain-validated message start in ``[nominal, limit)``, or -1.
+
+    The search covers a window that doubles after every miss, so a clean
+    file costs one small window and a damaged one stays linear in the bytes
+    scanned.
+    """
+    size = len(data)
+    start, window = nominal, FIRST_WINDOW
+    while start < limit:
+        end = min(start + window, limit)
+        pos = data.find(header, start, end)
+        while pos != -1:
+            if _valid_chain(data, pos, size, lengths, chain):
+                return pos
+            pos = data.find(header, pos + 1, end)
+        start, window = end, window * 2
+    return -1
+
+
+def _align_range(filepath: str, nominals: list[tuple[int, int]], lengths: list[int], chain: int) -> list[int]:
+    """Align several ``(nominal, limit)`` pairs on one mapping of the file."""
+    with open(filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return [align_boundary(data, nominal, limit, lengths, chain) for nominal, limit in nominals]
+
+
+class ChunkSplitter:
+    """Splits binary files into chunks at message boundaries."""
+
+    @staticmethod
+    def find_boundaries(
+        filepath: str, num_chunks: int, fmt_messages: dict[int, dict], chain: int = CHAIN_LENGTH,
+        workers: int | None = None
+    ) -> BoundaryReport:
+        """Find message boundaries for splitting file into chunks.
+
+        Each nominal offset ``size // num_chunks * i`` is moved forward to
+        the first position where ``chain`` consecutive messages of known
+        types follow each other, searching in place on a memory map. The
+        search for a boundary stops at the next nominal offset; a boundary
+        not found there is reported and dropped instead of cutting a chunk
+        at a raw byte offset.
+
+        Args:
+            filepath: Path to binary file
+            num_chunks: Number of chunks to split into
+            fmt_messages: Format messages dictionary
+            chain: Messages validated per boundary
+            workers: Processes searching boundaries; by default a pool is
+                used from PARALLEL_MIN_BOUNDARIES boundaries on
+
+        Returns:
+            Aligned boundaries and the nominal offsets that could not be aligned
+        """
+        size = os.path.getsize(filepath)
+        if num_chunks <= 1 or size == 0:
+            return BoundaryReport([0, size])
+
+        lengths = message_lengths(fmt_messages, FMT_MSG_LENGTH)
+        step = size // num_chunks
+        nominals = [(step * i, min(step * (i + 1), size)) for i in range(1, num_chunks)]
+        if workers is None:
+            workers = min(os.cpu_count() or 1, 8) if len(nominals) >= PARALLEL_MIN_BOUNDARIES else 1
+
+        if workers > 1:
+            per_worker = -(-len(nominals) // workers)
+            parts = [nominals[i:i + per_worker] for i in range(0, len(nominals), per_worker)]
+            with pool_context().Pool(len(parts)) as pool:
+                aligned = [pos for part in pool.starmap(
+                    _align_range, [(filepath, part, lengths, chain) for part in parts]) for pos in part]
+        else:
+            aligned = _align_range(filepath, nominals, lengths, chain)
+
+        report = BoundaryReport([0])
+        for (nominal, _), pos in zip(nominals, aligned):
+            if pos == -1 or pos <= report.boundaries[-1]:
+                report.unaligned.append(nominal)
+            elif pos < size:
+                report.boundaries.append(pos)
+        report.boundaries.append(size)
+        if report.unaligned:
+            from utils.logger import AppLogger
+
+            AppLogger(ChunkSplitter.__name__).warning(
+                f"{filepath}: no message boundary near {report.unaligned}, "
+                f"{len(report.boundaries) - 1} chunks instead of {num_chunks}")
+        return report
+
+    @staticmethod
+    def boundaries(file_path: str, num_chunk: int, fmt_messages: dict[int, dict]) -> list[int]:
+        """Chunk boundary offsets of a file without reading it into memory.
+
+        Args:
+            file_path: Path to binary file
+            num_chunk: Number of chunks
+            fmt_messages: Format messages dictionary
+
+        Returns:
+            Sorted offsets, starting with 0 and ending with the file size
+        """
+        return ChunkSplitter.find_boundaries(file_path, num_chunk, fmt_messages).boundaries
+
+    @staticmethod
+    def split(
+        file_path: str, data: bytes, num_chunk: int, fmt_messages: dict[int, dict]
+    ) -> dict[int, bytes]:
+        """Split binary data into chunks at message boundaries.
+
+        Args:
+            file_path: Path to binary file
+            data: Binary data to split
+            num_chunk: Number of chunks
+            fmt_messages: Format messages dictionary
+
+        Returns:
+            Dictionary mapping chunk number to chunk data
+        """
+        chunks = {}
+        chunks_pos: list[int] = ChunkSplitter.boundaries(file_path, num_chunk, fmt_messages)
+        for pos in range(len(chunks_pos) - 1):
+            chunks[pos] = data[chunks_pos[pos] : chunks_pos[pos + 1]]
+        return chunks
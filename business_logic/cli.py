@@ -0,0 +1,279 @@
+"""Command line entry point: ``python -m business_logic``.
+
+    python -m business_logic decode log.bin --backend multiprocess --workers 4 --types GPS ATT -o gps.jsonl
+    python -m business_logic decode log.bin --start 60e6 --end 120e6 --format csv -o out_dir
+    python -m business_logic summary log.bin
+    python -m business_logic slice log.bin cut.bin --types GPS --start 60e6
+    python -m business_logic batch logs_dir out_dir --workers 8
+
+Every command takes the profiling switches, so a slow run can be measured
+again without editing code:
+
+    --profile [FILE]          cProfile stats dumped to FILE (``<command>.prof``), top entries printed
+    --line-profile [FILE]     line_profiler stats of --line-profile-func (``<command>.lprof``),
+                              read with ``python -m line_profiler <command>.lprof``
+    --trace-memory [N]        tracemalloc peak and the N lines that allocated most
+
+The profilers only see this process, not the workers of the process pool.
+"""
+
+import argparse
+import csv
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Iterable, Iterator
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.messages_extractor import MessagesExtractor
+from utils.enums import RunMode
+
+BACKENDS = {"normal": RunMode.NORMAL, "threads": RunMode.THREADS, "multiprocess": RunMode.MULTIPROCESS,
+            "auto": RunMode.AUTO}
+FORMATS = ("count", "jsonl", "csv")
+# Hot paths of the serial decode, profiled line by line when no function is given.
+LINE_PROFILE_FUNCTIONS = [
+    "business_logic.old_reader.Reader.read_messages",
+    "business_logic.old_reader.Reader._build_msg",
+    "business_logic.stream_reader.StreamReader.messages",
+]
+PROFILE_TOP = 25
+
+
+def _json_default(value):
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _time(text: str) -> int:
+    """TimeUS bound; accepts ``60e6`` for one minute."""
+    return int(float(text))
+
+
+def _in_range(messages: Iterable[dict], types: set[str] | None, start: int | None,
+              end: int | None) -> Iterator[dict]:
+    """Messages of ``types`` in ``[start, end)``; like slicing, messages without TimeUS are kept."""
+    for message in messages:
+        if types is not None and message["mavpackettype"] not in types:
+            continue
+        time_us = message.get("TimeUS")
+        if time_us is not None and ((start is not None and time_us < start) or (end is not None and time_us >= end)):
+            continue
+        yield message
+
+
+def _write_jsonl(messages: Iterable[dict], output: str) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    with open(output, "w", encoding="utf-8") as file:
+        for message in messages:
+            file.write(json.dumps(message, default=_json_default))
+            file.write("\n")
+            counts[message["mavpackettype"]] = counts.get(message["mavpackettype"], 0) + 1
+    return counts
+
+
+def _write_csv(messages: Iterable[dict], output: str) -> dict[str, int]:
+    """One ``<TYPE>.csv`` per message type under the ``output`` directory."""
+    os.makedirs(output, exist_ok=True)
+    counts: dict[str, int] = {}
+    with ExitStack() as stack:
+        writers = {}
+        for message in messages:
+            name = message["mavpackettype"]
+            if name not in writers:
+                file = stack.enter_context(open(os.path.join(output, f"{name}.csv"), "w", newline="",
+                                                encoding="utf-8"))
+                writers[name] = csv.DictWriter(file, fieldnames=list(message), extrasaction="ignore")
+                writers[name].writeheader()
+            writers[name].writerow(message)
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def _count(messages: Iterable[dict]) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for message in messages:
+        counts[message["mavpackettype"]] = counts.get(message["mavpackettype"], 0) + 1
+    return counts
+
+
+def decode(args: argparse.Namespace) -> int:
+    types = set(args.types) if args.types else None
+    wanted_type = args.types[0] if args.types and len(args.types) == 1 else ""
+    fmt = args.format or ("jsonl" if args.output else "count")
+    if fmt != "count" and not args.output:
+        print(f"--format {fmt} needs --output", file=sys.stderr)
+        return 2
+    start = time.perf_counter()
+    messages = MessagesExtractor().from_bin(args.path, args.round, BACKENDS[args.backend], args.workers,
+                                            wanted_type, order_by_time=args.order_by_time)
+    messages = _in_range(messages, types, args.start, args.end)
+    if fmt == "jsonl":
+        counts = _write_jsonl(messages, args.output)
+    elif fmt == "csv":
+        counts = _write_csv(messages, args.output)
+    else:
+        counts = _count(messages)
+    elapsed = time.perf_counter() - start
+    for name, count in sorted(counts.items()):
+        print(f"  {name:<6}{count:>10}")
+    megabytes = os.path.getsize(args.path) / 1e6
+    print(f"{sum(counts.values())} messages from {megabytes:.1f} MB in {elapsed:.2f}s "
+          f"({megabytes / elapsed if elapsed else 0:.1f} MB/s) with the {args.backend} backend")
+    return 0
+
+
+def summary(args: argparse.Namespace) -> int:
+    for path in args.paths:
+        print(MessagesExtractor().summarize(path))
+    return 0
+
+
+def slice_command(args: argparse.Namespace) -> int:
+    time_range = None if args.start is None and args.end is None else (args.start, args.end)
+    report = MessagesExtractor().slice_log(args.src, args.dst, time_range, args.types)
+    print(f"{report.messages} messages, {report.bytes_written} bytes in {report.ranges} ranges written to {args.dst}")
+    return 0
+
+
+def batch(args: argparse.Namespace) -> int:
+    report = MessagesExtractor().from_directory(args.directory, args.output_dir, args.round,
+                                                args.types[0] if args.types else "", args.workers,
+                                                pattern=args.pattern)
+    print(report)
+    return 0
+
+
+def _resolve(dotted: str) -> Callable:
+    """``package.module.Class.method`` to the function object."""
+    parts = dotted.split(".")
+    for split in range(len(parts) - 1, 0, -1):
+        try:
+            target = importlib.import_module(".".join(parts[:split]))
+        except ImportError:
+            continue
+        for name in parts[split:]:
+            target = getattr(target, name)
+        return target
+    raise ValueError(f"Cannot import {dotted!r}")
+
+
+@contextmanager
+def _cprofile(output: str) -> Iterator[None]:
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        print(f"Profile written to {output}", file=sys.stderr)
+
+
+@contextmanager
+def _line_profile(output: str, functions: list[str]) -> Iterator[None]:
+    from line_profiler import LineProfiler
+
+    profiler = LineProfiler(*(_resolve(name) for name in functions))
+    profiler.enable_by_count()
+    try:
+        yield
+    finally:
+        profiler.disable_by_count()
+        profiler.dump_stats(output)
+        print(f"Line profile written to {output}, view it with: python -m line_profiler {output}", file=sys.stderr)
+
+
+@contextmanager
+def _trace_memory(top: int) -> Iterator[None]:
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"Peak traced memory {peak / 1e6:.1f} MB, top {top} allocations:", file=sys.stderr)
+        for stat in snapshot.statistics("lineno")[:top]:
+            print(f"  {stat}", file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    profiling = argparse.ArgumentParser(add_help=False)
+    group = profiling.add_argument_group("profiling")
+    group.add_argument("--profile", nargs="?", const="", metavar="FILE",
+                       help="Run under cProfile and dump the stats (default <command>.prof)")
+    group.add_argument("--line-profile", nargs="?", const="", metavar="FILE",
+                       help="Run under line_profiler and dump the stats (default <command>.lprof)")
+    group.add_argument("--line-profile-func", action="append", metavar="DOTTED.NAME",
+                       help=f"Function to line-profile, repeatable (default {', '.join(LINE_PROFILE_FUNCTIONS)})")
+    group.add_argument("--trace-memory", nargs="?", type=int, const=10, metavar="N",
+                       help="Trace allocations with tracemalloc and print the top N lines (default 10)")
+
+    parser = argparse.ArgumentParser(prog="python -m business_logic", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("decode", parents=[profiling], help="Decode a log")
+    command.add_argument("path")
+    command.add_argument("--backend", choices=BACKENDS, default="normal")
+    command.add_argument("--workers", type=int, help="Workers of the parallel backends, sized from the file when omitted")
+    command.add_argument("--types", nargs="+", metavar="TYPE", help="Message names to keep, all when omitted")
+    command.add_argument("--start", type=_time, help="First TimeUS kept")
+    command.add_argument("--end", type=_time, help="TimeUS where the output stops (excluded)")
+    command.add_argument("--round", action="store_true", help="Round floats to 7 digits")
+    command.add_argument("--order-by-time", action="store_true", help="Merge the messages in TimeUS order")
+    command.add_argument("--format", choices=FORMATS,
+                         help="count (default without --output), jsonl (default with it) or csv, one file per type")
+    command.add_argument("-o", "--output", help="jsonl file, or directory for csv")
+    command.set_defaults(run=decode)
+
+    command = commands.add_parser("summary", parents=[profiling], help="Per-type counts without decoding")
+    command.add_argument("paths", nargs="+")
+    command.set_defaults(run=summary)
+
+    command = commands.add_parser("slice", parents=[profiling], help="Copy part of a log into a new bin file")
+    command.add_argument("src")
+    command.add_argument("dst")
+    command.add_argument("--types", nargs="+", metavar="TYPE", help="Message names to keep, all when omitted")
+    command.add_argument("--start", type=_time, help="First TimeUS kept")
+    command.add_argument("--end", type=_time, help="TimeUS where the copy stops (excluded)")
+    command.set_defaults(run=slice_command)
+
+    command = commands.add_parser("batch", parents=[profiling], help="Decode a directory of logs to jsonl")
+    command.add_argument("directory")
+    command.add_argument("output_dir")
+    command.add_argument("--workers", type=int, help="Pool size, all CPUs when omitted")
+    command.add_argument("--types", nargs=1, metavar="TYPE", help="Only decode this message name")
+    command.add_argument("--round", action="store_true", help="Round floats to 7 digits")
+    command.add_argument("--pattern", default="*.bin")
+    command.set_defaults(run=batch)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.line_profile is not None and importlib.util.find_spec("line_profiler") is None:
+        parser.error("--line-profile requires the 'line_profiler' package")
+    with ExitStack() as stack:
+        if args.profile is not None:
+            stack.enter_context(_cprofile(args.profile or f"{args.command}.prof"))
+        if args.line_profile is not None:
+            stack.enter_context(_line_profile(args.line_profile or f"{args.command}.lprof",
+                                              args.line_profile_func or LINE_PROFILE_FUNCTIONS))
+        # Innermost, so the reports of the other profilers are not counted.
+        if args.trace_memory is not None:
+            stack.enter_context(_trace_memory(args.trace_memory))
+        return args.run(args)
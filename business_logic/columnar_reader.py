@@ -0,0 +1,228 @@
+"""Columnar decoding of BIN logs into NumPy arrays.
+
+Message positions are collected with a header walk, then every message type
+is gathered in one NumPy fancy-indexing step and viewed through a structured
+dtype, so the per-message Python work is limited to the walk itself.
+"""
+
+import os
+import sys
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.header_walk import HeaderWalker
+from business_logic.old_reader import Reader
+from business_logic.predicates import Filter, compile_mask_filter, filter_columns
+from business_logic.schema_cache import STRING_DECODERS, decode_text, text_columns
+
+Columns = dict[str, np.ndarray]
+
+INSTANCE_COL = "I"
+
+NUMPY_TYPES = {
+    'a': ('<i2', (32,)), 'b': 'i1', 'B': 'u1', 'h': '<i2', 'H': '<u2', 'i': '<i4', 'I': '<u4',
+    'f': '<f4', 'd': '<f8', 'n': 'S4', 'N': 'S16', 'Z': 'S64', 'c': '<i2', 'C': '<u2',
+    'e': '<i4', 'E': '<u4', 'L': '<i4', 'M': 'u1', 'q': '<i8', 'Q': '<u8',
+}
+
+
+def message_dtype(msg_config: dict) -> np.dtype:
+    """Packed structured dtype of a message payload."""
+    return _compile_dtype(msg_config["Format"], tuple(msg_config["cols"]))
+
+
+@lru_cache(maxsize=None)
+def _compile_dtype(fmt_format: str, cols: tuple[str, ...]) -> np.dtype:
+    fields = []
+    for t, col in zip(fmt_format, cols):
+        numpy_type = NUMPY_TYPES[t]
+        if col == "Data" and t in Reader.STRING:
+            numpy_type = f'V{np.dtype(numpy_type).itemsize}'  # 'S' would drop trailing NULs
+        fields.append((col, numpy_type))
+    return np.dtype(fields)
+
+
+def round_column(values: np.ndarray, digits: int = 7) -> np.ndarray:
+    """``[round(v, digits) for v in values]`` as a float64 array, bit for bit.
+
+    Python rounds the exact decimal value of a float, ties to even, and
+    returns the nearest float to the rounded decimal; ``rint(v * 10**digits)
+    / 10**digits`` gives the same float whenever the product did not move
+    across a half, because the division of an exact integer by an exact
+    power of ten is correctly rounded too. The product is off by at most
+    half an ulp, so only values within a few ulps of a half (e.g. ``2.5e-7``
+    or ``-83.12986365``), beyond 2**52 after scaling, or not finite are
+    rounded with Python's ``round``; they are rare in real logs.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** digits
+    scaled = values * scale
+    rounded = np.rint(scaled)
+    result = rounded / scale
+    magnitude = np.abs(scaled)
+    with np.errstate(invalid="ignore"):  # NaN compares False, so non-finite values take the slow path
+        exact = (np.abs(np.abs(scaled - rounded) - 0.5) > magnitude * 2.0 ** -50) & (magnitude < 2.0 ** 52)
+    slow = np.flatnonzero(~exact)
+    if len(slow):
+        result[slow] = [round(value, digits) for value in values[slow].tolist()]
+    return result
+
+
+def decode_column(values: np.ndarray, decode=decode_text) -> np.ndarray:
+    """Object array of ``str`` from a fixed-width bytes column, decoding every distinct value once."""
+    if values.dtype.kind != 'S':
+        return values
+    uniques, inverse = np.unique(values, return_inverse=True)
+    decoded = np.empty(len(uniques), dtype=object)
+    decoded[:] = [decode(bytes(value)) for value in uniques]
+    return decoded[inverse.reshape(-1)]
+
+
+class ColumnarReader:
+    """Decodes whole message types into ``{column: ndarray}`` tables."""
+
+    def __init__(self, fmt_messages: dict | None = None) -> None:
+        self.walker = HeaderWalker(fmt_messages)
+
+    @property
+    def fmt_messages(self) -> dict:
+        return self.walker.fmt_messages
+
+    @property
+    def stopped_at(self) -> int:
+        """Start of the first message that did not fit in the last buffer read."""
+        return self.walker.stopped_at
+
+    def message_offsets(self, data: bytes, start: int = 0, end: int | None = None) -> dict[int, np.ndarray]:
+        """Positions of every data message, grouped by type id."""
+        positions: dict[int, list[int]] = defaultdict(list)
+        fmt_type = HeaderWalker.FMT_TYPE
+        for pos, type_msg in self.walker.walk(data, start, end):
+            if type_msg != fmt_type:
+                positions[type_msg].append(pos)
+        return {type_msg: np.array(offsets, dtype=np.int64) for type_msg, offsets in positions.items()}
+
+    def read_columns(self, data: bytes, to_round: bool = False, wanted_types: list[str] | None = None,
+                     columns: dict[str, list[str]] | None = None,
+                     filters: dict[str, Filter] | None = None,
+                     instances: dict[str, list[int]] | None = None, by_instance: bool = False,
+                     lazy_strings: bool = False) -> dict[str, Columns] | dict[tuple[str, int | None], Columns]:
+        """Decode ``data`` into one column table per message name.
+
+        ``columns`` and ``filters`` have the same meaning as in
+        ``Reader.read_messages``; here a filter is applied as a boolean mask
+        over the raw columns and a callable filter receives ``{column: raw
+        ndarray}`` and returns the mask.
+
+        Types with an ``I`` column are split by instance on the offsets,
+        before any payload is copied: ``instances`` keeps only the listed
+        instances of a type, and ``by_instance`` returns one table per
+        ``(name, instance)`` (instance None for types without ``I``).
+
+        With ``lazy_strings`` text columns stay fixed-width ``S4``/``S16``/
+        ``S64`` bytes, to be decoded on demand with :func:`decode_column`.
+        """
+        columns = columns or {}
+        filters = filters or {}
+        instances = instances or {}
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        tables = {}
+        for type_msg, offsets in self.message_offsets(data).items():
+            msg_config = self.fmt_messages[type_msg]
+            name = msg_config["Name"]
+            if wanted_types and name not in wanted_types:
+                continue
+            values = None
+            if name in instances or by_instance:
+                values = self.instance_values(buffer, offsets, msg_config)
+            if name in instances:
+                if values is None:
+                    raise ValueError(f"{name} has no {INSTANCE_COL} column to select instances on")
+                keep = np.isin(values, instances[name])
+                offsets, values = offsets[keep], values[keep]
+            if not by_instance:
+                tables[name] = self._decode(buffer, offsets, msg_config, to_round, columns.get(name),
+                                            filters.get(name), lazy_strings)
+                continue
+            for instance, rows in self.split_instances(values, len(offsets)).items():
+                tables[(name, instance)] = self._decode(buffer, offsets[rows], msg_config, to_round,
+                                                        columns.get(name), filters.get(name), lazy_strings)
+        return tables
+
+    def _decode(self, buffer: np.ndarray, offsets: np.ndarray, msg_config: dict, to_round: bool,
+                wanted_cols: list[str] | None, message_filter: Filter | None, lazy_strings: bool = False) -> Columns:
+        raw = self.gather(buffer, offsets, msg_config)
+        if message_filter is not None:
+            name = msg_config["Name"]
+            mask = compile_mask_filter(message_filter, msg_config["cols"], name, text_columns(msg_config))(
+                {col: raw[col] for col in filter_columns(message_filter) or msg_config["cols"]})
+            raw = raw[np.asarray(mask, dtype=bool)]
+        return self.convert(raw, msg_config, to_round, wanted_cols, lazy_strings)
+
+    @staticmethod
+    def instance_values(buffer: np.ndarray, offsets: np.ndarray, msg_config: dict) -> np.ndarray | None:
+        """The ``I`` field of the messages at ``offsets``, read alone; None for types without it."""
+        dtype = message_dtype(msg_config)
+        if INSTANCE_COL not in dtype.names:
+            return None
+        field_dtype, field_offset = dtype.fields[INSTANCE_COL][:2]
+        rows = buffer[offsets[:, None] + (3 + field_offset + np.arange(field_dtype.itemsize))]
+        return rows.view(field_dtype).reshape(-1)
+
+    @staticmethod
+    def split_instances(values: np.ndarray | None, count: int) -> dict[int | None, np.ndarray]:
+        """Row indices per instance value, in file order; one None group when there are no values."""
+        if values is None:
+            return {None: np.arange(count)}
+        return {int(instance): np.flatnonzero(values == instance) for instance in np.unique(values)}
+
+    def instance_offsets(self, data: bytes) -> dict[int, dict[int | None, np.ndarray]]:
+        """Message positions grouped by type id, then by instance (None for types without ``I``)."""
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        index = {}
+        for type_msg, offsets in self.message_offsets(data).items():
+            values = self.instance_values(buffer, offsets, self.fmt_messages[type_msg])
+            index[type_msg] = {instance: offsets[rows]
+                               for instance, rows in self.split_instances(values, len(offsets)).items()}
+        return index
+
+    @staticmethod
+    def gather(buffer: np.ndarray, offsets: np.ndarray, msg_config: dict) -> np.ndarray:
+        """Copy the payloads at ``offsets`` into one structured array."""
+        dtype = message_dtype(msg_config)
+        rows = buffer[offsets[:, None] + (3 + np.arange(dtype.itemsize))]
+        return rows.view(dtype).reshape(-1)
+
+    @staticmethod
+    def convert(raw: np.ndarray, msg_config: dict, to_round: bool, wanted_cols: list[str] | None = None,
+                lazy_strings: bool = False) -> Columns:
+        """Apply the reader's scaling, rounding and string decoding per column."""
+        if wanted_cols:
+            unknown = set(wanted_cols) - set(msg_config["cols"])
+            if unknown:
+                raise ValueError(f"{msg_config['Name']} has no columns {sorted(unknown)}")
+        table = {}
+        for t, col in zip(msg_config["Format"], msg_config["cols"]):
+            if wanted_cols and col not in wanted_cols:
+                continue
+            values = raw[col]
+            if t in Reader.SCALE_100 or t == 'L':
+                values = values * (0.01 if t != 'L' else 1e-7)
+                if to_round and col in Reader.ROUND:
+                    values = round_column(values, 7)
+            elif t in Reader.STRING:
+                if col == "Data":
+                    values = np.array([value.tobytes() for value in values], dtype=object)
+                elif lazy_strings:
+                    values = values.copy()
+                else:
+                    values = decode_column(values, STRING_DECODERS[t])
+            elif t == 'f':
+                values = values.astype(np.float64)
+            else:
+                values = values.copy()
+            table[col] = values
+        return table
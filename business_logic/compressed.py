@@ -0,0 +1,290 @@
+"""Compressed log input.
+
+Logs compressed with gzip, xz, bzip2 or zstd are recognised by their magic
+bytes, whatever their extension. Streaming readers get a file object that
+decompresses on a background thread into a bounded queue, so decompression
+(which releases the GIL) overlaps decoding while at most ``max_pending``
+blocks are held.
+
+Two formats can be split without decompressing them: BGZF (gzip made of
+independent members that record their own size, as written by ``bgzip``)
+and zstd made of several frames. :func:`frames` lists their frames so the
+parallel readers can hand groups of frames to workers; other compressed
+files are decoded serially. :func:`compress_log` writes both formats.
+"""
+
+import io
+import os
+import queue
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO
+
+GZIP = "gzip"
+XZ = "xz"
+BZIP2 = "bzip2"
+ZSTD = "zstd"
+
+MAGIC = {
+    b"\x1f\x8b": GZIP,
+    b"\xfd7zXZ\x00": XZ,
+    b"BZh": BZIP2,
+    b"\x28\xb5\x2f\xfd": ZSTD,
+}
+DEFAULT_MAX_PENDING = 4
+DEFAULT_FRAME_SIZE = 4 * 1024 * 1024
+
+# BGZF members hold at most 64 KiB of input, see the SAM/BAM specification.
+BGZF_BLOCK_SIZE = 0xFF00
+_BGZF_HEADER = struct.Struct("<4BI2BH2BHH")
+_ZSTD_SKIPPABLE = range(0x184D2A50, 0x184D2A60)
+
+
+@dataclass(frozen=True)
+class Frame:
+    """An independently decompressible range of a compressed file."""
+
+    offset: int
+    size: int
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.size
+
+
+def compression_of(path: str) -> str | None:
+    """``gzip``, ``xz``, ``bzip2``, ``zstd``, or None for a plain log."""
+    with open(path, "rb") as file:
+        head = file.read(6)
+    for magic, kind in MAGIC.items():
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Reading zstd compressed logs requires the 'zstandard' package") from None
+    return zstandard
+
+
+def open_log(path: str) -> BinaryIO:
+    """The decompressed content of ``path`` as a binary file object."""
+    kind = compression_of(path)
+    # The codec modules are imported on first use, most logs are not compressed.
+    if kind == GZIP:
+        import gzip
+        return gzip.open(path, "rb")
+    if kind == XZ:
+        import lzma
+        return lzma.open(path, "rb")
+    if kind == BZIP2:
+        import bz2
+        return bz2.open(path, "rb")
+    if kind == ZSTD:
+        return _zstandard().ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+    return open(path, "rb")
+
+
+class Prefetcher(io.RawIOBase):
+    """Reads ``source`` in blocks on a background thread.
+
+    Up to ``max_pending`` blocks wait in a queue; the thread blocks when the
+    consumer falls behind. Errors of the source are raised by ``read``.
+    """
+
+    def __init__(self, source: BinaryIO, block_size: int, max_pending: int = DEFAULT_MAX_PENDING) -> None:
+        super().__init__()
+        self._source = source
+        self._block_size = block_size
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._stop = threading.Event()
+        self._pending = b""
+        self._eof = False
+        self._thread = threading.Thread(target=self._produce, name="log-prefetch", daemon=True)
+        self._thread.start()
+
+    def _produce(self) -> None:
+        try:
+            while not self._stop.is_set():
+                block = self._source.read(self._block_size)
+                self._put(block)
+                if not block:
+                    return
+        except BaseException as error:
+            self._put(error)
+
+    def _put(self, item) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self) -> bool:
+        return True
+
+    def _next_block(self) -> bytes:
+        item = self._queue.get()
+        if isinstance(item, BaseException):
+            self._eof = True
+            raise item
+        self._eof = not item
+        return item
+
+    def read(self, size: int = -1) -> bytes:
+        """Up to ``size`` bytes, at most one block beyond what is pending; everything left when -1."""
+        if size is None or size < 0:
+            parts = [self._pending]
+            while not self._eof:
+                parts.append(self._next_block())
+            self._pending = b""
+            return b"".join(parts)
+        if not self._pending and not self._eof:
+            self._pending = self._next_block()
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._source.close()
+        super().close()
+
+
+def open_stream(path: str, block_size: int, max_pending: int = DEFAULT_MAX_PENDING) -> BinaryIO:
+    """File object for reading ``path`` in blocks; compressed logs are decompressed ahead on a thread."""
+    if compression_of(path) is None:
+        return open(path, "rb")
+    return Prefetcher(open_log(path), block_size, max_pending)
+
+
+def _gzip_frames(file: BinaryIO, size: int) -> list[Frame] | None:
+    frames = []
+    offset = 0
+    while offset < size:
+        file.seek(offset)
+        header = file.read(_BGZF_HEADER.size)
+        if len(header) < _BGZF_HEADER.size:
+            return None
+        id1, id2, method, flags, _, _, _, xlen, si1, si2, slen, bsize = _BGZF_HEADER.unpack(header)
+        if (id1, id2, method, si1, si2, slen) != (0x1F, 0x8B, 8, ord("B"), ord("C"), 2) or not flags & 4:
+            return None
+        frames.append(Frame(offset, bsize + 1))
+        offset += bsize + 1
+    return frames if offset == size else None
+
+
+def _zstd_frame_size(file: BinaryIO, offset: int) -> int | None:
+    """Size of the zstd frame at ``offset`` from its block headers, or None if it is not one."""
+    file.seek(offset)
+    head = file.read(5)
+    if len(head) < 5:
+        return None
+    magic = int.from_bytes(head[:4], "little")
+    if magic in _ZSTD_SKIPPABLE:
+        length = file.read(3)
+        return 8 + int.from_bytes(head[4:] + length, "little") if len(length) == 3 else None
+    if magic != 0xFD2FB528:
+        return None
+    descriptor = head[4]
+    single_segment = descriptor >> 5 & 1
+    content_size_bytes = (1 if single_segment else 0, 2, 4, 8)[descriptor >> 6]
+    pos = offset + 5 + (0 if single_segment else 1) + (0, 1, 2, 4)[descriptor & 3] + content_size_bytes
+    while True:
+        file.seek(pos)
+        block = file.read(3)
+        if len(block) < 3:
+            return None
+        header = int.from_bytes(block, "little")
+        last, block_type, block_size = header & 1, header >> 1 & 3, header >> 3
+        if block_type == 3:
+            return None
+        pos += 3 + (1 if block_type == 1 else block_size)
+        if last:
+            return pos + (4 if descriptor & 4 else 0) - offset
+
+
+def _zstd_frames(file: BinaryIO, size: int) -> list[Frame] | None:
+    frames = []
+    offset = 0
+    while offset < size:
+        frame_size = _zstd_frame_size(file, offset)
+        if frame_size is None:
+            return None
+        frames.append(Frame(offset, frame_size))
+        offset += frame_size
+    return frames if offset == size else None
+
+
+def frames(path: str) -> list[Frame] | None:
+    """Frames of a BGZF or multi-frame zstd file, found from headers alone; None when not splittable."""
+    kind = compression_of(path)
+    if kind not in (GZIP, ZSTD):
+        return None
+    size = os.path.getsize(path)
+    with open(path, "rb") as file:
+        return _gzip_frames(file, size) if kind == GZIP else _zstd_frames(file, size)
+
+
+def decompress_range(path: str, start: int, end: int) -> bytes:
+    """Decompress the frames between compressed offsets ``start`` and ``end``."""
+    kind = compression_of(path)
+    with open(path, "rb") as file:
+        file.seek(start)
+        raw = file.read(end - start)
+    if kind == GZIP:
+        import gzip
+        return gzip.decompress(raw)
+    if kind == ZSTD:
+        reader = _zstandard().ZstdDecompressor().stream_reader(io.BytesIO(raw), read_across_frames=True)
+        return reader.read()
+    raise ValueError(f"{path}: {kind or 'plain'} files have no frames")
+
+
+def group_frames(frame_list: list[Frame], groups: int) -> list[tuple[int, int]]:
+    """``(start, end)`` compressed ranges of consecutive frames with about equal compressed size."""
+    groups = max(1, min(groups, len(frame_list)))
+    total = frame_list[-1].end - frame_list[0].offset
+    ranges = []
+    start = frame_list[0].offset
+    for frame in frame_list:
+        target = frame_list[0].offset + total * (len(ranges) + 1) // groups
+        if frame.end >= target and len(ranges) < groups - 1 and frame.end < frame_list[-1].end:
+            ranges.append((start, frame.end))
+            start = frame.end
+    ranges.append((start, frame_list[-1].end))
+    return ranges
+
+
+def _bgzf_member(data: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    body = compressor.compress(data) + compressor.flush()
+    header = _BGZF_HEADER.pack(0x1F, 0x8B, 8, 4, 0, 0, 255, 6, ord("B"), ord("C"), 2,
+                               _BGZF_HEADER.size + len(body) + 8 - 1)
+    return header + body + struct.pack("<II", zlib.crc32(data), len(data))
+
+
+def compress_log(source: str, destination: str, kind: str = GZIP, frame_size: int = DEFAULT_FRAME_SIZE,
+                 level: int = 6) -> None:
+    """Write ``source`` compressed as BGZF (``gzip``) or multi-frame ``zstd``.
+
+    ``frame_size`` is the input bytes per zstd frame; BGZF members are
+    limited to ``BGZF_BLOCK_SIZE``. Both outputs read as plain gzip/zstd.
+    """
+    if kind not in (GZIP, ZSTD):
+        raise ValueError(f"Seekable output is written as {GZIP!r} or {ZSTD!r}, not {kind!r}")
+    step = BGZF_BLOCK_SIZE if kind == GZIP else frame_size
+    compress = (lambda block: _bgzf_member(block, level)) if kind == GZIP \
+        else _zstandard().ZstdCompressor(level=level).compress
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        while block := src.read(step):
+            dst.write(compress(block))
+        if kind == GZIP:
+            dst.write(_bgzf_member(b"", level))  # BGZF end-of-file marker
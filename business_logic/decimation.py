@@ -0,0 +1,208 @@
+"""Downsampling of high-rate message types.
+
+Per message name, either keep every Nth message (:class:`Every`, or a plain
+``int``) or aggregate messages into ``TimeUS`` buckets (:class:`Buckets`)
+that carry ``first``/``last``/``mean``/``min``/``max`` of each numeric
+column as ``<column>_<stat>``, the bucket start as ``TimeUS`` and the number
+of messages as ``Count``. Text columns keep the bucket's first value.
+
+``by`` names a column, usually the instance ``I``, whose values are
+decimated separately. Types without an entry pass through untouched.
+The dict path works on the message stream, the columnar path on whole
+arrays; both give the same values.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+STATS = ("first", "last", "mean", "min", "max")
+
+
+@dataclass(frozen=True)
+class Every:
+    """Keep messages 0, n, 2n, ... of a type (per ``by`` value)."""
+
+    n: int
+    by: str | None = None
+
+
+@dataclass(frozen=True)
+class Buckets:
+    """Aggregate messages into buckets of ``period_us`` microseconds."""
+
+    period_us: int
+    stats: tuple[str, ...] = STATS
+    by: str | None = None
+    time_col: str = "TimeUS"
+
+    def __post_init__(self) -> None:
+        unknown = set(self.stats) - set(STATS)
+        if unknown:
+            raise ValueError(f"Unknown statistics {sorted(unknown)}, expected some of {STATS}")
+
+
+Decimation = Every | Buckets | int
+
+
+def _normalize(decimate: dict[str, Decimation]) -> dict[str, Every | Buckets]:
+    specs = {}
+    for name, spec in decimate.items():
+        spec = Every(spec) if isinstance(spec, int) else spec
+        if isinstance(spec, Every) and spec.n < 1 or isinstance(spec, Buckets) and spec.period_us < 1:
+            raise ValueError(f"Invalid decimation for {name}: {spec}")
+        specs[name] = spec
+    return specs
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _Bucket:
+    __slots__ = ("index", "count", "first", "last", "sums", "mins", "maxs")
+
+    def __init__(self, index: int, message: dict) -> None:
+        self.index = index
+        self.count = 0
+        self.first = message
+        self.last = message
+        self.sums = {}
+        self.mins = {}
+        self.maxs = {}
+
+    def add(self, message: dict, columns: list[str]) -> None:
+        self.count += 1
+        self.last = message
+        sums, mins, maxs = self.sums, self.mins, self.maxs
+        for col in columns:
+            value = message[col]
+            if col in sums:
+                sums[col] += value
+                if value < mins[col]:
+                    mins[col] = value
+                if value > maxs[col]:
+                    maxs[col] = value
+            else:
+                sums[col] = mins[col] = maxs[col] = value
+
+    def emit(self, name: str, spec: Buckets, columns: list[str], text_columns: list[str]) -> dict:
+        result = {"mavpackettype": name, spec.time_col: self.index * spec.period_us, "Count": self.count}
+        if spec.by is not None:
+            result[spec.by] = self.first[spec.by]
+        for col in columns:
+            for stat in spec.stats:
+                if stat == "first":
+                    value = self.first[col]
+                elif stat == "last":
+                    value = self.last[col]
+                elif stat == "mean":
+                    value = self.sums[col] / self.count
+                elif stat == "min":
+                    value = self.mins[col]
+                else:
+                    value = self.maxs[col]
+                result[f"{col}_{stat}"] = value
+        for col in text_columns:
+            result[col] = self.first[col]
+        return result
+
+
+def decimate_messages(messages: Iterable[dict], decimate: dict[str, Decimation]) -> Iterator[dict]:
+    """Streaming decimation of message dicts; holds one open bucket per type and ``by`` value."""
+    specs = _normalize(decimate)
+    counters: dict[tuple, int] = {}
+    buckets: dict[tuple, _Bucket] = {}
+    layouts: dict[str, tuple[list[str], list[str]]] = {}
+    for message in messages:
+        name = message["mavpackettype"]
+        spec = specs.get(name)
+        if spec is None:
+            yield message
+            continue
+        key = (name, message[spec.by] if spec.by is not None else None)
+        if isinstance(spec, Every):
+            count = counters.get(key, 0)
+            counters[key] = count + 1
+            if count % spec.n == 0:
+                yield message
+            continue
+
+        layout = layouts.get(name)
+        if layout is None:
+            skip = {"mavpackettype", spec.time_col, spec.by}
+            cols = [col for col in message if col not in skip]
+            layout = layouts[name] = ([col for col in cols if _is_number(message[col])],
+                                      [col for col in cols if not _is_number(message[col])])
+        index = message[spec.time_col] // spec.period_us
+        bucket = buckets.get(key)
+        if bucket is None or bucket.index != index:
+            if bucket is not None:
+                yield bucket.emit(name, spec, *layout)
+            bucket = buckets[key] = _Bucket(index, message)
+        bucket.add(message, layout[0])
+    for (name, _), bucket in buckets.items():
+        yield bucket.emit(name, specs[name], *layouts[name])
+
+
+def decimate_columns(tables: dict[str, dict], decimate: dict[str, Decimation]) -> dict[str, dict]:
+    """Vectorised decimation of ``{name: {column: ndarray}}`` tables.
+
+    Bucket rows are ordered by bucket, then by ``by`` value. Empty tables
+    are returned unchanged.
+    """
+    import numpy as np
+
+    specs = _normalize(decimate)
+    result = {}
+    for name, table in tables.items():
+        spec = specs.get(name)
+        size = len(next(iter(table.values()))) if table else 0
+        if spec is None or not size:
+            result[name] = table
+            continue
+        if spec.by is not None:
+            _, groups = np.unique(table[spec.by], return_inverse=True)
+        else:
+            groups = np.zeros(size, dtype=np.int64)
+
+        if isinstance(spec, Every):
+            order = np.argsort(groups, kind="stable")
+            starts = np.searchsorted(groups[order], groups[order], side="left")
+            rank = np.empty(size, dtype=np.int64)
+            rank[order] = np.arange(size) - starts
+            keep = rank % spec.n == 0
+            result[name] = {col: values[keep] for col, values in table.items()}
+            continue
+
+        index = table[spec.time_col] // spec.period_us
+        order = np.lexsort((groups, index))
+        index, groups = index[order], groups[order]
+        starts = np.flatnonzero(np.r_[True, (index[1:] != index[:-1]) | (groups[1:] != groups[:-1])])
+        ends = np.r_[starts[1:], size]
+        counts = ends - starts
+        out = {spec.time_col: index[starts] * spec.period_us, "Count": counts}
+        if spec.by is not None:
+            out[spec.by] = table[spec.by][order][starts]
+        text = {}
+        for col, values in table.items():
+            if col in (spec.time_col, spec.by):
+                continue
+            values = values[order]
+            if values.dtype.kind not in "iuf":
+                text[col] = values[starts]
+                continue
+            for stat in spec.stats:
+                if stat == "first":
+                    out[f"{col}_first"] = values[starts]
+                elif stat == "last":
+                    out[f"{col}_last"] = values[ends - 1]
+                elif stat == "mean":
+                    sums = np.add.reduceat(values, starts)
+                    out[f"{col}_mean"] = sums / counts.reshape((-1,) + (1,) * (values.ndim - 1))
+                elif stat == "min":
+                    out[f"{col}_min"] = np.minimum.reduceat(values, starts)
+                else:
+                    out[f"{col}_max"] = np.maximum.reduceat(values, starts)
+        out.update(text)
+        result[name] = out
+    return result
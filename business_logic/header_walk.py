@@ -0,0 +1,149 @@
+"""Header-only traversal of BIN logs.
+
+Moves from message to message using only the type byte and the FMT length,
+so callers that need positions, counts or a single field never pay for a full
+payload decode.
+"""
+
+import os
+import struct
+import sys
+from typing import Generator
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.compressed import open_stream
+from business_logic.old_reader import Reader
+from business_logic.resync import find_header
+
+
+class HeaderWalker:
+    """Yields ``(position, type)`` for every message in a buffer.
+
+    FMT messages are registered as they are met, so a walker can start with
+    an empty table. Bytes that could not be attributed to a message are
+    recorded in ``skipped`` as ``(start, end)`` ranges.
+    """
+
+    FMT_TYPE = 0x80
+
+    def __init__(self, fmt_messages: dict | None = None) -> None:
+        self.reader = Reader()
+        self.lengths = [0] * 256
+        self.lengths[self.FMT_TYPE] = Reader.FMT_MSG_LENGTH
+        self.skipped: list[tuple[int, int]] = []
+        self.stopped_at = 0
+        if fmt_messages:
+            self.reader.fmt_messages = fmt_messages
+            for type_msg, msg_config in fmt_messages.items():
+                self.lengths[type_msg] = msg_config["Length"]
+
+    @property
+    def fmt_messages(self) -> dict:
+        return self.reader.fmt_messages
+
+    def register_fmt(self, view: memoryview, pos: int) -> dict:
+        msg_config = self.reader.read_fmt_massage(view, pos)
+        if msg_config["Length"] >= 3:
+            self.lengths[msg_config["Type"]] = msg_config["Length"]
+        return msg_config
+
+    def _skip(self, start: int, end: int) -> None:
+        if self.skipped and self.skipped[-1][1] == start:
+            start = self.skipped.pop()[0]
+        self.skipped.append((start, end))
+
+    def walk(self, data: bytes | bytearray, start: int = 0,
+             end: int | None = None) -> Generator[tuple[int, int], None, None]:
+        """Walk ``data[start:end]``; ``data`` must support ``find`` (bytes or mmap).
+
+        A message that would run past ``end`` is not yielded; the walk stops
+        before it, the remainder is reported as skipped and ``stopped_at`` is
+        left at its start so block readers can carry it over.
+        """
+        end = len(data) if end is None else end
+        view = memoryview(data)
+        lengths = self.lengths
+        pos = start
+        self.stopped_at = end
+        try:
+            while pos + 3 <= end:
+                type_msg = view[pos + 2]
+                length = lengths[type_msg]
+                if view[pos] != 0xA3 or view[pos + 1] != 0x95 or not length:
+                    next_head = find_header(data, pos + 1, end, lengths)
+                    if next_head == -1:
+                        self._skip(pos, end)
+                        if view[end - 1] == 0xA3:
+                            self.stopped_at = end - 1
+                        return
+                    self._skip(pos, next_head)
+                    pos = next_head
+                    continue
+                if pos + length > end:
+                    self._skip(pos, end)
+                    self.stopped_at = pos
+                    return
+                if type_msg == self.FMT_TYPE:
+                    try:
+                        self.register_fmt(view, pos)
+                    except KeyError:  # Format letters outside TYPE_MAP, not a real FMT
+                        self._skip(pos, pos + 1)
+                        pos += 1
+                        continue
+                yield pos, type_msg
+                pos += length
+            if pos < end:
+                self._skip(pos, end)
+                self.stopped_at = pos
+        finally:
+            view.release()
+
+
+def _valid_fmt(view: memoryview, pos: int) -> bool:
+    """Whether the FMT candidate at ``pos`` describes a decodable message."""
+    name = bytes(view[pos + 5:pos + 9]).partition(b'\x00')[0]
+    fmt_format = bytes(view[pos + 9:pos + 25]).partition(b'\x00')[0]
+    if not name or not name.isalnum() or not fmt_format:
+        return False
+    try:
+        codes = ''.join(Reader.TYPE_MAP[chr(t)] for t in fmt_format)
+    except KeyError:
+        return False
+    return view[pos + 3] == HeaderWalker.FMT_TYPE or view[pos + 4] == 3 + struct.calcsize('<' + codes)
+
+
+def read_fmt_table(data: bytes | bytearray, start: int = 0, end: int | None = None) -> dict:
+    """FMT table of a buffer found by a byte search instead of a message walk.
+
+    Candidates (``A3 95 80``) are kept only when their name is alphanumeric and
+    their declared length matches the format, which rejects the rare matches
+    inside payloads. Much faster than walking every message on large files.
+    """
+    end = len(data) if end is None else end
+    view = memoryview(data)
+    walker = HeaderWalker()
+    marker = Reader.HEADER + bytes([HeaderWalker.FMT_TYPE])
+    try:
+        pos = data.find(marker, start, end)
+        while pos != -1 and pos + Reader.FMT_MSG_LENGTH <= end:
+            if _valid_fmt(view, pos):
+                walker.register_fmt(view, pos)
+                pos = data.find(marker, pos + Reader.FMT_MSG_LENGTH, end)
+            else:
+                pos = data.find(marker, pos + 1, end)
+    finally:
+        view.release()
+    return walker.fmt_messages
+
+
+def read_file_fmt_table(path: str, block_size: int = 16 * 1024 * 1024) -> dict:
+    """``read_fmt_table`` of a whole file, read in blocks so compressed logs are never held whole."""
+    fmt_messages: dict = {}
+    carry = b""
+    with open_stream(path, block_size) as file:
+        while block := file.read(block_size):
+            data = carry + block
+            fmt_messages.update(read_fmt_table(data))
+            # An FMT cut by the block end starts in the last FMT_MSG_LENGTH - 1 bytes.
+            carry = data[-(Reader.FMT_MSG_LENGTH - 1):]
+    return fmt_messages
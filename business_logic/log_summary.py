@@ -0,0 +1,114 @@
+"""Fast per-type statistics of a BIN log without decoding payloads."""
+
+import mmap
+import os
+import struct
+import sys
+from dataclasses import dataclass, field
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.header_walk import HeaderWalker
+from business_logic.old_reader import Reader
+
+
+@dataclass
+class TypeSummary:
+    """Statistics of one message type."""
+
+    name: str
+    count: int = 0
+    bytes: int = 0
+    first_time_us: int | None = None
+    last_time_us: int | None = None
+
+
+@dataclass
+class LogSummary:
+    """Result of :func:`summarize`."""
+
+    path: str
+    file_size: int
+    types: dict[str, TypeSummary] = field(default_factory=dict)
+    gaps: list[tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def corrupt_bytes(self) -> int:
+        return sum(end - start for start, end in self.gaps)
+
+    @property
+    def message_count(self) -> int:
+        return sum(summary.count for summary in self.types.values())
+
+    def byte_share(self, name: str) -> float:
+        """Fraction of the file taken by messages of ``name``."""
+        return self.types[name].bytes / self.file_size if self.file_size else 0.0
+
+    @property
+    def first_time_us(self) -> int | None:
+        times = [s.first_time_us for s in self.types.values() if s.first_time_us is not None]
+        return min(times, default=None)
+
+    @property
+    def last_time_us(self) -> int | None:
+        times = [s.last_time_us for s in self.types.values() if s.last_time_us is not None]
+        return max(times, default=None)
+
+    def __str__(self) -> str:
+        lines = [f"{self.path}: {self.file_size} bytes, {self.message_count} messages, "
+                 f"{self.corrupt_bytes} corrupt bytes in {len(self.gaps)} gaps"]
+        for name, s in sorted(self.types.items(), key=lambda item: -item[1].bytes):
+            lines.append(f"  {name:<6}{s.count:>10}{self.byte_share(name):>8.1%}"
+                         f"  {s.first_time_us} .. {s.last_time_us}")
+        return "\n".join(lines)
+
+
+def time_field(msg_config: dict) -> tuple[int, struct.Struct] | None:
+    """Payload offset and struct of the ``TimeUS`` column, ``None`` if absent."""
+    cols = msg_config["cols"]
+    if "TimeUS" not in cols:
+        return None
+    index = cols.index("TimeUS")
+    prefix = ''.join(Reader.TYPE_MAP[t] for t in msg_config["Format"][:index])
+    return struct.calcsize('<' + prefix), struct.Struct('<' + Reader.TYPE_MAP[msg_config["Format"][index]])
+
+
+def summarize(path: str) -> LogSummary:
+    """Count messages per type, their byte share, TimeUS span and resync gaps.
+
+    Only the header of each message is read; ``TimeUS`` is decoded for the
+    first and last message of each type only.
+    """
+    size = os.path.getsize(path)
+    summary = LogSummary(path, size)
+    if not size:
+        return summary
+
+    walker = HeaderWalker()
+    counts = [0] * 256
+    first_pos = [-1] * 256
+    last_pos = [-1] * 256
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for pos, type_msg in walker.walk(data):
+            if not counts[type_msg]:
+                first_pos[type_msg] = pos
+            counts[type_msg] += 1
+            last_pos[type_msg] = pos
+
+        fmt_messages = walker.fmt_messages
+        for type_msg, count in enumerate(counts):
+            if not count:
+                continue
+            if type_msg == HeaderWalker.FMT_TYPE:
+                summary.types["FMT"] = TypeSummary("FMT", count, count * Reader.FMT_MSG_LENGTH)
+                continue
+            msg_config = fmt_messages[type_msg]
+            type_summary = TypeSummary(msg_config["Name"], count, count * msg_config["Length"])
+            timing = time_field(msg_config)
+            if timing is not None:
+                offset, time_struct = timing
+                type_summary.first_time_us = time_struct.unpack_from(data, first_pos[type_msg] + 3 + offset)[0]
+                type_summary.last_time_us = time_struct.unpack_from(data, last_pos[type_msg] + 3 + offset)[0]
+            summary.types[type_summary.name] = type_summary
+
+    summary.gaps = walker.skipped
+    return summary
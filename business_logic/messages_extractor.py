@@ -1,63 +1,200 @@
-import time
 import sys, os
-sys.path.append(os.path.join(os.path.dirname(__file__), "..", "business_logic"))
-
-from multi_process_reader import MultiProcessReader
-from multi_thread_reader import ThreadReader
-from utils.enums import RunMode
-
-from old_reader import Reader
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.enums import RunMode
 from utils.logger import AppLogger
+from business_logic.log_summary import LogSummary, summarize
+from business_logic.predicates import Filter
+from business_logic.aggregation import Reducer, aggregate
+from business_logic.backends import get_backend, select_backend
+from business_logic.header_walk import read_file_fmt_table
+from business_logic.decimation import Decimation, decimate_columns, decimate_messages
+from business_logic.batch_scheduler import BatchReport, DirectoryScheduler, DEFAULT_UNIT_SIZE
+from business_logic.slicing import SliceReport, slice_log
+from business_logic.stream_reader import DEFAULT_BLOCK_SIZE, StreamReader
+from business_logic.time_merge import INSTANCE_COL, merge_by_time, time_ordered
 
 class MessagesExtractor:
 
     def __init__(self) -> None:
         self._logger = AppLogger(self.__class__.__name__)
-        self._reader = Reader()
-        self._multi_processor_reader = MultiProcessReader()
-        self._thread_reader = ThreadReader()
 
 
 
 
-    def from_bin(self, path: str, to_round : bool= False, run_mode : RunMode = RunMode.NORMAL, num_workers : int = 8, wanted_type : str = ""):
+    def from_bin(self, path: str, to_round : bool= False, run_mode : RunMode = RunMode.NORMAL, num_workers : int | None = None, wanted_type : str = "",
+                 columns: dict[str, list[str]] | None = None, filters: dict[str, Filter] | None = None,
+                 decimate: dict[str, Decimation] | None = None, block_size: int = DEFAULT_BLOCK_SIZE,
+                 order_by_time: bool = False):
         """
         :param path: Path of a bin file.
+        :param num_workers: Workers of the parallel modes; None lets MULTIPROCESS size the pool from the file
+                            and a quick calibration (see MultiProcessReader.LAST_PLAN).
+        :param columns: Per message name, the only columns to decode, e.g. {"GPS": ["TimeUS", "Lat", "Lng"]}.
+        :param filters: Per message name, an expression like "I == 1 and Status >= 3" or a callable,
+                        evaluated on the raw unpacked values before the message is built.
+        :param decimate: Per message name, keep every Nth message (an int or Every(n, by="I")) or aggregate
+                         into TimeUS buckets (Buckets(period_us, by="I")), see business_logic.decimation.
+        :param block_size: NORMAL reads the file in blocks of this size, so memory does not grow with the log.
+        :param order_by_time: Yield the messages by TimeUS instead of file order, merging the per type and
+                              instance streams (holds all messages; see from_bin_merged for a lazy merge).
         :return: List of all messages who founds.
         """
 
-        match run_mode:
-            case RunMode.NORMAL:
-                with open(path, "rb") as file:
-                    data = file.read()
-                self._logger.info(f"Opened a file length: {len(data)}")
-                yield from self._reader.read_messages(data, to_round=to_round, wanted_type=wanted_type)
-            case RunMode.MULTIPROCESS:
-                for message in self._multi_processor_reader.process_in_parallel(path, num_workers, to_round, wanted_type=wanted_type):
-                    yield message
-            case RunMode.THREADS:
-                for message in self._thread_reader.process_in_parallel(path,num_workers, to_round, wanted_type=wanted_type):
-                    yield message
+        if run_mode is RunMode.AUTO:
+            backend = select_backend(os.path.getsize(path), wanted_type, columns, filters)
+        else:
+            backend = get_backend(run_mode)
+        self._logger.info(f"Decoding {path} with the {backend.name} backend")
+        messages = backend.decode(path, to_round, wanted_type, columns, filters, num_workers, block_size)
+        if order_by_time:
+            messages = time_ordered(messages)
+        yield from decimate_messages(messages, decimate) if decimate else messages
+
+    def from_bin_merged(self, path: str, streams: list[str | tuple[str, int]], to_round: bool = False,
+                        columns: dict[str, list[str]] | None = None, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Time-ordered messages of several types or instances, e.g. [("GPS", 0), ("GPS", 1), "ATT"].
+        Every stream is read by its own block reader and the streams are heap-merged by TimeUS,
+        so about one block per stream is held, but the file is read and header-walked once per
+        stream (k passes for k streams), plus an FMT scan when an instance is given.
+        Types with no I column must be given by name only; an instance raises ValueError.
+        """
+        keys = [(stream, None) if isinstance(stream, str) else stream for stream in streams]
+        instanced = {name for name, instance in keys if instance is not None}
+        if instanced:
+            columns_of = {config["Name"]: config["cols"] for config in read_file_fmt_table(path, block_size).values()}
+            for name in sorted(instanced):
+                if name in columns_of and INSTANCE_COL not in columns_of[name]:
+                    raise ValueError(f"{name} has no {INSTANCE_COL} column, give it as {name!r} without an instance")
+        readers = []
+        for name, instance in keys:
+            filters = {name: f"{INSTANCE_COL} == {int(instance)}"} if instance is not None else None
+            readers.append(StreamReader(block_size).messages(path, to_round, name, columns, filters))
+        yield from merge_by_time(readers)
+
+    def from_bin_columns(self, path: str, to_round: bool = False, wanted_types: list[str] | None = None,
+                         columns: dict[str, list[str]] | None = None, filters: dict[str, Filter] | None = None,
+                         decimate: dict[str, Decimation] | None = None, instances: dict[str, list[int]] | None = None,
+                         by_instance: bool = False, lazy_strings: bool = False) -> dict:
+        """
+        :param path: Path of a bin file.
+        :param decimate: Same as in from_bin, applied vectorised on the columns.
+        :param instances: Per message name, the I values to decode, e.g. {"IMU": [1]}; the messages of
+                          other instances are dropped from the offsets and never copied.
+        :param by_instance: Key the tables by (name, instance), instance None for types without I.
+        :param lazy_strings: Keep text columns as fixed-width bytes arrays, decoded on demand with
+                             business_logic.columnar_reader.decode_column.
+        :return: Per message name, a dict of NumPy column arrays (requires numpy).
+        """
+        tables = get_backend("normal").read_columns(path, to_round, wanted_types, columns, filters,
+                                                    instances, by_instance, lazy_strings)
+        if decimate and by_instance:
+            decimate = {key: decimate[key[0]] for key in tables if key[0] in decimate}
+        return decimate_columns(tables, decimate) if decimate else tables
+
+    def join_columns(self, path: str, base: str, others: list[str] | dict[str, list[str]], method: str = "backward",
+                     tolerance_us: int | None = None, instances: dict[str, int] | None = None,
+                     to_round: bool = False) -> dict:
+        """
+        Align other message types on the rows of ``base`` by TimeUS, e.g.
+        extractor.join_columns(path, "GPS", {"ATT": ["Roll", "Pitch"], "BARO": ["Alt"]}, method="linear").
+        :param method: "backward" (last sample at or before), "nearest" or "linear" (interpolated).
+        :param tolerance_us: Matches further away than this are left empty (NaN).
+        :param instances: Per message name, the I value to use (0 by default).
+        :return: The base columns and "<TYPE>.<column>" NumPy columns (requires numpy).
+        """
+        from business_logic.asof_join import join_asof
+
+        selected = {name: [instance] for name, instance in (instances or {}).items()}
+        tables = self.from_bin_columns(path, to_round, [base, *others], instances=selected)
+        return join_asof(tables, base, others, method, tolerance_us, instances)
 
+    async def afrom_bin(self, path: str, to_round: bool = False, wanted_type: str = "",
+                        columns: dict[str, list[str]] | None = None, filters: dict[str, Filter] | None = None,
+                        block_size: int = DEFAULT_BLOCK_SIZE, executor=None):
+        """
+        Async version of from_bin: ``async for msg in extractor.afrom_bin(path)``.
+        :param block_size: Bytes read per block; at most a few blocks are held in memory.
+        :param executor: Executor to decode blocks on (a thread by default, or a ProcessPoolExecutor).
+        """
+        from business_logic.async_reader import AsyncReader
 
-if __name__ == "__main__":
-    runners_mode = {RunMode.NORMAL, RunMode.MULTIPROCESS, RunMode.THREADS}
-    # runners_mode = {RunMode.MULTIPROCESS}
+        self._logger.info(f"Async decoding {path} in {block_size} byte blocks")
+        async for message in AsyncReader(block_size, executor=executor).messages(path, to_round, wanted_type,
+                                                                                  columns, filters):
+            yield message
+
+    async def afrom_bin_columns(self, path: str, to_round: bool = False, wanted_types: list[str] | None = None,
+                                columns: dict[str, list[str]] | None = None, filters: dict[str, Filter] | None = None,
+                                block_size: int = DEFAULT_BLOCK_SIZE, executor=None):
+        """
+        Async columnar variant, yields one {name: {column: ndarray}} dict per block.
+        """
+        from business_logic.async_reader import AsyncReader
 
-    for mode in runners_mode:
-        start = time.time()
+        async for tables in AsyncReader(block_size, executor=executor).column_batches(path, to_round, wanted_types,
+                                                                                       columns, filters):
+            yield tables
 
-        path = r"C:\Users\Menachem\Desktop\9900\Hafifa\log_file_test_01.bin"
-        coordinate_ex = MessagesExtractor()
+    def summarize(self, path: str) -> LogSummary:
+        """
+        :param path: Path of a bin file.
+        :return: Per-type counts, byte share, TimeUS span and corrupt gaps, without decoding payloads.
+        """
+        summary = summarize(path)
+        self._logger.info(f"Summarized {summary.message_count} messages, {summary.corrupt_bytes} corrupt bytes")
+        return summary
+
+    def aggregate(self, paths: str | list[str], spec: dict[str, list[str | Reducer]], to_round: bool = False,
+                  num_workers: int | None = None) -> dict:
+        """
+        Statistics over one or many bin files with one parallel scan, e.g.
+        extractor.aggregate(path, {"GPS.Alt": ["min", "max", "mean"], "*": ["count"]}).
+        :param spec: "TYPE.Field" -> reducers (count, sum, min, max, mean, first, last or Reducer objects),
+                     "TYPE" or "*" -> ["count"].
+        :return: Per spec key, {reducer name: result}; "*" gives {"count": {type: count}}.
+        """
+        result = aggregate(paths, spec, to_round, num_workers)
+        self._logger.info(f"Aggregated {len(result)} keys")
+        return result
+
+    def extract_track(self, path: str, instance: int = 0, min_status: int = 3):
+        """
+        :param path: Path of a bin file.
+        :param instance: GPS instance (the I column).
+        :param min_status: Minimal GPS Status (fix type), 3 is a 3D fix.
+        :return: NumPy (N, 2) array of (Lat, Lng) in degrees, only GPS messages are read (requires numpy).
+        """
+        from business_logic.track import extract_track
 
-        # counter = 0
-        [msg for msg in coordinate_ex.from_bin(path, True, run_mode=mode, num_workers=8, wanted_type="")]
-        # for  msg in coordinate_ex.from_bin(path, True, run_mode=mode, num_workers=8, wanted_type=""):
-        #     c = msg
-            # counter+=1
+        track = extract_track(path, instance, min_status)
+        self._logger.info(f"Extracted {len(track)} GPS points")
+        return track
 
-        # print(f"Got {counter} messages.")
-        end = time.time()
-        print(f"Elapsed time: {end - start:.6f} seconds, to run mode: {mode}")
+    def slice_log(self, src: str, dst: str, time_range: tuple[int | None, int | None] | None = None,
+                  types: list[str] | None = None) -> SliceReport:
+        """
+        Write a smaller bin file with the FMT messages and the selected messages copied byte for byte.
+        :param time_range: (start, end) TimeUS window, end excluded, None for an open side.
+        :param types: Message names to keep, all when None.
+        """
+        report = slice_log(src, dst, time_range, types)
+        self._logger.info(f"Wrote {report.messages} messages, {report.bytes_written} bytes to {dst}")
+        return report
+
+    def from_directory(self, directory: str, output_dir: str, to_round: bool = False, wanted_type: str = "",
+                       num_workers: int | None = None, unit_size: int = DEFAULT_UNIT_SIZE,
+                       pattern: str = "*.bin") -> BatchReport:
+        """
+        Decode every log of a directory on one process pool into <output_dir>/<stem>.jsonl.
+        :param unit_size: Files larger than this are split into chunks of about this size.
+        :return: Per-file message counts and timings; also written to <output_dir>/report.json.
+        """
+        scheduler = DirectoryScheduler(output_dir, num_workers, unit_size, pattern)
+        return scheduler.run(directory, to_round, wanted_type)
+
+
+if __name__ == "__main__":
+    from business_logic.cli import main
 
+    sys.exit(main())
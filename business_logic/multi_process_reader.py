@@ -1,34 +1,81 @@
 import time
-from logging import Logger
 
 from old_reader import Reader
 from utils.enums import MessageType
-from utils.chunk_splitter import ChunkSplitter
-from multiprocessing import Pool
+from business_logic.chunk_splitter import ChunkSplitter
+from business_logic.schema_cache import warm
+from business_logic.parallel_plan import (Calibration, CHUNKS_PER_WORKER, ParallelPlan, SERIAL_BELOW,
+                                          available_cpus, plan_parallel, pool_context)
+from business_logic.compressed import compression_of, frames, group_frames
+from business_logic.stream_reader import StreamReader
+from business_logic.worker import decode_chunk, decode_frames, read_frames_fmt
+from utils.logger import AppLogger
 
 
 
 
 class MultiProcessReader:
     GLOBAL_FMT = None
+    LAST_PLAN: ParallelPlan | None = None
 
     def __init__(self):
+        self._logger = AppLogger(self.__class__.__name__)
         self.reader = Reader()
         self.chunk_splitter = ChunkSplitter()
 
-    @staticmethod
-    def read_chunk_messages(num_chunk: int, data: bytes, to_round: bool, fmt_messages: dict, wanted_type : str):
-        reader = Reader()
-        reader.fmt_messages = fmt_messages
-        messages = []
+    # Run in the workers, see business_logic.worker.
+    read_chunk_messages = staticmethod(decode_chunk)
+    read_frames_fmt = staticmethod(read_frames_fmt)
+    read_frames_messages = staticmethod(decode_frames)
 
-        for msg in reader.read_messages(data, to_round, MessageType.ALL_MESSAGES, fmt_messages, wanted_type):
-            messages.append(msg)
-        # messages=[]
-        return num_chunk, messages
+    def process_compressed(self, file_path: str, num_workers: int | None, to_round: bool, wanted_type: str,
+                           columns=None, filters=None):
+        """Split a BGZF or multi-frame zstd log by frames; other compressed logs are streamed serially."""
+        frame_list = frames(file_path)
+        num_workers = num_workers or available_cpus()
+        if not frame_list or len(frame_list) < 2 or num_workers <= 1:
+            return list(StreamReader().messages(file_path, to_round, wanted_type, columns, filters))
+        ranges = group_frames(frame_list, num_workers * CHUNKS_PER_WORKER)
+        workers = min(num_workers, len(ranges))
+        MultiProcessReader.LAST_PLAN = ParallelPlan.fixed(frame_list[-1].end, workers)
+        with pool_context().Pool(workers) as pool:
+            # FMT messages are not always at the start, so every group is scanned before decoding.
+            fmt_messages = {}
+            for table in pool.starmap(self.read_frames_fmt, [(file_path, start, end) for start, end in ranges]):
+                for type_msg, config in table.items():
+                    fmt_messages.setdefault(type_msg, config)
+            results = pool.starmap(self.read_frames_messages,
+                                   [(num_chunk, file_path, start, end, to_round, fmt_messages, wanted_type,
+                                     columns, filters)
+                                    for num_chunk, (start, end) in enumerate(ranges)], chunksize=1)
+        results.sort(key=lambda x: x[0])
+        args = (to_round, fmt_messages, wanted_type, columns, filters)
+        all_messages = []
+        carry = b""
+        for _, head, messages, tail in results:
+            carry += head
+            if messages is None:
+                continue
+            all_messages.extend(self.read_chunk_messages(0, carry, *args)[1])
+            all_messages.extend(messages)
+            carry = tail
+        all_messages.extend(self.read_chunk_messages(0, carry, *args)[1])
+        return all_messages
 
-    def process_in_parallel(self, file_path: str, num_workers: int, to_round : bool, wanted_type :str):
+    def plan(self, data: bytes, to_round: bool, num_workers: int | None = None) -> ParallelPlan:
+        """Worker and chunk counts for ``data``; adaptive when ``num_workers`` is None."""
+        if num_workers is not None:
+            return ParallelPlan.fixed(len(data), num_workers)
+        calibration = None
+        if len(data) >= SERIAL_BELOW:
+            calibration = Calibration.measure(data, self.reader.fmt_messages, to_round)
+        return plan_parallel(len(data), calibration)
+
+    def process_in_parallel(self, file_path: str, num_workers: int | None, to_round : bool, wanted_type :str, columns=None, filters=None):
+        if compression_of(file_path):
+            return self.process_compressed(file_path, num_workers, to_round, wanted_type, columns, filters)
         a = time.time()
+        start = time.perf_counter()
         with open(file_path, "rb") as file:
             # import mmap
             # data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
@@ -36,20 +83,27 @@ class MultiProcessReader:
             for _ in self.reader.read_messages(data=data, to_round=to_round, message_type_to_read=MessageType.FMT_MESSAGE):
                 pass
         fmt_messages = self.reader.fmt_messages
-        chunks: dict = self.chunk_splitter.split(file_path, data, num_workers, fmt_messages)
-        combine = [(num_chunk, chunk_data, to_round, fmt_messages, wanted_type) for num_chunk, chunk_data in chunks.items()]
-        print(time.time() - a ,"sec, to read FMT, and split to chunks.")
-        with Pool(num_workers) as pool:
+        plan = MultiProcessReader.LAST_PLAN = self.plan(data, to_round, num_workers)
+        if plan.serial:
+            _, all_messages = self.read_chunk_messages(0, data, to_round, fmt_messages, wanted_type, columns, filters)
+            plan.actual_seconds = time.perf_counter() - start
+            self._logger.debug(str(plan))
+            return all_messages
+        chunks: dict = self.chunk_splitter.split(file_path, data, plan.chunks, fmt_messages)
+        combine = [(num_chunk, chunk_data, to_round, fmt_messages, wanted_type, columns, filters) for num_chunk, chunk_data in chunks.items()]
+        self._logger.debug(f"{time.time() - a:.3f} sec, to read FMT, and split to chunks.")
+        with pool_context().Pool(plan.workers, initializer=warm, initargs=(fmt_messages, to_round)) as pool:
             a = time.time()
-            results = pool.starmap(self.read_chunk_messages, combine)
+            results = pool.starmap(self.read_chunk_messages, combine, chunksize=1)
             b = time.time()
-            print(b - a, "sec, only calc")
+            self._logger.debug(f"{b - a:.3f} sec, only calc")
             results.sort(key=lambda x: x[0])
             all_messages = []
             for result in results:
                 list_msg = result[1]
                 all_messages.extend(list_msg)
             c = time.time()
-            print(c - b, "sec, to sort")
-        # print(len(all_messages))
-        return all_messages
\ No newline at end of file
+            self._logger.debug(f"{c - b:.3f} sec, to sort")
+        plan.actual_seconds = time.perf_counter() - start
+        self._logger.debug(str(plan))
+        return all_messages
@@ -2,7 +2,9 @@ import time
 from concurrent.futures.thread import ThreadPoolExecutor
 from business_logic.old_reader import Reader
 from utils.enums import MessageType
-from utils.chunk_splitter import ChunkSplitter
+from business_logic.chunk_splitter import ChunkSplitter
+from business_logic.compressed import compression_of
+from business_logic.stream_reader import StreamReader
 
 
 
@@ -16,18 +18,21 @@ class ThreadReader:
         # self.logger = Logger(__class__.__name__)
 
     @staticmethod
-    def _read_chunk_messages(num_chunk: int, data: bytes, to_round: bool, fmt_messages: dict, type_wanted : str, structs=None):
+    def _read_chunk_messages(num_chunk: int, data: bytes, to_round: bool, fmt_messages: dict, type_wanted : str, structs=None, columns=None, filters=None):
         reader = Reader()
         # for type_msg, msg_config in fmt_messages.items():
         #     reader._compile_processing(type_msg, msg_config["Format"], msg_config["cols"])
         # print(f"Thread num: {num_chunk} start to work.")
         messages = []
         reader._structs = structs
-        for msg in reader.read_messages(data, to_round, MessageType.ALL_MESSAGES, fmt_messages, type_wanted):
+        for msg in reader.read_messages(data, to_round, MessageType.ALL_MESSAGES, fmt_messages, type_wanted, columns, filters):
             messages.append(msg)
         return num_chunk, messages
 
-    def process_in_parallel(self, file_path: str, num_workers: int, to_round : bool, wanted_type):
+    def process_in_parallel(self, file_path: str, num_workers: int, to_round : bool, wanted_type, columns=None, filters=None):
+        if compression_of(file_path):
+            # Chunks are cut at offsets of the file itself; threads gain nothing over the prefetching stream here.
+            return list(StreamReader().messages(file_path, to_round, wanted_type, columns, filters))
         a = time.time()
         with open(file_path, "rb") as file:
             data = file.read()
@@ -36,7 +41,7 @@ class ThreadReader:
         fmt_messages = self.reader.fmt_messages
         structs = self.reader._structs
         chunks: dict = self.chunk_splitter.split(file_path, data, num_workers, fmt_messages)
-        combine = [(num_chunk, chunk_data, to_round, fmt_messages, wanted_type, structs) for num_chunk, chunk_data in chunks.items()]
+        combine = [(num_chunk, chunk_data, to_round, fmt_messages, wanted_type, structs, columns, filters) for num_chunk, chunk_data in chunks.items()]
         print(time.time() - a ,"sec, to read FMT, and split to chunks.")
 
         with ThreadPoolExecutor(max_workers=num_workers) as executor:
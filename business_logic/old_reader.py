@@ -10,8 +10,11 @@ import sys
 from typing import Any, Generator
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils.logger import AppLogger
 from utils.enums import MessageType
+from business_logic.predicates import Filter, compile_row_filter, filter_columns
+from business_logic.resync import find_header, message_lengths
+from business_logic.schema_cache import (ROUND, SCALE_100, STRING, STRING_DECODERS, TYPE_MAP, compile_struct,
+                                         decoder_for, schema_for, text_columns)
 
 
 class Reader:
@@ -20,28 +23,30 @@ class Reader:
     HEADER = b'\xA3\x95'
     FMT_MSG_LENGTH = 89
 
-    TYPE_MAP = {
-        'a': '32h', 'b': 'b', 'B': 'B', 'h': 'h', 'H': 'H', 'i': 'i', 'I': 'I',
-        'f': 'f', 'd': 'd', 'n': '4s', 'N': '16s', 'Z': '64s', 'c': 'h', 'C': 'H',
-        'e': 'i', 'E': 'I', 'L': 'i', 'M': 'B', 'q': 'q', 'Q': 'Q',
-    }
+    TYPE_MAP = TYPE_MAP
+    SCALE_100 = SCALE_100
+    STRING = STRING
+    ROUND = ROUND
 
-    SCALE_100 = frozenset({'c', 'C', 'e', 'E'})
-    STRING = frozenset({'n', 'N', 'Z'})
-    ROUND = frozenset({
-        'Lat', 'Lng', 'TLat', 'TLng', 'Pitch', 'IPE', 'Yaw', 'IPN', 'IYAW',
-        'DesPitch', 'NavPitch', 'Temp', 'AltE', 'VDop', 'VAcc', 'Roll',
-        'HAGL', 'SM', 'VWN', 'VWE', 'IVT', 'SAcc', 'TAW', 'IPD', 'ErrRP',
-        'SVT', 'SP', 'TAT', 'GZ', 'HDop', 'NavRoll', 'NavBrg', 'TAsp',
-        'HAcc', 'DesRoll', 'SH', 'TBrg', 'AX'
-    })
-
-    __slots__ = ('logger', 'fmt_messages', '_structs')
+    __slots__ = ('_logger', 'fmt_messages', '_structs', '_layouts', 'stopped_at', 'resyncing', 'skipped')
 
     def __init__(self) -> None:
-        self.logger = AppLogger(self.__class__.__name__)
+        self._logger = None
         self.fmt_messages = {}
         self._structs = {}
+        self._layouts = {}
+        self.stopped_at = 0
+        self.resyncing = False
+        self.skipped = []
+
+    @property
+    def logger(self):
+        """Created on first use: readers are made per block and per chunk and rarely log."""
+        if self._logger is None:
+            from utils.logger import AppLogger
+
+            self._logger = AppLogger(self.__class__.__name__)
+        return self._logger
 
     @staticmethod
     def decode_msg(data: memoryview) -> str:
@@ -66,18 +71,65 @@ class Reader:
             "cols": fmt_cols.split(",")
         }
 
-        self.fmt_messages[fmt_type] = msg_config
+        # Shared compiled struct; a KeyError here leaves the table untouched
+        self._structs[fmt_type] = compile_struct(fmt_format)
 
-        # Pre-compile struct once
-        fmt_str = '<' + ''.join(self.TYPE_MAP[t] for t in fmt_format)
-        self._structs[fmt_type] = struct.Struct(fmt_str)
+        self.fmt_messages[fmt_type] = msg_config
 
         return msg_config
     def compile_all_structs(self) -> None:
         """Compile struct formats for all known message types."""
-        for type_msg, msg_config in self.fmt_messages.items():
-            fmt_str = '<' + ''.join(self.TYPE_MAP[t] for t in msg_config["Format"])
-            self._structs[type_msg] = struct.Struct(fmt_str)
+        self._structs = dict(schema_for(self.fmt_messages).structs)
+
+    def compile_projection(self, msg_config: dict, wanted_cols: list[str]) -> tuple[dict, struct.Struct]:
+        """Narrowed config and struct that unpack only ``wanted_cols``.
+
+        Unwanted fields become pad bytes, so they are skipped by ``unpack_from``
+        without creating any Python object. Columns keep their FMT order.
+        """
+        unknown = set(wanted_cols) - set(msg_config["cols"])
+        if unknown:
+            raise ValueError(f"{msg_config['Name']} has no columns {sorted(unknown)}")
+
+        fmt_str = '<'
+        kept_format = ''
+        kept_cols = []
+        pad = 0
+        for t, col in zip(msg_config["Format"], msg_config["cols"]):
+            code = self.TYPE_MAP[t]
+            if col in wanted_cols:
+                fmt_str += (f'{pad}x' if pad else '') + code
+                pad = 0
+                kept_format += t
+                kept_cols.append(col)
+            else:
+                pad += struct.calcsize('<' + code)
+        fmt_str += f'{pad}x' if pad else ''
+        projected = dict(msg_config, Format=kept_format, cols=kept_cols)
+        return projected, struct.Struct(fmt_str)
+
+    def compile_layout(self, msg_config: dict, wanted_cols: list[str] | None,
+                       message_filter: Filter | None) -> tuple[dict, struct.Struct, Any, list[str]]:
+        """Config, struct, row predicate and filter-only columns for one type.
+
+        Columns a filter reads are unpacked even when not requested and removed
+        from the message afterwards. Callable filters receive the unpacked
+        tuple in the order of the returned config's ``cols``.
+        """
+        dropped = []
+        if wanted_cols:
+            needed = list(wanted_cols)
+            for col in filter_columns(message_filter) if message_filter else []:
+                if col not in needed:
+                    needed.append(col)
+                    dropped.append(col)
+            config, unpacker = self.compile_projection(msg_config, needed)
+        else:
+            config, unpacker = msg_config, self._structs[msg_config["Type"]]
+        predicate = None
+        if message_filter:
+            predicate = compile_row_filter(message_filter, config["cols"], msg_config["Name"], text_columns(config))
+        return config, unpacker, predicate, dropped
 
     def is_new_message(self, data: memoryview, pos: int) -> bool:
         """Check if valid message header exists at position."""
@@ -88,49 +140,143 @@ class Reader:
 
     def read_messages(self, data: bytes | memoryview, to_round: bool,
                       message_type_to_read: MessageType = MessageType.ALL_MESSAGES,
-                      fmt_messages=None, wanted_type: str = "") -> Generator[dict, None, None]:
-        """Yield messages from binary data."""
+                      fmt_messages=None, wanted_type: str = "",
+                      columns: dict[str, list[str]] | None = None,
+                      filters: dict[str, Filter] | None = None, *, final: bool = True,
+                      resync: bool = False) -> Generator[dict, None, None]:
+        """Yield messages from binary data.
+
+        ``columns`` maps a message name to the only columns to decode for it,
+        e.g. ``{"GPS": ["TimeUS", "Lat", "Lng"]}``; other types are decoded fully.
+        ``filters`` maps a message name to an expression such as
+        ``"I == 1 and Status >= 3"`` or a callable, evaluated on the raw
+        unpacked tuple; rejected messages are never converted to dicts.
+
+        Block readers pass ``final=False`` for a block that more data follows:
+        a resync candidate whose next header is past the end of the block is
+        then not trusted, decoding stops before it with ``resyncing`` set,
+        and the next block is decoded with ``resync=True`` so the candidate
+        is checked again with the data that follows it.
+        """
         pos = 0
         data_len = len(data)
-        if isinstance(data, bytes):
-            data = memoryview(data)
+        # Resync searches in place; a memoryview has no find, copy it once.
+        buffer = data if hasattr(data, "find") else bytes(data)
+        data = memoryview(buffer)
         if fmt_messages is not None:
             self.fmt_messages = fmt_messages
-        if not self._structs:
             self.compile_all_structs()
+        elif not self._structs:
+            self.compile_all_structs()
+        structs = self._structs
+        decoders = {}
+        lengths = message_lengths(self.fmt_messages, self.FMT_MSG_LENGTH)
 
         read_fmt = message_type_to_read in {MessageType.ALL_MESSAGES, MessageType.FMT_MESSAGE}
         read_data = message_type_to_read in {MessageType.ALL_MESSAGES, MessageType.DATA_MESSAGE}
         filter_type = bool(wanted_type)
+        columns = columns or {}
+        filters = filters or {}
+        custom_types = set(columns) | set(filters)
+        self._layouts = {}
+
+        # Where decoding stopped: a message cut by the end of ``data`` is not
+        # decoded, so block readers carry ``data[stopped_at:]`` over.
+        self.stopped_at = data_len
+        self.resyncing = False
+        # Byte ranges dropped while resynchronising, as (start, end).
+        self.skipped = []
 
         while pos < data_len:
-            if not self.is_new_message(data, pos):
-                next_head = bytes(data[pos:]).find(self.HEADER)
+            if resync or pos + 3 > data_len or data[pos] != 0xA3 or data[pos + 1] != 0x95 \
+                    or not lengths[data[pos + 2]]:
+                if pos + 3 > data_len and not resync:
+                    self.stopped_at = pos
+                    break
+                next_head = find_header(buffer, pos if resync else pos + 1, data_len, lengths)
+                resync = False
                 if next_head == -1:
+                    self._skip(pos, data_len)
+                    if data[data_len - 1] == 0xA3:
+                        self.stopped_at = data_len - 1
+                    self.resyncing = True
+                    break
+                if not final and (next_head + 3 > data_len or
+                                  next_head + lengths[data[next_head + 2]] + 2 > data_len):
+                    self._skip(pos, next_head)
+                    self.stopped_at = next_head
+                    self.resyncing = True
+                    break
+                self._skip(pos, next_head)
+                pos = next_head
+                if pos + 3 > data_len:  # an unchecked header at the very end of the data
+                    self.stopped_at = pos
                     break
-                pos += next_head
                 continue
 
             type_msg = data[pos + 2]
 
             if type_msg == 0x80:  # FMT message
+                if pos + self.FMT_MSG_LENGTH > data_len:
+                    self.stopped_at = pos
+                    break
+                # Always register the format, later data messages depend on it.
+                try:
+                    msg_config = self.read_fmt_massage(data, pos)
+                except KeyError:  # Format letters outside TYPE_MAP, not a real FMT
+                    self._skip(pos, pos + 1)
+                    pos += 1
+                    continue
+                if msg_config["Length"] >= 3:
+                    lengths[msg_config["Type"]] = msg_config["Length"]
+                decoders.pop(msg_config["Type"], None)
                 if read_fmt and (not filter_type or wanted_type == "FMT"):
-                    yield self.read_fmt_massage(data, pos)
+                    yield msg_config
                 pos += self.FMT_MSG_LENGTH
             else:  # Data message
                 msg_config = self.fmt_messages[type_msg]
+                if pos + msg_config["Length"] > data_len:
+                    self.stopped_at = pos
+                    break
                 if read_data and (not filter_type or wanted_type == msg_config["Name"]):
-                    yield self._parse_data_msg(data, msg_config, pos + 3, to_round)
+                    if custom_types and msg_config["Name"] in custom_types:
+                        layout = self._layouts.get(type_msg)
+                        if layout is None:
+                            name = msg_config["Name"]
+                            layout = self.compile_layout(msg_config, columns.get(name), filters.get(name))
+                            layout = self._layouts[type_msg] = (*layout, decoder_for(layout[0], to_round))
+                        _, unpacker, predicate, dropped, decode = layout
+                        values = unpacker.unpack_from(data, pos + 3)
+                        if predicate is None or predicate(values):
+                            message = decode(values)
+                            for col in dropped:
+                                del message[col]
+                            yield message
+                    else:
+                        decode = decoders.get(type_msg)
+                        if decode is None:
+                            decode = decoders[type_msg] = decoder_for(msg_config, to_round)
+                        yield decode(structs[type_msg].unpack_from(data, pos + 3))
                 pos += msg_config["Length"]
 
+    def _skip(self, start: int, end: int) -> None:
+        """Record a dropped byte range, merging it with an adjacent previous one."""
+        if start == end:
+            return
+        if self.skipped and self.skipped[-1][1] == start:
+            start = self.skipped.pop()[0]
+        self.skipped.append((start, end))
+
     def _parse_data_msg(self, payload: memoryview, msg_config: dict,
                         offset: int, to_round: bool) -> dict:
         """Parse data message efficiently."""
+        values = self._structs[msg_config["Type"]].unpack_from(payload, offset)
+        return self._build_msg(values, msg_config, to_round)
+
+    def _build_msg(self, values: tuple, msg_config: dict, to_round: bool) -> dict:
+        """Scale, round and decode unpacked values into a message dict."""
         format_msg = msg_config["Format"]
         cols = msg_config["cols"]
-        type_msg = msg_config["Type"]
-
-        values = self._structs[type_msg].unpack_from(payload, offset)
         result = {"mavpackettype": msg_config["Name"]}
 
         scale_100 = self.SCALE_100
@@ -146,7 +292,7 @@ class Reader:
                 if to_round and col in round_set:
                     val = round(val, 7)
             elif t in string_set and col != "Data":
-                val = val.partition(b'\x00')[0].decode('ascii', errors='ignore')
+                val = STRING_DECODERS[t](val)
             elif t == 'L':
                 val *= 1e-7
                 if to_round and col in round_set:
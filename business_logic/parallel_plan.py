@@ -0,0 +1,125 @@
+"""Worker and chunk counts for the process pool reader.
+
+The cost of a parallel run is modelled from a quick calibration on a slice
+of the file: decoding scales with the number of workers, while pool startup
+and sending the decoded messages back to the parent do not. The plan with
+the lowest predicted time wins, which is the serial reader for small files
+or when only one CPU is available.
+"""
+
+import os
+import pickle
+import sys
+import time
+from dataclasses import dataclass
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.old_reader import Reader
+
+# Files below this size are decoded serially without calibrating.
+SERIAL_BELOW = 4 * 1024 * 1024
+SAMPLE_SIZE = 1024 * 1024
+POOL_STARTUP_SECONDS = 0.1
+WORKER_STARTUP_SECONDS = 0.02
+# More chunks than workers so a slow chunk does not hold up the whole run.
+CHUNKS_PER_WORKER = 4
+MIN_CHUNK_SIZE = 1024 * 1024
+# Start method of the process pools, the platform default when None.
+START_METHOD = os.environ.get("BIN_READER_START_METHOD") or None
+# Imported once by the forkserver, so each forked worker starts with the decoder loaded.
+FORKSERVER_PRELOAD = ["business_logic.worker"]
+
+
+def set_start_method(method: str | None) -> None:
+    """Start method of the pools created from now on: ``fork``, ``spawn``, ``forkserver`` or None."""
+    import multiprocessing
+
+    global START_METHOD
+    if method is not None and method not in multiprocessing.get_all_start_methods():
+        raise ValueError(f"Unsupported start method {method!r}, expected one of {multiprocessing.get_all_start_methods()}")
+    START_METHOD = method
+
+
+def pool_context():
+    """Multiprocessing context for :data:`START_METHOD`, with the forkserver preload set."""
+    import multiprocessing
+
+    context = multiprocessing.get_context(START_METHOD)
+    if context.get_start_method() == "forkserver":
+        context.set_forkserver_preload(FORKSERVER_PRELOAD)
+    return context
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, honouring affinity masks where supported."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+@dataclass
+class Calibration:
+    """Measured seconds per input byte."""
+
+    decode: float
+    transfer: float
+
+    @classmethod
+    def measure(cls, data: bytes, fmt_messages: dict, to_round: bool, sample_size: int = SAMPLE_SIZE) -> "Calibration":
+        """Decode and pickle round-trip a slice from the middle of ``data``."""
+        start = max(0, len(data) // 2 - sample_size // 2)
+        sample = data[start:start + sample_size]
+        begin = time.perf_counter()
+        messages = list(Reader().read_messages(sample, to_round, fmt_messages=fmt_messages))
+        decoded = time.perf_counter()
+        pickle.loads(pickle.dumps(messages, pickle.HIGHEST_PROTOCOL))
+        transferred = time.perf_counter()
+        size = max(len(sample), 1)
+        return cls((decoded - begin) / size, (transferred - decoded) / size)
+
+
+@dataclass
+class ParallelPlan:
+    """Chosen layout of a run, its predicted and, once run, actual duration."""
+
+    size: int
+    cpus: int
+    workers: int
+    chunks: int
+    predicted_seconds: float | None = None
+    serial_seconds: float | None = None
+    actual_seconds: float | None = None
+
+    @property
+    def serial(self) -> bool:
+        return self.workers <= 1
+
+    @classmethod
+    def fixed(cls, size: int, num_workers: int) -> "ParallelPlan":
+        """Plan for an explicit worker count: one chunk per worker, nothing predicted."""
+        return cls(size, available_cpus(), num_workers, num_workers)
+
+    def __str__(self) -> str:
+        layout = "serial" if self.serial else f"{self.workers} workers, {self.chunks} chunks"
+        predicted = f"{self.predicted_seconds:.2f}s" if self.predicted_seconds is not None else "-"
+        actual = f"{self.actual_seconds:.2f}s" if self.actual_seconds is not None else "-"
+        return f"{self.size / 1e6:.1f} MB on {self.cpus} CPUs: {layout}, predicted {predicted}, actual {actual}"
+
+
+def predict_seconds(size: int, workers: int, calibration: Calibration) -> float:
+    if workers <= 1:
+        return size * calibration.decode
+    return (POOL_STARTUP_SECONDS + workers * WORKER_STARTUP_SECONDS
+            + size * calibration.decode / workers + size * calibration.transfer)
+
+
+def plan_parallel(size: int, calibration: Calibration | None, max_workers: int | None = None) -> ParallelPlan:
+    """Fastest predicted layout for ``size`` bytes; serial without a calibration."""
+    cpus = available_cpus()
+    if calibration is None or size < SERIAL_BELOW:
+        return ParallelPlan(size, cpus, 1, 1)
+    limit = min(max_workers or cpus, cpus, max(1, size // MIN_CHUNK_SIZE))
+    workers = min(range(1, limit + 1), key=lambda count: predict_seconds(size, count, calibration))
+    chunks = 1 if workers == 1 else max(workers, min(workers * CHUNKS_PER_WORKER, size // MIN_CHUNK_SIZE))
+    return ParallelPlan(size, cpus, workers, chunks, predict_seconds(size, workers, calibration),
+                        predict_seconds(size, 1, calibration))
@@ -0,0 +1,151 @@
+"""Message filters evaluated on raw (unscaled) field values.
+
+A filter is either an expression over column names, such as
+``"I == 1 and Status >= 3"``, or a callable. Expressions are compiled once
+per message type into a function of the unpacked ``struct`` tuple, and for
+the columnar path into a vectorised mask over column arrays.
+
+Values are the raw ones: ``Lat`` is the integer in 1e-7 degrees and ``c``
+fields are in hundredths. Text columns are ``bytes`` cut at the first NUL,
+as they are decoded, on both paths; callables get the NUL-padded fields.
+"""
+
+import ast
+from typing import Any, Callable, Iterable
+
+Filter = str | Callable[..., Any]
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.FloorDiv, ast.BitAnd, ast.BitOr,
+    ast.Name, ast.Load, ast.Constant, ast.Tuple, ast.List,
+)
+
+
+def parse_filter(expression: str) -> tuple[ast.Expression, list[str]]:
+    """Parse and validate a filter expression, returning it and its column names."""
+    tree = ast.parse(expression, mode="eval")
+    names = []
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in filter {expression!r}: {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id not in names:
+            names.append(node.id)
+    return tree, names
+
+
+def filter_columns(message_filter: Filter) -> list[str]:
+    """Columns an expression filter reads; callables see every column."""
+    if callable(message_filter):
+        return []
+    return parse_filter(message_filter)[1]
+
+
+class _ToTupleAccess(ast.NodeTransformer):
+    """Rewrites ``Name`` into ``v[index]``, and text columns into ``v[index].partition(b'\\x00')[0]``."""
+
+    def __init__(self, cols: list[str], strings: Iterable[str] = ()) -> None:
+        self.index = {col: i for i, col in enumerate(cols)}
+        self.strings = set(strings)
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        value = ast.Subscript(ast.Name("v", ast.Load()), ast.Constant(self.index[node.id]), ast.Load())
+        if node.id in self.strings:
+            partition = ast.Call(ast.Attribute(value, "partition", ast.Load()), [ast.Constant(b"\x00")], [])
+            value = ast.Subscript(partition, ast.Constant(0), ast.Load())
+        return ast.copy_location(value, node)
+
+
+class _ToMask(ast.NodeTransformer):
+    """Rewrites boolean logic into element-wise NumPy operators."""
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        result = node.values[0]
+        for value in node.values[1:]:
+            result = ast.BinOp(result, op, value)
+        return ast.copy_location(result, node)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            # Not ``~``: that is a bitwise NOT on integer columns.
+            return ast.copy_location(ast.Call(ast.Name("logical_not", ast.Load()), [node.operand], []), node)
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        self.generic_visit(node)
+        parts = []
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                part = ast.Call(ast.Name("isin", ast.Load()), [left, right], [])
+                if isinstance(op, ast.NotIn):
+                    part = ast.UnaryOp(ast.Invert(), part)
+            else:
+                part = ast.Compare(left, [op], [right])
+            parts.append(part)
+            left = right
+        result = parts[0]
+        for part in parts[1:]:
+            result = ast.BinOp(result, ast.BitAnd(), part)
+        return ast.copy_location(result, node)
+
+
+def _check_columns(names: list[str], cols: list[str], type_name: str) -> None:
+    unknown = [name for name in names if name not in cols]
+    if unknown:
+        raise ValueError(f"{type_name} has no columns {unknown}")
+
+
+def compile_row_filter(message_filter: Filter, cols: list[str], type_name: str = "",
+                       strings: Iterable[str] = ()) -> Callable[[tuple], bool]:
+    """Function of the unpacked tuple, whose fields are laid out as ``cols``.
+
+    ``strings`` are the text columns. Callables are returned unchanged and
+    receive the tuple themselves.
+    """
+    if callable(message_filter):
+        return message_filter
+    tree, names = parse_filter(message_filter)
+    _check_columns(names, cols, type_name)
+    body = _ToTupleAccess(cols, strings).visit(tree).body
+    function = ast.Expression(ast.Lambda(
+        ast.arguments(posonlyargs=[], args=[ast.arg("v")], kwonlyargs=[], kw_defaults=[], defaults=[]), body))
+    return eval(compile(ast.fix_missing_locations(function), f"<filter {type_name}>", "eval"), {})
+
+
+def _cut_at_nul(values: Any) -> Any:
+    """``S`` array with every value cut at its first NUL, done once per distinct value."""
+    import numpy as np
+
+    unique, inverse = np.unique(values, return_inverse=True)
+    cut = np.array([value.partition(b"\x00")[0] for value in unique.tolist()], dtype=values.dtype)
+    return cut[inverse]
+
+
+def compile_mask_filter(message_filter: Filter, cols: list[str], type_name: str = "",
+                        strings: Iterable[str] = ()) -> Callable[[dict], Any]:
+    """Function of ``{column: raw ndarray}`` returning a boolean mask.
+
+    ``strings`` are the text columns. Callables are returned unchanged and
+    receive that dict themselves.
+    """
+    if callable(message_filter):
+        return message_filter
+    import numpy as np
+
+    tree, names = parse_filter(message_filter)
+    _check_columns(names, cols, type_name)
+    code = compile(ast.fix_missing_locations(_ToMask().visit(tree)), f"<filter {type_name}>", "eval")
+    cut = [name for name in names if name in set(strings)]
+
+    def mask(columns: dict) -> Any:
+        values = {name: columns[name] for name in names}
+        for name in cut:
+            values[name] = _cut_at_nul(values[name])
+        return eval(code, {"isin": np.isin, "logical_not": np.logical_not}, values)
+
+    return mask
@@ -0,0 +1,45 @@
+"""Recovery of message alignment in damaged BIN data.
+
+After a reader loses sync it looks for the next ``A3 95`` header. On
+corrupted data such a pair also shows up inside payloads, so a candidate is
+only accepted when its type has a known length and another header follows
+right after it. Every candidate costs O(1) and the search moves forward only,
+so a resync scan is linear in the number of bytes it skips.
+"""
+
+HEADER = b'\xA3\x95'
+FMT_TYPE = 0x80
+MIN_LENGTH = 3
+
+
+def message_lengths(fmt_messages: dict, fmt_length: int) -> list[int]:
+    """Length per type id (0 when unknown), indexable by the raw type byte."""
+    lengths = [0] * 256
+    for type_msg, msg_config in fmt_messages.items():
+        if msg_config["Length"] >= MIN_LENGTH:
+            lengths[type_msg] = msg_config["Length"]
+    lengths[FMT_TYPE] = fmt_length
+    return lengths
+
+
+def find_header(data: bytes | bytearray, start: int, end: int, lengths: list[int]) -> int:
+    """First plausible message start in ``data[start:end]``, or -1.
+
+    ``data`` must support ``find`` (bytes, bytearray or mmap), the search is
+    done in place. A candidate is accepted when the next header starts at
+    ``candidate + Length``, or when that position is too close to ``end`` to
+    tell; the latter lets block readers carry a cut message over. A header
+    too short to hold a type byte is returned as is for the same reason.
+    """
+    find = data.find
+    pos = find(HEADER, start, end)
+    while pos != -1:
+        if pos + 3 > end:
+            return pos
+        length = lengths[data[pos + 2]]
+        if length:
+            following = pos + length
+            if following + 2 > end or (data[following] == 0xA3 and data[following + 1] == 0x95):
+                return pos
+        pos = find(HEADER, pos + 1, end)
+    return -1
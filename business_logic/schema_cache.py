@@ -0,0 +1,174 @@
+"""Process-wide cache of compiled message schemas.
+
+Logs from one firmware share their FMT table, so structs, message decoders
+and NumPy dtypes are compiled once per process and reused by every reader,
+chunk and file. Single definitions are cached by their content
+(``compile_struct``, ``compile_decoder``); whole tables by a hash of their
+definitions (``schema_for``). Tables can be saved to disk and loaded into a
+fresh process, e.g. a pool initializer, with ``load_schemas``/``warm``.
+
+String fields are decoded through bounded LRU caches keyed by their raw
+bytes: PARM, MSG and EV names repeat thousands of times in a log, and every
+repetition gets the same ``str`` object instead of a new one.
+"""
+
+import hashlib
+import json
+import struct
+import sys
+from functools import lru_cache
+from typing import Callable
+
+TYPE_MAP = {
+    'a': '32h', 'b': 'b', 'B': 'B', 'h': 'h', 'H': 'H', 'i': 'i', 'I': 'I',
+    'f': 'f', 'd': 'd', 'n': '4s', 'N': '16s', 'Z': '64s', 'c': 'h', 'C': 'H',
+    'e': 'i', 'E': 'I', 'L': 'i', 'M': 'B', 'q': 'q', 'Q': 'Q',
+}
+SCALE_100 = frozenset({'c', 'C', 'e', 'E'})
+STRING = frozenset({'n', 'N', 'Z'})
+ROUND = frozenset({
+    'Lat', 'Lng', 'TLat', 'TLng', 'Pitch', 'IPE', 'Yaw', 'IPN', 'IYAW',
+    'DesPitch', 'NavPitch', 'Temp', 'AltE', 'VDop', 'VAcc', 'Roll',
+    'HAGL', 'SM', 'VWN', 'VWE', 'IVT', 'SAcc', 'TAW', 'IPD', 'ErrRP',
+    'SVT', 'SP', 'TAT', 'GZ', 'HDop', 'NavRoll', 'NavBrg', 'TAsp',
+    'HAcc', 'DesRoll', 'SH', 'TBrg', 'AX'
+})
+
+Decoder = Callable[[tuple], dict]
+
+STRING_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=STRING_CACHE_SIZE)
+def decode_name(raw: bytes) -> str:
+    """Text of a NUL padded ``n``/``N`` field, interned: names come from a small set."""
+    return sys.intern(raw.partition(b'\x00')[0].decode('ascii', errors='ignore'))
+
+
+@lru_cache(maxsize=STRING_CACHE_SIZE)
+def decode_text(raw: bytes) -> str:
+    """Text of a NUL padded ``Z`` field; cached but not interned, free text is often unique."""
+    return raw.partition(b'\x00')[0].decode('ascii', errors='ignore')
+
+
+STRING_DECODERS = {'n': decode_name, 'N': decode_name, 'Z': decode_text}
+
+
+def text_columns(msg_config: dict) -> list[str]:
+    """Columns decoded as text: the ``n``/``N``/``Z`` fields but a raw ``Data`` payload."""
+    return [col for t, col in zip(msg_config["Format"], msg_config["cols"]) if t in STRING and col != "Data"]
+
+
+@lru_cache(maxsize=None)
+def compile_struct(fmt_format: str) -> struct.Struct:
+    """Little-endian struct of a FMT ``Format`` string; KeyError on unknown letters."""
+    return struct.Struct('<' + ''.join(TYPE_MAP[t] for t in fmt_format))
+
+
+@lru_cache(maxsize=None)
+def compile_decoder(name: str, fmt_format: str, cols: tuple[str, ...], to_round: bool) -> Decoder:
+    """Function turning an unpacked tuple into the message dict.
+
+    Generated once per definition with the scaling, rounding and string
+    handling of ``Reader._build_msg`` unrolled, so no per-field branching is
+    left at decode time. Results are identical to ``_build_msg``.
+    """
+    items = [f"'mavpackettype': {name!r}"]
+    for i, (t, col) in enumerate(zip(fmt_format, cols)):
+        value = f"v[{i}]"
+        if t in SCALE_100 or t == 'L':
+            value = f"{value} * {'0.01' if t != 'L' else '1e-7'}"
+            if to_round and col in ROUND:
+                value = f"round({value}, 7)"
+        elif t in STRING and col != "Data":
+            value = f"{'decode_text' if t == 'Z' else 'decode_name'}({value})"
+        items.append(f"{col!r}: {value}")
+    source = "def decode(v):\n    return {" + ", ".join(items) + "}\n"
+    namespace = {}
+    exec(compile(source, f"<decoder {name}>", "exec"),
+         {"round": round, "decode_name": decode_name, "decode_text": decode_text}, namespace)
+    return namespace["decode"]
+
+
+def decoder_for(msg_config: dict, to_round: bool) -> Decoder:
+    return compile_decoder(msg_config["Name"], msg_config["Format"], tuple(msg_config["cols"]), to_round)
+
+
+def fmt_key(fmt_messages: dict) -> str:
+    """Hash of the definitions of a FMT table, independent of dict order."""
+    digest = hashlib.sha1()
+    for type_msg in sorted(fmt_messages):
+        msg_config = fmt_messages[type_msg]
+        digest.update(f"{type_msg}|{msg_config['Name']}|{msg_config['Length']}|"
+                      f"{msg_config['Format']}|{msg_config['Columns']}\n".encode())
+    return digest.hexdigest()
+
+
+class Schema:
+    """Compiled form of one FMT table."""
+
+    __slots__ = ('key', 'fmt_messages', 'structs', '_dtypes')
+
+    def __init__(self, key: str, fmt_messages: dict) -> None:
+        self.key = key
+        # A copy: readers keep adding FMT entries to their table after it was looked up.
+        self.fmt_messages = {type_msg: dict(msg_config) for type_msg, msg_config in fmt_messages.items()}
+        self.structs = {}
+        for type_msg, msg_config in self.fmt_messages.items():
+            try:
+                self.structs[type_msg] = compile_struct(msg_config["Format"])
+            except KeyError:
+                continue
+        self._dtypes = None
+
+    def decoders(self, to_round: bool) -> dict[int, Decoder]:
+        return {type_msg: decoder_for(self.fmt_messages[type_msg], to_round) for type_msg in self.structs}
+
+    @property
+    def dtypes(self) -> dict:
+        """NumPy dtype per type id (requires numpy)."""
+        if self._dtypes is None:
+            from business_logic.columnar_reader import message_dtype
+
+            self._dtypes = {type_msg: message_dtype(self.fmt_messages[type_msg]) for type_msg in self.structs}
+        return self._dtypes
+
+
+_SCHEMAS: dict[str, Schema] = {}
+
+
+def schema_for(fmt_messages: dict) -> Schema:
+    """Cached schema of a FMT table, compiled on first use in this process."""
+    key = fmt_key(fmt_messages)
+    schema = _SCHEMAS.get(key)
+    if schema is None:
+        schema = _SCHEMAS[key] = Schema(key, fmt_messages)
+    return schema
+
+
+def warm(fmt_messages: dict, to_round: bool | None = None) -> Schema:
+    """Compile a table and its decoders ahead of decoding, e.g. in a pool initializer."""
+    schema = schema_for(fmt_messages)
+    for rounding in (False, True) if to_round is None else (to_round,):
+        schema.decoders(rounding)
+    return schema
+
+
+def save_schemas(path: str) -> None:
+    """Write every table compiled in this process to a JSON file."""
+    tables = {key: {str(t): config for t, config in schema.fmt_messages.items()} for key, schema in _SCHEMAS.items()}
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(tables, file)
+
+
+def load_schemas(path: str, to_round: bool | None = None) -> list[Schema]:
+    """Warm the cache with the tables saved by :func:`save_schemas`."""
+    with open(path, encoding="utf-8") as file:
+        tables = json.load(file)
+    return [warm({int(t): config for t, config in table.items()}, to_round) for table in tables.values()]
+
+
+def clear() -> None:
+    _SCHEMAS.clear()
+    compile_struct.cache_clear()
+    compile_decoder.cache_clear()
@@ -0,0 +1,149 @@
+"""Cutting a smaller BIN log out of a larger one.
+
+Messages are located with the header walk and copied as raw bytes, nothing
+is decoded or re-encoded: FMT messages (and the FMTU/UNIT/MULT metadata) are
+always kept, other messages when their type is selected and their time is in
+the window. Adjacent kept messages are coalesced into one range; long ranges
+are copied by the kernel with ``os.copy_file_range`` and short ones are
+batched into large writes.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from dataclasses import dataclass, field
+from typing import Iterable
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.header_walk import HeaderWalker
+from business_logic.schema_cache import TYPE_MAP
+
+ALWAYS_KEPT = frozenset({"FMT", "FMTU", "UNIT", "MULT"})
+# Ranges from this size on are copied with copy_file_range.
+COPY_MIN_SIZE = 256 * 1024
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+@dataclass
+class SliceReport:
+    """What :func:`slice_log` wrote.
+
+    Attributes:
+        messages: Messages written, FMT messages included
+        bytes_written: Size of the new log
+        ranges: Coalesced source ranges copied
+        skipped: Source ranges that were not messages, as reported by the walk
+    """
+
+    messages: int = 0
+    bytes_written: int = 0
+    ranges: int = 0
+    skipped: list[tuple[int, int]] = field(default_factory=list)
+
+
+class _RangeCopier:
+    """Copies ranges of a mapped source file to ``dst``, merging adjacent ones."""
+
+    def __init__(self, data: mmap.mmap, src_fd: int, dst) -> None:
+        self.data = data
+        self.src_fd = src_fd
+        self.dst = dst
+        self.buffer = bytearray()
+        self.start = self.end = -1
+        self.ranges = 0
+        self.kernel_copy = hasattr(os, "copy_file_range")
+
+    def add(self, start: int, end: int) -> None:
+        if start != self.end:
+            self._copy_run()
+            self.start = start
+        self.end = end
+
+    def close(self) -> None:
+        self._copy_run()
+        self._write_buffer()
+
+    def _copy_run(self) -> None:
+        if self.start == -1:
+            return
+        start, end = self.start, self.end
+        self.ranges += 1
+        if self.kernel_copy and end - start >= COPY_MIN_SIZE:
+            self._write_buffer()
+            try:
+                while start < end:
+                    copied = os.copy_file_range(self.src_fd, self.dst.fileno(), end - start, start)
+                    if not copied:
+                        break
+                    start += copied
+            except OSError:  # e.g. a file system without support, copy through memory from here on
+                self.kernel_copy = False
+        if start < end:
+            self.buffer += self.data[start:end]
+            if len(self.buffer) >= WRITE_BUFFER_SIZE:
+                self._write_buffer()
+
+    def _write_buffer(self) -> None:
+        if self.buffer:
+            self.dst.write(self.buffer)
+            self.buffer.clear()
+
+
+def _time_field(msg_config: dict, time_col: str) -> tuple[int, struct.Struct] | None:
+    """Payload offset and struct of ``time_col`` in a message type, None when it has no such column."""
+    if time_col not in msg_config["cols"]:
+        return None
+    index = msg_config["cols"].index(time_col)
+    offset = struct.calcsize('<' + ''.join(TYPE_MAP[t] for t in msg_config["Format"][:index]))
+    return offset + 3, struct.Struct('<' + TYPE_MAP[msg_config["Format"][index]])
+
+
+def slice_log(src: str, dst: str, time_range: tuple[int | None, int | None] | None = None,
+              types: Iterable[str] | None = None, time_col: str = "TimeUS") -> SliceReport:
+    """Write the messages of ``src`` selected by ``types`` and ``time_range`` to ``dst``.
+
+    ``time_range`` is ``(start, end)`` in ``time_col`` units, end excluded,
+    with None for an open side. Messages of a selected type without a
+    ``time_col`` column are kept whatever the window. The output is a valid
+    BIN log whose messages are byte-identical to the source ones.
+    """
+    selected = None if types is None else set(types) | ALWAYS_KEPT
+    start_time, end_time = time_range or (None, None)
+    walker = HeaderWalker()
+    # per type id: None to drop, or the (offset, struct) of its time field, False when it has none
+    rules: dict[int, tuple | bool | None] = {HeaderWalker.FMT_TYPE: False}
+    report = SliceReport()
+
+    with open(src, "rb") as source, open(dst, "wb", buffering=0) as target:
+        if not os.path.getsize(src):
+            return report
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            copier = _RangeCopier(data, source.fileno(), target)
+            for pos, type_msg in walker.walk(data):
+                rule = rules.get(type_msg, True)
+                if rule is True:  # first message of the type
+                    msg_config = walker.fmt_messages[type_msg]
+                    name = msg_config["Name"]
+                    if selected is not None and name not in selected:
+                        rule = None
+                    elif name in ALWAYS_KEPT or time_range is None:
+                        rule = False
+                    else:
+                        rule = _time_field(msg_config, time_col) or False
+                    rules[type_msg] = rule
+                if rule is None:
+                    continue
+                if rule:
+                    offset, time_struct = rule
+                    timestamp = time_struct.unpack_from(data, pos + offset)[0]
+                    if (start_time is not None and timestamp < start_time) or \
+                            (end_time is not None and timestamp >= end_time):
+                        continue
+                copier.add(pos, pos + walker.lengths[type_msg])
+                report.messages += 1
+            copier.close()
+        report.ranges = copier.ranges
+        report.skipped = walker.skipped
+    report.bytes_written = os.path.getsize(dst)
+    return report
@@ -0,0 +1,56 @@
+"""Serial decoding in fixed-size blocks.
+
+The file is read ``block_size`` bytes at a time and every block is decoded
+lazily, so peak memory is one block plus the messages the caller keeps, and
+the first messages come out as soon as the first block is read. A message
+cut by the end of a block is carried over to the next one, and so is a
+resync candidate that cannot be checked before the next block is read, so
+the output does not depend on the block size. Compressed logs
+are decompressed a few blocks ahead on a background thread.
+"""
+
+import os
+import sys
+from typing import Generator
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.compressed import open_stream
+from business_logic.old_reader import Reader
+from business_logic.predicates import Filter
+from utils.enums import MessageType
+
+DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+class StreamReader:
+    """Generator of the messages of a file, reading it in blocks."""
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        if block_size < Reader.FMT_MSG_LENGTH:
+            raise ValueError(f"block_size must be at least {Reader.FMT_MSG_LENGTH} bytes")
+        self.block_size = block_size
+        self.fmt_messages: dict = {}
+
+    def messages(self, path: str, to_round: bool = False, wanted_type: str = "",
+                 columns: dict[str, list[str]] | None = None,
+                 filters: dict[str, Filter] | None = None) -> Generator[dict, None, None]:
+        """Same messages as ``Reader.read_messages`` on the whole file."""
+        carry = b""
+        resync = False
+        with open_stream(path, self.block_size) as file:
+            while True:
+                block = file.read(self.block_size)
+                final = not block
+                if final and not carry:
+                    break
+                data = carry + block if carry else block
+                del block
+                reader = Reader()
+                yield from reader.read_messages(data, to_round, MessageType.ALL_MESSAGES, self.fmt_messages,
+                                                wanted_type, columns, filters, final=final, resync=resync)
+                if final:
+                    break
+                self.fmt_messages = reader.fmt_messages
+                carry = data[reader.stopped_at:]
+                resync = reader.resyncing
+                del data
@@ -0,0 +1,96 @@
+"""Time-ordered merge of several message streams.
+
+The readers return messages in file order, which is only roughly time order
+across types. Within one type and instance ``TimeUS`` does not go back, so a
+log is a set of sorted streams, and a k-way heap merge of them yields one
+time-ordered stream lazily, holding one message per stream.
+
+Messages without the time column (FMT, FILE, ...) keep the time of the
+previous message of their stream, so they stay where their stream put them.
+Equal times come out in stream order.
+"""
+
+import heapq
+from collections import defaultdict
+from typing import Hashable, Iterable, Iterator
+
+TIME_COL = "TimeUS"
+INSTANCE_COL = "I"
+
+StreamKey = tuple[str, int | None]
+
+
+def stream_key(message: dict) -> StreamKey:
+    """``(type name, instance)``; instance is None for types without an ``I`` column."""
+    return message["mavpackettype"], message.get(INSTANCE_COL)
+
+
+def _timed(stream: Iterable[dict], index: int, time_col: str) -> Iterator[tuple]:
+    time = float("-inf")
+    for seq, message in enumerate(stream):
+        time = message.get(time_col, time)
+        yield time, index, seq, message
+
+
+def merge_by_time(streams: Iterable[Iterable[dict]], time_col: str = TIME_COL) -> Iterator[dict]:
+    """Lazily merge streams that are each sorted by ``time_col``."""
+    timed = [_timed(stream, index, time_col) for index, stream in enumerate(streams)]
+    for _, _, _, message in heapq.merge(*timed):
+        yield message
+
+
+def partition(messages: Iterable[dict]) -> dict[StreamKey, list[dict]]:
+    """Messages grouped by :func:`stream_key`, in order of first appearance."""
+    streams: dict[StreamKey, list[dict]] = defaultdict(list)
+    for message in messages:
+        streams[stream_key(message)].append(message)
+    return streams
+
+
+def time_ordered(messages: Iterable[dict], time_col: str = TIME_COL) -> Iterator[dict]:
+    """``messages`` in time order; holds them all, as the parallel readers already do."""
+    return merge_by_time(partition(messages).values(), time_col)
+
+
+def merge_columns(tables: dict[Hashable, dict], time_col: str = TIME_COL) -> Iterator[tuple[Hashable, int]]:
+    """Lazily yield ``(key, row)`` over sorted column tables in time order.
+
+    ``tables`` maps any key, e.g. ``("GPS", 0)``, to ``{column: ndarray}``
+    whose ``time_col`` is sorted; only one cursor per table is held.
+    """
+    heap = []
+    columns = {}
+    for index, (key, table) in enumerate(tables.items()):
+        times = table[time_col]
+        columns[index] = key, times
+        if len(times):
+            heap.append((times[0], index, 0))
+    heapq.heapify(heap)
+    while heap:
+        _, index, row = heap[0]
+        key, times = columns[index]
+        if row + 1 < len(times):
+            heapq.heapreplace(heap, (times[row + 1], index, row + 1))
+        else:
+            heapq.heappop(heap)
+        yield key, row
+
+
+def split_instances(tables: dict[str, dict], names: Iterable[str] | None = None) -> dict[StreamKey, dict]:
+    """``{(name, instance): table}`` with one table per ``I`` value, sorted by time (requires numpy)."""
+    import numpy as np
+
+    streams = {}
+    for name in names or tables:
+        table = tables.get(name)
+        if not table:
+            continue
+        if INSTANCE_COL not in table:
+            groups = [(None, np.arange(len(table[TIME_COL])))]
+        else:
+            groups = [(int(value), np.flatnonzero(table[INSTANCE_COL] == value))
+                      for value in np.unique(table[INSTANCE_COL])]
+        for instance, rows in groups:
+            rows = rows[np.argsort(table[TIME_COL][rows], kind="stable")]
+            streams[(name, instance)] = {col: values[rows] for col, values in table.items()}
+    return streams
@@ -0,0 +1,83 @@
+"""GPS track extraction for the map.
+
+Only the GPS messages are touched: the FMT table gives the GPS type id and
+the payload offsets of ``Lat``, ``Lng``, ``Status`` and ``I``; the messages
+are located with one vectorised header match over the whole file and the
+fields are gathered in bulk.
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.columnar_reader import NUMPY_TYPES
+from business_logic.header_walk import read_fmt_table
+from business_logic.old_reader import Reader
+
+
+def field_offsets(msg_config: dict) -> dict[str, tuple[int, str]]:
+    """Payload offset and format letter of every column of a message type."""
+    offsets = {}
+    offset = 0
+    for t, col in zip(msg_config["Format"], msg_config["cols"]):
+        offsets[col] = (offset, t)
+        offset += struct.calcsize('<' + Reader.TYPE_MAP[t])
+    return offsets
+
+
+def message_positions(buffer: np.ndarray, type_msg: int, length: int) -> np.ndarray:
+    """Start of every ``type_msg`` message that is followed by another header."""
+    head = buffer[:len(buffer) - 2] if len(buffer) >= 2 else buffer[:0]
+    candidates = np.flatnonzero((head == 0xA3) & (buffer[1:len(head) + 1] == 0x95)
+                                & (buffer[2:len(head) + 2] == type_msg))
+    following = candidates + length
+    fits = following <= len(buffer)
+    candidates, following = candidates[fits], following[fits]
+    at_end = following == len(buffer)
+    inner = np.minimum(following, len(buffer) - 2)
+    chained = (buffer[inner] == 0xA3) & (buffer[inner + 1] == 0x95) & (following + 2 <= len(buffer))
+    return candidates[at_end | chained]
+
+
+def _gather(buffer: np.ndarray, positions: np.ndarray, field: tuple[int, str]) -> np.ndarray:
+    offset, t = field
+    dtype = np.dtype(NUMPY_TYPES[t])
+    return buffer[positions[:, None] + (3 + offset + np.arange(dtype.itemsize))].view(dtype).reshape(-1)
+
+
+def extract_track(path: str, instance: int = 0, min_status: int = 3, name: str = "GPS") -> np.ndarray:
+    """``(N, 2)`` array of ``(Lat, Lng)`` in degrees, in file order.
+
+    Keeps the messages of GPS ``instance`` whose ``Status`` (fix type) is at
+    least ``min_status``; a log without an ``I`` column has instance 0 only.
+    Values equal those of ``Reader.read_messages``.
+    """
+    if not os.path.getsize(path):
+        return np.empty((0, 2))
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        fmt_messages = read_fmt_table(data)
+        msg_config = next((config for config in fmt_messages.values() if config["Name"] == name), None)
+        if msg_config is None:
+            return np.empty((0, 2))
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        try:
+            positions = message_positions(buffer, msg_config["Type"], msg_config["Length"])
+            offsets = field_offsets(msg_config)
+            keep = np.ones(len(positions), dtype=bool)
+            if "I" in offsets:
+                keep &= _gather(buffer, positions, offsets["I"]) == instance
+            elif instance:
+                keep[:] = False
+            if "Status" in offsets:
+                keep &= _gather(buffer, positions, offsets["Status"]) >= min_status
+            positions = positions[keep]
+            track = np.empty((len(positions), 2))
+            track[:, 0] = _gather(buffer, positions, offsets["Lat"]) * 1e-7
+            track[:, 1] = _gather(buffer, positions, offsets["Lng"]) * 1e-7
+        finally:
+            del buffer  # release the export before the mmap is closed
+    return track
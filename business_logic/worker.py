@@ -0,0 +1,56 @@
+"""Entry points of the process pool workers.
+
+A task names the function the worker runs, so the worker imports that
+function's module. Keeping them here, with the decoder as their only real
+dependency, means a spawned worker, or a forkserver preloading this module,
+does not import the pool planning, the backends, asyncio or the UI.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from business_logic.old_reader import Reader
+from utils.enums import MessageType
+
+
+def decode_chunk(num_chunk: int, data: bytes, to_round: bool, fmt_messages: dict, wanted_type: str,
+                 columns=None, filters=None) -> tuple[int, list[dict]]:
+    reader = Reader()
+    reader.fmt_messages = fmt_messages
+    messages = list(reader.read_messages(data, to_round, MessageType.ALL_MESSAGES, fmt_messages, wanted_type,
+                                         columns, filters))
+    return num_chunk, messages
+
+
+def read_frames_fmt(file_path: str, start: int, end: int) -> dict:
+    from business_logic.compressed import decompress_range
+    from business_logic.header_walk import read_fmt_table
+
+    fmt_messages = read_fmt_table(decompress_range(file_path, start, end))
+    return {type_msg: dict(config) for type_msg, config in fmt_messages.items()}
+
+
+def decode_frames(num_chunk: int, file_path: str, start: int, end: int, to_round: bool, fmt_messages: dict,
+                  wanted_type: str, columns=None, filters=None) -> tuple[int, bytes, list[dict] | None, bytes]:
+    """Decode the frames between compressed offsets ``start`` and ``end``.
+
+    Decoding starts at the first chain-validated message. Returns the bytes
+    before it (all of them, with messages None, when there is none) and the
+    bytes of the message cut by the end of the frames; the parent decodes
+    the tail of each group together with the head of the next one.
+    """
+    from business_logic.compressed import decompress_range
+    from business_logic.resync import message_lengths
+    from business_logic.chunk_splitter import CHAIN_LENGTH, align_boundary
+
+    data = decompress_range(file_path, start, end)
+    first = 0
+    if num_chunk:
+        first = align_boundary(data, 0, len(data), message_lengths(fmt_messages, Reader.FMT_MSG_LENGTH), CHAIN_LENGTH)
+        if first == -1:
+            return num_chunk, data, None, b""
+    reader = Reader()
+    messages = list(reader.read_messages(data[first:], to_round, MessageType.ALL_MESSAGES, fmt_messages,
+                                         wanted_type, columns, filters))
+    return num_chunk, data[:first], messages, data[first + reader.stopped_at:]
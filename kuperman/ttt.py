@@ -3,7 +3,7 @@ from logging import Logger
 
 from reader import Reader
 from utils.enums import MessageType
-from utils.chunk_splitter import ChunkSplitter
+from business_logic.chunk_splitter import ChunkSplitter
 from multiprocessing import Pool
 
 
@@ -7,4 +7,6 @@ def main(page: ft.Page) -> None:
     AppManager(page)
 
 
-ft.app(target=main)
+# Guarded: spawned pool workers import __main__ again.
+if __name__ == "__main__":
+    ft.app(target=main)
@@ -0,0 +1,24 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from tests import golden
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: larger synthetic logs, deselect with -m 'not slow'")
+
+
+@pytest.fixture(scope="session")
+def golden_digests():
+    digests = golden.load_digests()
+    if not digests:
+        pytest.skip("tests/data/golden_digests.json missing, run: python -m tests.golden --update")
+    return digests
+
+
+@pytest.fixture(scope="session", params=["small", pytest.param("large", marks=pytest.mark.slow)])
+def golden_log(request, golden_digests):
+    """(name, path) of each synthetic log that has stored digests."""
+    return request.param, golden.log_path(request.param)
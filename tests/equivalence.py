@@ -0,0 +1,419 @@
+"""Streaming equivalence checker between MessagesExtractor and pymavlink.
+
+The reference side is decoded once with pymavlink and cached as per-type
+column blocks, so later runs (and sharded runs) never touch pymavlink again.
+Messages are matched per type by ordinal, which keeps memory bounded by the
+interleaving distance of the two streams instead of the log size.
+"""
+
+import bisect
+import hashlib
+import json
+import math
+import os
+import pickle
+import sys
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from business_logic.messages_extractor import MessagesExtractor
+from business_logic.old_reader import Reader
+from business_logic.chunk_splitter import ChunkSplitter
+from utils.enums import MessageType, RunMode
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".reference_cache"
+MAX_EXAMPLES = 3
+
+
+def mavlink_messages(path: str) -> Iterator[dict[str, Any]]:
+    """Stream pymavlink messages of a BIN file as dicts."""
+    from pymavlink import mavutil
+
+    connection = mavutil.mavlink_connection(path)
+    while True:
+        message = connection.recv_match(blocking=False)
+        if message is None:
+            break
+        yield message.to_dict()
+
+
+def _mavlink_rows(path: str) -> Iterator[tuple[dict[str, Any], int]]:
+    """pymavlink messages paired with the file offset where each one ends."""
+    from pymavlink import mavutil
+
+    connection = mavutil.mavlink_connection(path)
+    while True:
+        message = connection.recv_match(blocking=False)
+        if message is None:
+            break
+        yield message.to_dict(), connection.offset
+
+
+@dataclass
+class TypeReport:
+    """Comparison result for a single message type."""
+
+    compared: int = 0
+    mismatched: int = 0
+    missing: int = 0
+    extra: int = 0
+    field_mismatches: dict[str, int] = field(default_factory=dict)
+    examples: list[tuple[int, str, Any, Any]] = field(default_factory=list)
+
+    def merge(self, other: "TypeReport") -> None:
+        self.compared += other.compared
+        self.mismatched += other.mismatched
+        self.missing += other.missing
+        self.extra += other.extra
+        for name, count in other.field_mismatches.items():
+            self.field_mismatches[name] = self.field_mismatches.get(name, 0) + count
+        self.examples.extend(other.examples[: MAX_EXAMPLES - len(self.examples)])
+
+
+@dataclass
+class EquivalenceReport:
+    """Per-type summary of an equivalence run."""
+
+    types: dict[str, TypeReport] = field(default_factory=lambda: defaultdict(TypeReport))
+
+    @property
+    def ok(self) -> bool:
+        return all(not (r.mismatched or r.missing or r.extra) for r in self.types.values())
+
+    def merge(self, other: "EquivalenceReport") -> None:
+        for name, report in other.types.items():
+            self.types[name].merge(report)
+
+    def summary(self) -> str:
+        lines = [f"{'type':<8}{'compared':>10}{'mismatch':>10}{'missing':>9}{'extra':>7}  fields"]
+        for name in sorted(self.types):
+            r = self.types[name]
+            fields = ", ".join(f"{col}={count}" for col, count in sorted(r.field_mismatches.items()))
+            lines.append(f"{name:<8}{r.compared:>10}{r.mismatched:>10}{r.missing:>9}{r.extra:>7}  {fields}")
+            for index, col, expected, actual in r.examples:
+                lines.append(f"    #{index} {col}: expected {expected!r}, got {actual!r}")
+        lines.append("OK" if self.ok else "MISMATCH")
+        return "\n".join(lines)
+
+
+class FieldComparator:
+    """Compares message fields with per-field absolute tolerance.
+
+    ``tolerances`` keys are ``"TYPE.Field"``, ``"Field"`` or ``"*"``; the most
+    specific one wins. Only fields present in the reference are compared, NaN
+    equals NaN.
+    """
+
+    def __init__(self, tolerances: Optional[dict[str, float]] = None) -> None:
+        self.tolerances = tolerances or {}
+        self._resolved: dict[tuple[str, str], float] = {}
+
+    def tolerance(self, type_name: str, col: str) -> float:
+        key = (type_name, col)
+        if key not in self._resolved:
+            tol = self.tolerances
+            self._resolved[key] = tol.get(f"{type_name}.{col}", tol.get(col, tol.get("*", 0.0)))
+        return self._resolved[key]
+
+    def diff(self, type_name: str, expected: dict[str, Any], actual: dict[str, Any]) -> list[str]:
+        """Return the reference fields whose values differ."""
+        bad = []
+        for col, exp in expected.items():
+            if col == "mavpackettype":
+                continue
+            act = actual.get(col)
+            if act == exp:
+                continue
+            if isinstance(exp, float) and isinstance(act, (int, float)):
+                if math.isnan(exp) and math.isnan(act):
+                    continue
+                if abs(act - exp) <= self.tolerance(type_name, col):
+                    continue
+            bad.append(col)
+        return bad
+
+    def compare(self, report: TypeReport, index: int, type_name: str,
+                expected: dict[str, Any], actual: dict[str, Any]) -> None:
+        report.compared += 1
+        bad = self.diff(type_name, expected, actual)
+        if not bad:
+            return
+        report.mismatched += 1
+        for col in bad:
+            report.field_mismatches[col] = report.field_mismatches.get(col, 0) + 1
+        if len(report.examples) < MAX_EXAMPLES:
+            report.examples.append((index, bad[0], expected[bad[0]], actual.get(bad[0])))
+
+
+class ReferenceCache:
+    """pymavlink decode of one log, stored column-wise per message type.
+
+    Layout: ``<cache_dir>/<digest>/manifest.json`` with per-type counts,
+    column names and per-block end offsets, plus ``<TYPE>.<block>.pkl`` files
+    holding ``{column: list}`` for ``BLOCK_ROWS`` consecutive messages. Blocks
+    are flushed while pymavlink is still decoding, so building the cache holds
+    at most one block per type in memory, and readers only unpickle the blocks
+    they touch. The ``_end`` column keeps the file offset where each reference
+    message ends, which lines shards up with per-type ordinals. The digest
+    covers the absolute path, size and mtime so an edited log is re-decoded.
+    """
+
+    BLOCK_ROWS = 50_000
+    END_COLUMN = "_end"
+
+    def __init__(self, log_path: str, cache_dir: str | Path = DEFAULT_CACHE_DIR) -> None:
+        self.log_path = os.path.abspath(log_path)
+        stat = os.stat(self.log_path)
+        key = f"{self.log_path}|{stat.st_size}|{stat.st_mtime_ns}".encode()
+        self.directory = Path(cache_dir) / hashlib.sha1(key).hexdigest()[:16]
+        self._manifest: Optional[dict] = None
+
+    @property
+    def exists(self) -> bool:
+        return (self.directory / "manifest.json").exists()
+
+    @property
+    def manifest(self) -> dict:
+        if self._manifest is None:
+            self._manifest = json.loads((self.directory / "manifest.json").read_text())
+        return self._manifest
+
+    def build(self, rows: Optional[Iterable[tuple[dict[str, Any], int]]] = None) -> None:
+        """Decode the reference once and write the columnar blocks.
+
+        ``rows`` yields ``(message, end_offset)`` pairs and defaults to
+        streaming pymavlink over the log.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest: dict[str, dict] = {}
+        blocks: dict[str, dict[str, list]] = {}
+
+        for message, end in rows if rows is not None else _mavlink_rows(self.log_path):
+            type_name = message["mavpackettype"]
+            block = blocks.get(type_name)
+            if block is None:
+                columns = [col for col in message if col != "mavpackettype"]
+                manifest.setdefault(type_name, {"count": 0, "columns": columns, "block_ends": []})
+                block = blocks[type_name] = {col: [] for col in columns + [self.END_COLUMN]}
+            for col, values in block.items():
+                values.append(end if col == self.END_COLUMN else message.get(col))
+            if len(block[self.END_COLUMN]) == self.BLOCK_ROWS:
+                self._flush(type_name, manifest[type_name], blocks.pop(type_name))
+
+        for type_name, block in blocks.items():
+            self._flush(type_name, manifest[type_name], block)
+        (self.directory / "manifest.json").write_text(json.dumps(manifest))
+        self._manifest = manifest
+
+    def _flush(self, type_name: str, info: dict, block: dict[str, list]) -> None:
+        number = len(info["block_ends"])
+        with open(self.directory / f"{type_name}.{number}.pkl", "wb") as file:
+            pickle.dump(block, file, protocol=pickle.HIGHEST_PROTOCOL)
+        info["count"] += len(block[self.END_COLUMN])
+        info["block_ends"].append(block[self.END_COLUMN][-1])
+
+    def ensure(self) -> "ReferenceCache":
+        if not self.exists:
+            self.build()
+        return self
+
+    def load_block(self, type_name: str, number: int) -> dict[str, list]:
+        with open(self.directory / f"{type_name}.{number}.pkl", "rb") as file:
+            return pickle.load(file)
+
+    def first_index(self, type_name: str, offset: int) -> int:
+        """Ordinal of the first ``type_name`` message starting at or after ``offset``."""
+        block_ends = self.manifest[type_name]["block_ends"]
+        number = bisect.bisect_right(block_ends, offset)
+        if number == len(block_ends):
+            return self.manifest[type_name]["count"]
+        ends = self.load_block(type_name, number)[self.END_COLUMN]
+        return number * self.BLOCK_ROWS + bisect.bisect_right(ends, offset)
+
+    def fmt_messages(self) -> dict[int, dict]:
+        """FMT table in the ``old_reader`` layout, taken from the cached FMT rows."""
+        fmt_messages = {}
+        if "FMT" not in self.manifest:
+            return fmt_messages
+        for number in range(len(self.manifest["FMT"]["block_ends"])):
+            block = self.load_block("FMT", number)
+            for index in range(len(block[self.END_COLUMN])):
+                row = self.row(block, index)
+                fmt_messages[row["Type"]] = {
+                    "mavpackettype": "FMT", "Name": row["Name"], "Length": row["Length"],
+                    "Format": row["Format"], "Columns": row["Columns"], "Type": row["Type"],
+                    "cols": row["Columns"].split(","),
+                }
+        return fmt_messages
+
+    @staticmethod
+    def row(block: dict[str, list], index: int) -> dict[str, Any]:
+        return {col: values[index] for col, values in block.items() if col != ReferenceCache.END_COLUMN}
+
+
+class _BlockCursor:
+    """Sequential access to one type's reference rows, one block in memory."""
+
+    def __init__(self, cache: ReferenceCache, type_name: str) -> None:
+        self.cache = cache
+        self.type_name = type_name
+        self.count = cache.manifest.get(type_name, {}).get("count", 0)
+        self._number = -1
+        self._block: dict[str, list] = {}
+
+    def row(self, index: int) -> dict[str, Any]:
+        number, offset = divmod(index, ReferenceCache.BLOCK_ROWS)
+        if number != self._number:
+            self._block = self.cache.load_block(self.type_name, number)
+            self._number = number
+        return ReferenceCache.row(self._block, offset)
+
+
+def compare_streams(actual: Iterable[dict[str, Any]], expected: Iterable[dict[str, Any]],
+                    comparator: Optional[FieldComparator] = None) -> EquivalenceReport:
+    """Compare two message streams in lockstep, matching messages per type.
+
+    Both streams are consumed alternately; each side only buffers messages of
+    a type the other side has not produced yet.
+    """
+    comparator = comparator or FieldComparator()
+    report = EquivalenceReport()
+    pending_actual: dict[str, deque] = defaultdict(deque)
+    pending_expected: dict[str, deque] = defaultdict(deque)
+    indexes: dict[str, int] = defaultdict(int)
+
+    def push(message, own, other, is_actual):
+        type_name = message["mavpackettype"]
+        if other[type_name]:
+            counterpart = other[type_name].popleft()
+            act, exp = (message, counterpart) if is_actual else (counterpart, message)
+            comparator.compare(report.types[type_name], indexes[type_name], type_name, exp, act)
+            indexes[type_name] += 1
+        else:
+            own[type_name].append(message)
+
+    actual_iter, expected_iter = iter(actual), iter(expected)
+    actual_done = expected_done = False
+    while not (actual_done and expected_done):
+        if not actual_done:
+            message = next(actual_iter, None)
+            if message is None:
+                actual_done = True
+            else:
+                push(message, pending_actual, pending_expected, True)
+        if not expected_done:
+            message = next(expected_iter, None)
+            if message is None:
+                expected_done = True
+            else:
+                push(message, pending_expected, pending_actual, False)
+
+    for type_name, left in pending_actual.items():
+        report.types[type_name].extra += len(left)
+    for type_name, left in pending_expected.items():
+        report.types[type_name].missing += len(left)
+    return report
+
+
+def compare_with_cache(actual: Iterable[dict[str, Any]], cache: ReferenceCache,
+                       comparator: Optional[FieldComparator] = None,
+                       first_index: Optional[dict[str, int]] = None) -> EquivalenceReport:
+    """Compare a message stream against cached reference columns.
+
+    ``first_index`` gives the per-type ordinal of the first message in
+    ``actual``, which is how shards line up with the whole-file reference.
+    Reference messages beyond the stream are not counted as missing here.
+    """
+    comparator = comparator or FieldComparator()
+    report = EquivalenceReport()
+    cursors: dict[str, _BlockCursor] = {}
+    indexes = dict(first_index or {})
+
+    for message in actual:
+        type_name = message["mavpackettype"]
+        cursor = cursors.get(type_name)
+        if cursor is None:
+            cursor = cursors[type_name] = _BlockCursor(cache, type_name)
+        index = indexes.get(type_name, 0)
+        indexes[type_name] = index + 1
+        if index >= cursor.count:
+            report.types[type_name].extra += 1
+            continue
+        expected = cursor.row(index)
+        comparator.compare(report.types[type_name], index, type_name, expected, message)
+    return report
+
+
+def _add_missing(report: EquivalenceReport, cache: ReferenceCache) -> EquivalenceReport:
+    for type_name, info in cache.manifest.items():
+        type_report = report.types[type_name]
+        seen = type_report.compared + type_report.extra
+        type_report.missing += max(0, info["count"] - seen)
+    return report
+
+
+def _compare_shard(path: str, start: int, end: int, fmt_messages: dict, cache_dir: str,
+                   tolerances: Optional[dict[str, float]], to_round: bool) -> EquivalenceReport:
+    """Decode one byte range and compare it, lining ordinals up by reference offsets."""
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    cache = ReferenceCache(path, cache_dir)
+    first_index = {type_name: cache.first_index(type_name, start) for type_name in cache.manifest}
+    messages = Reader().read_messages(data, to_round, MessageType.ALL_MESSAGES, fmt_messages)
+    return compare_with_cache(messages, cache, FieldComparator(tolerances), first_index)
+
+
+class EquivalenceChecker:
+    """Checks MessagesExtractor output against pymavlink for one log file."""
+
+    def __init__(self, log_path: str, tolerances: Optional[dict[str, float]] = None,
+                 cache_dir: str | Path = DEFAULT_CACHE_DIR, to_round: bool = True) -> None:
+        self.log_path = log_path
+        self.tolerances = tolerances
+        self.cache_dir = str(cache_dir)
+        self.to_round = to_round
+
+    def check_streaming(self, run_mode: RunMode = RunMode.NORMAL, use_cache: bool = True) -> EquivalenceReport:
+        """Single pass; uses the columnar reference when cached, pymavlink otherwise."""
+        actual = MessagesExtractor().from_bin(self.log_path, to_round=self.to_round, run_mode=run_mode)
+        comparator = FieldComparator(self.tolerances)
+        cache = ReferenceCache(self.log_path, self.cache_dir)
+        if use_cache and cache.exists:
+            return _add_missing(compare_with_cache(actual, cache, comparator), cache)
+        return compare_streams(actual, mavlink_messages(self.log_path), comparator)
+
+    def check_sharded(self, num_shards: int = 4) -> EquivalenceReport:
+        """Compare offset ranges in parallel against the cached reference."""
+        cache = ReferenceCache(self.log_path, self.cache_dir).ensure()
+        fmt_messages = cache.fmt_messages()
+        bounds = ChunkSplitter.boundaries(self.log_path, num_shards, fmt_messages)
+        with Pool(num_shards) as pool:
+            reports = pool.starmap(_compare_shard, [
+                (self.log_path, start, end, fmt_messages, self.cache_dir, self.tolerances, self.to_round)
+                for start, end in zip(bounds[:-1], bounds[1:])
+            ])
+
+        report = EquivalenceReport()
+        for shard_report in reports:
+            report.merge(shard_report)
+        return _add_missing(report, cache)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare MessagesExtractor output with pymavlink.")
+    parser.add_argument("path")
+    parser.add_argument("--shards", type=int, default=0, help="parallel shards (needs/creates the cache)")
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="default absolute tolerance")
+    args = parser.parse_args()
+
+    checker = EquivalenceChecker(args.path, tolerances={"*": args.tolerance})
+    result = checker.check_sharded(args.shards) if args.shards else checker.check_streaming()
+    print(result.summary())
+    sys.exit(0 if result.ok else 1)
@@ -0,0 +1,111 @@
+"""Golden-output digests for the synthetic test logs.
+
+Instead of storing decoded dumps, ``tests/data/golden_digests.json`` keeps for
+every log and message type the message count and a SHA-256 over the canonical
+``repr`` of each decoded message. Logs are regenerated on demand from their
+seed and checked against the stored file hash, so the suite does not depend
+on any local log path.
+
+Regenerate after an intentional output change with::
+
+    python -m tests.golden --update
+"""
+
+import hashlib
+import json
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Iterable
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from tests.synthetic_log import build_log
+
+DATA_DIR = Path(__file__).parent / "data"
+DIGESTS_PATH = DATA_DIR / "golden_digests.json"
+
+LOGS = {
+    "small": {"num_seconds": 2.0, "seed": 1},
+    "large": {"num_seconds": 300.0, "seed": 2},
+}
+
+
+def log_path(name: str) -> str:
+    """Path of the named synthetic log, generated into ``tests/data`` if needed."""
+    path = DATA_DIR / f"{name}.bin"
+    expected = load_digests().get(name, {}).get("file_sha256")
+    if not path.exists() or (expected and _file_sha256(path) != expected):
+        DATA_DIR.mkdir(exist_ok=True)
+        path.write_bytes(build_log(**LOGS[name]))
+    return str(path)
+
+
+def digest_messages(messages: Iterable[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Per-type message count and SHA-256 of the decoded messages."""
+    hashes: dict[str, Any] = {}
+    counts: dict[str, int] = defaultdict(int)
+    for message in messages:
+        type_name = message["mavpackettype"]
+        hasher = hashes.get(type_name)
+        if hasher is None:
+            hasher = hashes[type_name] = hashlib.sha256()
+        hasher.update(repr(tuple(message.items())).encode())
+        counts[type_name] += 1
+    return {name: {"count": counts[name], "sha256": hasher.hexdigest()} for name, hasher in sorted(hashes.items())}
+
+
+def load_digests() -> dict[str, Any]:
+    if not DIGESTS_PATH.exists():
+        return {}
+    return json.loads(DIGESTS_PATH.read_text())
+
+
+def diff_digests(expected: dict[str, dict], actual: dict[str, dict]) -> list[str]:
+    """Message types whose count or digest differ, described for assertion messages."""
+    problems = []
+    for name in sorted(set(expected) | set(actual)):
+        exp, act = expected.get(name), actual.get(name)
+        if exp is None:
+            problems.append(f"{name}: unexpected ({act['count']} messages)")
+        elif act is None:
+            problems.append(f"{name}: missing ({exp['count']} expected)")
+        elif exp["count"] != act["count"]:
+            problems.append(f"{name}: {act['count']} messages, expected {exp['count']}")
+        elif exp["sha256"] != act["sha256"]:
+            problems.append(f"{name}: content differs")
+    return problems
+
+
+def _file_sha256(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def update_digests() -> dict[str, Any]:
+    """Recompute the golden file with the serial reader as reference."""
+    from business_logic.messages_extractor import MessagesExtractor
+
+    digests = {}
+    for name, params in LOGS.items():
+        path = DATA_DIR / f"{name}.bin"
+        DATA_DIR.mkdir(exist_ok=True)
+        path.write_bytes(build_log(**params))
+        digests[name] = {
+            "file_sha256": _file_sha256(path),
+            "to_round": {str(to_round).lower(): digest_messages(MessagesExtractor().from_bin(str(path), to_round))
+                         for to_round in (True, False)},
+        }
+    DIGESTS_PATH.write_text(json.dumps(digests, indent=2, sort_keys=True) + "\n")
+    return digests
+
+
+if __name__ == "__main__":
+    if "--update" in sys.argv:
+        update_digests()
+        print(f"Wrote {DIGESTS_PATH}")
+    else:
+        print(json.dumps(load_digests(), indent=2))
@@ -0,0 +1,116 @@
+"""Deterministic synthetic ArduPilot BIN logs for tests."""
+
+import random
+import struct
+from pathlib import Path
+
+HEADER = b"\xA3\x95"
+FMT_TYPE = 0x80
+
+STRUCT_MAP = {
+    "b": "b", "B": "B", "h": "h", "H": "H", "i": "i", "I": "I", "f": "f", "d": "d",
+    "n": "4s", "N": "16s", "Z": "64s", "c": "h", "C": "H", "e": "i", "E": "I",
+    "L": "i", "M": "B", "q": "q", "Q": "Q",
+}
+
+# type id -> (name, format, columns)
+MESSAGE_DEFINITIONS = {
+    FMT_TYPE: ("FMT", "BBnNZ", "Type,Length,Name,Format,Columns"),
+    129: ("PARM", "QNf", "TimeUS,Name,Value"),
+    130: ("GPS", "QBBIHBcLLeffffB", "TimeUS,I,Status,GMS,GWk,NSats,HDop,Lat,Lng,Alt,Spd,GCrs,VZ,Yaw,U"),
+    131: ("IMU", "QBffffffIIfBBHH", "TimeUS,I,GyrX,GyrY,GyrZ,AccX,AccY,AccZ,EG,EA,T,GH,AH,GHz,AHz"),
+    132: ("ATT", "QccccCCCC", "TimeUS,DesRoll,Roll,DesPitch,Pitch,DesYaw,Yaw,ErrRP,ErrYaw"),
+    133: ("BARO", "QBffcf", "TimeUS,I,Alt,Press,Temp,CRt"),
+    134: ("RCOU", "QHHHH", "TimeUS,C1,C2,C3,C4"),
+    135: ("MSG", "QZ", "TimeUS,Message"),
+    136: ("MODE", "QMBB", "TimeUS,Mode,ModeNum,Rsn"),
+    137: ("FILE", "NIBZ", "FileName,Offset,Length,Data"),
+}
+
+PARAMETERS = ("ARMING_CHECK", "BATT_MONITOR", "GPS_TYPE", "INS_ACCEL_FILTER", "LOG_BITMASK", "SERIAL1_BAUD")
+STATUS_TEXTS = ("ArduPlane V4.5.0", "EKF3 IMU0 initialised", "GPS 1: detected u-blox", "Mission: 1 Takeoff")
+
+
+def _struct_for(format_chars: str) -> struct.Struct:
+    return struct.Struct("<" + "".join(STRUCT_MAP[char] for char in format_chars))
+
+
+def message_length(type_msg: int) -> int:
+    """Full on-disk length (header included) of a message type."""
+    return 3 + _struct_for(MESSAGE_DEFINITIONS[type_msg][1]).size
+
+
+def encode_fmt(type_msg: int) -> bytes:
+    """Encode the FMT message describing ``type_msg``."""
+    name, format_chars, columns = MESSAGE_DEFINITIONS[type_msg]
+    length = 89 if type_msg == FMT_TYPE else message_length(type_msg)
+    payload = _struct_for("BBnNZ").pack(type_msg, length, name.encode(), format_chars.encode(), columns.encode())
+    return HEADER + bytes([FMT_TYPE]) + payload
+
+
+def encode_message(type_msg: int, *values) -> bytes:
+    """Encode one data message of ``type_msg`` from raw (unscaled) values."""
+    return HEADER + bytes([type_msg]) + _struct_for(MESSAGE_DEFINITIONS[type_msg][1]).pack(*values)
+
+
+def build_log(num_seconds: float = 2.0, seed: int = 0) -> bytes:
+    """Build a deterministic log with multi-instance, string and scaled fields.
+
+    IMU runs at 400 Hz on two instances, ATT at 50 Hz, BARO and RCOU at 10 Hz
+    and GPS at 5 Hz on two instances, which is close enough to a real flight
+    for decoding and performance work.
+    """
+    rnd = random.Random(seed)
+    parts = [encode_fmt(type_msg) for type_msg in MESSAGE_DEFINITIONS]
+
+    for index, name in enumerate(PARAMETERS):
+        parts.append(encode_message(129, index, name.encode(), rnd.uniform(-100, 100)))
+    parts.append(encode_message(135, 0, STATUS_TEXTS[0].encode()))
+    parts.append(encode_message(137, b"@SYS/uarts.txt", 0, 12, b"UART0 115200"))
+
+    lat, lng, alt = 315_000_000, 349_000_000, 10_000
+    for tick in range(int(num_seconds * 400)):
+        time_us = 1_000_000 + tick * 2_500
+        for instance in (0, 1):
+            parts.append(encode_message(
+                131, time_us + instance, instance,
+                *(rnd.uniform(-0.5, 0.5) for _ in range(3)),
+                rnd.uniform(-1, 1), rnd.uniform(-1, 1), rnd.uniform(-10.5, -9.0),
+                0, 0, rnd.uniform(30, 45), 1, 1, 400, 400,
+            ))
+        if tick % 8 == 0:
+            parts.append(encode_message(
+                132, time_us + 2,
+                rnd.randint(-4500, 4500), rnd.randint(-4500, 4500), rnd.randint(-4500, 4500),
+                rnd.randint(-4500, 4500), rnd.randint(0, 35999), rnd.randint(0, 35999),
+                rnd.randint(0, 500), rnd.randint(0, 500),
+            ))
+        if tick % 40 == 0:
+            parts.append(encode_message(
+                133, time_us + 3, 0, rnd.uniform(0, 120), rnd.uniform(95_000, 101_325),
+                rnd.randint(2_000, 4_000), rnd.uniform(-2, 2),
+            ))
+            parts.append(encode_message(134, time_us + 4, *(rnd.randint(1_000, 2_000) for _ in range(4))))
+        if tick % 80 == 0:
+            lat += rnd.randint(-300, 300)
+            lng += rnd.randint(-300, 300)
+            alt += rnd.randint(-50, 50)
+            for instance in (0, 1):
+                parts.append(encode_message(
+                    130, time_us + 5 + instance, instance, 3 + (tick // 80 + instance) % 4,
+                    time_us // 1_000, 2_300, rnd.randint(6, 20), rnd.randint(60, 250),
+                    lat + instance * 7, lng - instance * 7, alt,
+                    rnd.uniform(0, 30), rnd.uniform(0, 360), rnd.uniform(-3, 3), 0.0, 1,
+                ))
+        if tick % 400 == 200:
+            parts.append(encode_message(135, time_us + 6, rnd.choice(STATUS_TEXTS).encode()))
+            parts.append(encode_message(136, time_us + 7, rnd.randint(0, 20), rnd.randint(0, 20), 1))
+
+    return b"".join(parts)
+
+
+def write_log(path: str | Path, num_seconds: float = 2.0, seed: int = 0) -> Path:
+    """Write :func:`build_log` output to ``path`` and return it."""
+    path = Path(path)
+    path.write_bytes(build_log(num_seconds, seed))
+    return path
@@ -0,0 +1,86 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from collections import Counter
+
+import pytest
+
+from business_logic import aggregation
+from business_logic.aggregation import Reducer, aggregate
+from business_logic.messages_extractor import MessagesExtractor
+from tests.golden import log_path
+from tests.synthetic_log import write_log
+
+
+class StatusHistogram(Reducer):
+    name = "histogram"
+
+    def start(self):
+        return Counter()
+
+    def add(self, state, values):
+        return state + Counter(values)
+
+    def merge(self, state, other):
+        return state + other
+
+
+def _expected(paths):
+    messages = [m for path in paths for m in MessagesExtractor().from_bin(path)]
+    gps = [m for m in messages if m["mavpackettype"] == "GPS"]
+    alts = [m["Alt"] for m in gps]
+    return messages, {
+        "GPS.Alt": {"min": min(alts), "max": max(alts), "mean": pytest.approx(sum(alts) / len(alts)),
+                    "first": alts[0], "last": alts[-1], "count": len(alts)},
+        "GPS.Status": {"histogram": Counter(m["Status"] for m in gps)},
+        "ATT": {"count": sum(m["mavpackettype"] == "ATT" for m in messages)},
+        "*": {"count": dict(sorted(Counter(m["mavpackettype"] for m in messages).items()))},
+    }
+
+
+SPEC = {"GPS.Alt": ["min", "max", "mean", "first", "last", "count"], "GPS.Status": [StatusHistogram()],
+        "ATT": ["count"], "*": ["count"]}
+
+
+def test_serial_aggregate_matches_decode():
+    path = log_path("small")
+    _, expected = _expected([path])
+    assert MessagesExtractor().aggregate(path, SPEC) == expected
+
+
+def test_parallel_aggregate_over_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(aggregation, "SERIAL_BELOW", 0)
+    monkeypatch.setattr(aggregation, "MIN_CHUNK_SIZE", 4096)
+    paths = [str(write_log(tmp_path / f"log{i}.bin", num_seconds=1.0, seed=i)) for i in range(3)]
+    assert len(aggregation.plan_chunks(paths, 2)) > 3
+    _, expected = _expected(paths)
+    assert aggregate(paths, SPEC, num_workers=2) == expected
+
+
+def test_rounding_and_scaled_fields():
+    path = log_path("small")
+    messages = list(MessagesExtractor().from_bin(path, True))
+    lats = [m["Lat"] for m in messages if m["mavpackettype"] == "GPS"]
+    assert aggregate(path, {"GPS.Lat": ["min", "max"]}, to_round=True) == {"GPS.Lat": {"min": min(lats),
+                                                                                         "max": max(lats)}}
+
+
+def test_invalid_specs():
+    with pytest.raises(ValueError, match="Unknown reducer"):
+        aggregate(log_path("small"), {"GPS.Alt": ["median"]})
+    with pytest.raises(ValueError, match="only 'count'"):
+        aggregate(log_path("small"), {"GPS": ["mean"]})
+    with pytest.raises(ValueError, match="no columns"):
+        aggregate(log_path("small"), {"GPS.Nope": ["min"]})
+
+
+def test_incomplete_reducer_fails_when_created():
+    class NoMerge(Reducer):
+        def start(self):
+            return 0
+
+        def add(self, state, values):
+            return state + len(values)
+
+    with pytest.raises(TypeError, match="merge"):
+        NoMerge()
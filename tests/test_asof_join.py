@@ -0,0 +1,70 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from business_logic.asof_join import join_asof, match_rows
+from business_logic.messages_extractor import MessagesExtractor
+from tests.golden import log_path
+
+
+def _table(times, **columns):
+    return {"TimeUS": np.array(times, dtype=np.uint64), **{col: np.array(values) for col, values in columns.items()}}
+
+
+def test_match_rows_methods():
+    times = np.array([5, 10, 14, 16, 40])
+    samples = np.array([10, 20, 30])
+
+    before, _, matched, _ = match_rows(times, samples, "backward")
+    assert matched.tolist() == [False, True, True, True, True]
+    assert before[matched].tolist() == [0, 0, 0, 2]
+
+    before, _, matched, _ = match_rows(times, samples, "nearest")
+    assert matched.all() and before.tolist() == [0, 0, 0, 1, 2]
+
+    _, _, matched, weight = match_rows(times, samples, "linear")
+    assert matched.tolist() == [False, True, True, True, False]
+    assert weight[matched].tolist() == [0.0, 0.4, 0.6]
+
+    _, _, matched, _ = match_rows(times, samples, "backward", tolerance_us=4)
+    assert matched.tolist() == [False, True, True, False, False]
+
+
+def test_join_fills_unmatched_rows():
+    tables = {"GPS": _table([5, 10, 25], Lat=[1.0, 2.0, 3.0]),
+              "ATT": _table([10, 20], Roll=[100, 200], Name=np.array(["a", "b"], dtype=object))}
+    joined = join_asof(tables, "GPS", ["ATT"])
+    assert joined["ATT.TimeUS"][1:].tolist() == [10, 20] and np.isnan(joined["ATT.TimeUS"][0])
+    assert joined["ATT.Name"].tolist() == [None, "a", "b"]
+
+    linear = join_asof(tables, "GPS", {"ATT": ["Roll"]}, method="linear")
+    assert list(linear) == ["TimeUS", "Lat", "ATT.Roll"]
+    assert np.isnan(linear["ATT.Roll"][[0, 2]]).all() and linear["ATT.Roll"][1] == 100
+
+
+def test_join_matches_dict_reference():
+    path = log_path("small")
+    joined = MessagesExtractor().join_columns(path, "GPS", {"ATT": ["Roll"], "BARO": ["Alt"]},
+                                              instances={"GPS": 1})
+    messages = list(MessagesExtractor().from_bin(path))
+    gps = [m for m in messages if m["mavpackettype"] == "GPS" and m["I"] == 1]
+    assert joined["TimeUS"].tolist() == [m["TimeUS"] for m in gps]
+    for name, col in (("ATT", "Roll"), ("BARO", "Alt")):
+        samples = [m for m in messages if m["mavpackettype"] == name]
+        expected = [[s for s in samples if s["TimeUS"] <= m["TimeUS"]][-1][col] for m in gps]
+        assert joined[f"{name}.{col}"].tolist() == pytest.approx(expected)
+
+
+def test_join_errors():
+    tables = {"GPS": _table([1, 2], I=[0, 1]), "ATT": _table([1])}
+    with pytest.raises(ValueError, match="method"):
+        join_asof(tables, "GPS", ["ATT"], method="cubic")
+    with pytest.raises(ValueError, match="no column"):
+        join_asof(tables, "GPS", {"ATT": ["Roll"]})
+    with pytest.raises(ValueError, match="only instance 0"):
+        join_asof(tables, "GPS", ["ATT"], instances={"ATT": 1})
+    with pytest.raises(ValueError, match="No BARO"):
+        join_asof(tables, "BARO", ["ATT"])
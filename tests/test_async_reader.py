@@ -0,0 +1,66 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from business_logic.async_reader import AsyncReader
+from business_logic.messages_extractor import MessagesExtractor
+from tests.golden import log_path
+
+
+async def _collect(generator):
+    return [item async for item in generator]
+
+
+@pytest.mark.parametrize("block_size", [1_000, 7_777, 1 << 24])
+def test_async_matches_from_bin(block_size):
+    path = log_path("small")
+    expected = list(MessagesExtractor().from_bin(path, True))
+    actual = asyncio.run(_collect(MessagesExtractor().afrom_bin(path, True, block_size=block_size)))
+    assert actual == expected
+
+
+def test_async_with_process_pool_and_filters():
+    path = log_path("small")
+    filters = {"GPS": "I == 0"}
+    expected = list(MessagesExtractor().from_bin(path, wanted_type="GPS", filters=filters))
+    with ProcessPoolExecutor(2) as executor:
+        actual = asyncio.run(_collect(MessagesExtractor().afrom_bin(
+            path, wanted_type="GPS", filters=filters, block_size=4_096, executor=executor)))
+    assert actual == expected
+
+
+def test_async_logs_decode_concurrently():
+    path = log_path("small")
+
+    async def main():
+        extractor = MessagesExtractor()
+        return await asyncio.gather(*(_collect(extractor.afrom_bin(path, block_size=10_000)) for _ in range(3)))
+
+    first, *others = asyncio.run(main())
+    assert all(other == first for other in others)
+
+
+def test_async_columns_match_dict_path():
+    pytest.importorskip("numpy")
+    path = log_path("small")
+    batches = asyncio.run(_collect(MessagesExtractor().afrom_bin_columns(path, wanted_types=["GPS"], block_size=5_000)))
+    assert len(batches) > 1
+    lat = [value for tables in batches for value in tables.get("GPS", {}).get("Lat", [])]
+    assert lat == [m["Lat"] for m in MessagesExtractor().from_bin(path, wanted_type="GPS")]
+
+
+def test_bounded_buffering():
+    path = log_path("small")
+    reader = AsyncReader(block_size=2_000, max_pending=1)
+
+    async def take_two():
+        generator = reader.batches(path)
+        batches = [await generator.__anext__(), await generator.__anext__()]
+        await generator.aclose()
+        return batches
+
+    assert len(asyncio.run(take_two())) == 2
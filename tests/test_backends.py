@@ -0,0 +1,55 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from business_logic import backends
+from business_logic.backends import PARALLEL_MIN_SIZE, Backend, get_backend, select_backend
+from utils.enums import RunMode
+
+
+@pytest.fixture
+def many_cpus(monkeypatch):
+    monkeypatch.setattr(backends, "available_cpus", lambda: 8)
+    monkeypatch.setitem(backends._BACKENDS, "gpu", Backend("gpu", lambda *args: [], parallel=True,
+                                                             available=lambda: False))
+
+
+def test_run_modes_map_to_backends():
+    for run_mode in (RunMode.NORMAL, RunMode.THREADS, RunMode.MULTIPROCESS):
+        assert get_backend(run_mode) is get_backend(backends.RUN_MODE_BACKENDS[run_mode])
+    assert get_backend("normal").columnar and get_backend("multiprocess").parallel
+    with pytest.raises(ValueError, match="Unknown backend"):
+        get_backend("nope")
+
+
+def test_auto_selection(many_cpus):
+    assert select_backend(1024).name == "normal"
+    assert select_backend(PARALLEL_MIN_SIZE).name == "multiprocess"
+    assert select_backend(PARALLEL_MIN_SIZE, wanted_type="GPS").name == "normal"
+    assert select_backend(4 * PARALLEL_MIN_SIZE, wanted_type="GPS").name == "multiprocess"
+
+
+def test_auto_never_selects_experimental_gpu(many_cpus, monkeypatch):
+    gpu = Backend("gpu", lambda *args: [], parallel=True, experimental=True)
+    monkeypatch.setitem(backends._BACKENDS, "gpu", gpu)
+    assert select_backend(10 * PARALLEL_MIN_SIZE).name == "multiprocess"
+    assert gpu not in backends.available_backends() and get_backend("gpu") is gpu
+
+
+def test_unpicklable_filters_stay_in_process(many_cpus, tmp_path):
+    lambda_filter = {"GPS": lambda v: True}
+    assert select_backend(PARALLEL_MIN_SIZE, filters={"GPS": "Status >= 3"}).name == "multiprocess"
+    assert select_backend(PARALLEL_MIN_SIZE, filters=lambda_filter).name == "normal"
+    with pytest.raises(ValueError, match="pickle"):
+        get_backend("multiprocess").decode(str(tmp_path / "log.bin"), False, filters=lambda_filter)
+
+
+def test_single_cpu_stays_serial(monkeypatch):
+    monkeypatch.setattr(backends, "available_cpus", lambda: 1)
+    assert select_backend(10 * PARALLEL_MIN_SIZE).name == "normal"
+
+
+def test_streaming_request_stays_serial(many_cpus):
+    assert select_backend(10 * PARALLEL_MIN_SIZE, streaming=True).name == "normal"
+    assert get_backend(RunMode.NORMAL).streaming
@@ -0,0 +1,41 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+from business_logic.batch_scheduler import DirectoryScheduler
+from business_logic.messages_extractor import MessagesExtractor
+from tests.synthetic_log import write_log
+
+
+def _messages(path):
+    return [json.loads(json.dumps(m, default=lambda v: v.hex())) for m in MessagesExtractor().from_bin(path)]
+
+
+def test_directory_outputs_match_from_bin(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    paths = [write_log(str(logs / f"log{i}.bin"), num_seconds=seconds, seed=i)
+             for i, seconds in enumerate([0.1, 2.0, 0.5])]
+    (logs / "empty.bin").write_bytes(b"")
+
+    unit_size = os.path.getsize(paths[1]) // 4
+    report = MessagesExtractor().from_directory(str(logs), str(tmp_path / "out"), num_workers=3, unit_size=unit_size)
+
+    units = {os.path.basename(r.path): r.units for r in report.files}
+    assert units["log1.bin"] >= 3 and units["log0.bin"] == 1 and units["empty.bin"] == 0
+    for path in paths:
+        output = tmp_path / "out" / (os.path.basename(path)[:-4] + ".jsonl")
+        with open(output, encoding="utf-8") as file:
+            assert [json.loads(line) for line in file] == _messages(path)
+    assert report.total_messages == sum(len(_messages(path)) for path in paths)
+    saved = json.loads((tmp_path / "out" / "report.json").read_text())
+    assert saved["total_bytes"] == report.total_bytes
+    assert not list((tmp_path / "out").glob("*.part*"))
+
+
+def test_plan_is_largest_first(tmp_path):
+    paths = [write_log(str(tmp_path / f"log{i}.bin"), num_seconds=seconds) for i, seconds in enumerate([0.2, 1.0])]
+    units = DirectoryScheduler(str(tmp_path / "out"), unit_size=os.path.getsize(paths[1]) // 2).plan(paths)
+    assert [unit.size for unit in units] == sorted((unit.size for unit in units), reverse=True)
+    assert sum(unit.size for unit in units) == sum(os.path.getsize(path) for path in paths)
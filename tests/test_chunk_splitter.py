@@ -0,0 +1,76 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from business_logic.header_walk import HeaderWalker
+from business_logic.messages_extractor import MessagesExtractor
+from business_logic.old_reader import Reader
+from tests.golden import log_path
+from tests.synthetic_log import build_log
+from business_logic.chunk_splitter import ChunkSplitter
+
+
+def _fmt_messages(data):
+    reader = Reader()
+    for _ in reader.read_messages(data, False):
+        pass
+    return reader.fmt_messages
+
+
+def _message_starts(data):
+    return {pos for pos, _ in HeaderWalker().walk(data)}
+
+
+def test_boundaries_are_message_starts():
+    path = log_path("small")
+    data = open(path, "rb").read()
+    report = ChunkSplitter.find_boundaries(path, 16, _fmt_messages(data))
+    assert not report.unaligned and len(report.boundaries) == 17
+    assert set(report.boundaries[:-1]) <= _message_starts(data)
+    chunks = ChunkSplitter.split(path, data, 16, _fmt_messages(data))
+    assert b"".join(chunks.values()) == data
+
+
+def test_fake_header_before_boundary_is_skipped(tmp_path):
+    data = bytearray(build_log(0.5))
+    fmt_messages = _fmt_messages(bytes(data))
+    nominal = len(data) // 2
+    # A header of a known type at the nominal offset, followed by garbage.
+    data[nominal:nominal + 3] = b"\xA3\x95\x83"
+    data[nominal + 3:nominal + 200] = bytes(197)
+    path = tmp_path / "fake.bin"
+    path.write_bytes(bytes(data))
+
+    report = ChunkSplitter.find_boundaries(str(path), 2, fmt_messages)
+    assert report.boundaries[1] > nominal + 200
+    assert report.boundaries[1] in _message_starts(bytes(data))
+
+
+def test_unaligned_boundary_is_reported_and_merged(tmp_path):
+    clean = build_log(0.2)
+    data = clean + bytes(2 * len(clean))
+    path = tmp_path / "zeros.bin"
+    path.write_bytes(data)
+
+    report = ChunkSplitter.find_boundaries(str(path), 6, _fmt_messages(clean))
+    step = len(data) // 6
+    assert report.unaligned == [step * i for i in range(2, 6)]
+    assert len(report.boundaries) == 3 and report.boundaries[-1] == len(data)
+    assert step <= report.boundaries[1] < 2 * step
+
+
+def test_parallel_search_matches_serial():
+    path = log_path("small")
+    fmt_messages = _fmt_messages(open(path, "rb").read())
+    serial = ChunkSplitter.find_boundaries(path, 40, fmt_messages, workers=1)
+    assert ChunkSplitter.find_boundaries(path, 40, fmt_messages, workers=3) == serial
+
+
+def test_split_chunks_decode_like_whole_file():
+    path = log_path("small")
+    expected = list(MessagesExtractor().from_bin(path))
+    data = open(path, "rb").read()
+    fmt_messages = _fmt_messages(data)
+    messages = []
+    for chunk in ChunkSplitter.split(path, data, 7, fmt_messages).values():
+        messages.extend(Reader().read_messages(chunk, False, fmt_messages=dict(fmt_messages)))
+    assert messages == expected
@@ -0,0 +1,61 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import csv
+import json
+import pstats
+
+import pytest
+
+from business_logic.cli import main
+from business_logic.messages_extractor import MessagesExtractor
+from tests.golden import log_path
+
+
+def test_decode_to_jsonl_with_types_and_time_range(tmp_path, capsys):
+    output = tmp_path / "out.jsonl"
+    assert main(["decode", log_path("small"), "--types", "GPS", "ATT", "--start", "1.5e6", "--end", "2e6",
+                 "-o", str(output)]) == 0
+    decoded = [json.loads(line) for line in output.read_text().splitlines()]
+    expected = [m for m in MessagesExtractor().from_bin(log_path("small"))
+                if m["mavpackettype"] in ("GPS", "ATT") and 1_500_000 <= m["TimeUS"] < 2_000_000]
+    assert decoded == expected
+    assert f"{len(expected)} messages" in capsys.readouterr().out
+
+
+def test_decode_to_csv_per_type(tmp_path):
+    assert main(["decode", log_path("small"), "--backend", "multiprocess", "--workers", "2", "--types", "GPS",
+                 "--format", "csv", "-o", str(tmp_path)]) == 0
+    assert os.listdir(tmp_path) == ["GPS.csv"]
+    with open(tmp_path / "GPS.csv", newline="") as file:
+        rows = list(csv.DictReader(file))
+    gps = list(MessagesExtractor().from_bin(log_path("small"), wanted_type="GPS"))
+    assert [int(row["TimeUS"]) for row in rows] == [m["TimeUS"] for m in gps]
+
+
+def test_slice_and_summary(tmp_path, capsys):
+    cut = str(tmp_path / "cut.bin")
+    assert main(["slice", log_path("small"), cut, "--types", "GPS"]) == 0
+    assert main(["summary", cut]) == 0
+    listed = [line.split()[0] for line in capsys.readouterr().out.splitlines() if line.startswith("  ")]
+    assert "GPS" in listed and "IMU" not in listed
+
+
+def test_profile_and_memory_switches(tmp_path, capsys):
+    stats = tmp_path / "decode.prof"
+    assert main(["decode", log_path("small"), "--profile", str(stats), "--trace-memory", "3"]) == 0
+    assert any(func[2] == "read_messages" for func in pstats.Stats(str(stats)).stats)
+    err = capsys.readouterr().err
+    assert "Peak traced memory" in err and f"Profile written to {stats}" in err
+
+
+def test_line_profile(tmp_path):
+    pytest.importorskip("line_profiler")
+    output = tmp_path / "decode.lprof"
+    assert main(["decode", log_path("small"), "--line-profile", str(output),
+                 "--line-profile-func", "business_logic.old_reader.Reader.read_messages"]) == 0
+    assert output.stat().st_size
+
+
+def test_output_needed_for_files():
+    assert main(["decode", log_path("small"), "--format", "jsonl"]) == 2
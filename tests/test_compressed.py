@@ -0,0 +1,127 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+import bz2
+import gzip
+import io
+import lzma
+import threading
+
+import pytest
+
+from business_logic.compressed import (BGZF_BLOCK_SIZE, GZIP, ZSTD, Prefetcher, compress_log, compression_of,
+                                       decompress_range, frames, group_frames)
+from business_logic.messages_extractor import MessagesExtractor
+from utils.enums import RunMode
+from tests.golden import log_path
+
+COMPRESSORS = {"gz": gzip.compress, "xz": lzma.compress, "bz2": bz2.compress}
+
+
+def _compressed(tmp_path, name, kind):
+    path = log_path(name)
+    target = tmp_path / f"{name}.bin.{kind}"
+    with open(path, "rb") as file:
+        target.write_bytes(COMPRESSORS[kind](file.read()))
+    return str(target)
+
+
+@pytest.mark.parametrize("kind", sorted(COMPRESSORS))
+def test_compressed_logs_decode_like_plain(tmp_path, kind):
+    expected = list(MessagesExtractor().from_bin(log_path("small"), True))
+    path = _compressed(tmp_path, "small", kind)
+    assert list(MessagesExtractor().from_bin(path, True, block_size=4_096)) == expected
+    assert frames(path) is None
+
+
+def test_compression_is_detected_by_content(tmp_path):
+    path = _compressed(tmp_path, "small", "xz")
+    renamed = tmp_path / "archived.bin"
+    os.rename(path, renamed)
+    assert compression_of(str(renamed)) == "xz"
+    assert compression_of(log_path("small")) is None
+
+
+def test_bgzf_frames_decompress_independently(tmp_path):
+    path = log_path("large")
+    target = str(tmp_path / "large.bin.gz")
+    compress_log(path, target, GZIP)
+    with open(path, "rb") as file:
+        raw = file.read()
+
+    frame_list = frames(target)
+    assert len(frame_list) == -(-len(raw) // BGZF_BLOCK_SIZE) + 1  # plus the end-of-file marker
+    assert gzip.decompress(open(target, "rb").read()) == raw
+    ranges = group_frames(frame_list, 5)
+    assert len(ranges) == 5 and ranges[0][0] == 0 and ranges[-1][1] == os.path.getsize(target)
+    assert b"".join(decompress_range(target, start, end) for start, end in ranges) == raw
+
+
+@pytest.mark.parametrize("run_mode", [RunMode.MULTIPROCESS, RunMode.THREADS])
+def test_parallel_modes_split_bgzf_by_frames(tmp_path, run_mode):
+    path = log_path("large")
+    target = str(tmp_path / "large.bin.gz")
+    compress_log(path, target, GZIP)
+    expected = list(MessagesExtractor().from_bin(path, True))
+    assert list(MessagesExtractor().from_bin(target, True, run_mode, num_workers=3)) == expected
+
+
+def test_parallel_decode_of_plain_gzip_falls_back_to_streaming(tmp_path):
+    path = _compressed(tmp_path, "small", "gz")
+    expected = list(MessagesExtractor().from_bin(log_path("small"), wanted_type="GPS"))
+    assert list(MessagesExtractor().from_bin(path, run_mode=RunMode.MULTIPROCESS, num_workers=2,
+                                             wanted_type="GPS")) == expected
+
+
+def test_zstd_frames_split_like_plain(tmp_path):
+    pytest.importorskip("zstandard")
+    path = log_path("large")
+    target = str(tmp_path / "large.bin.zst")
+    compress_log(path, target, ZSTD, frame_size=1 << 20)
+    assert len(frames(target)) == -(-os.path.getsize(path) // (1 << 20))
+    expected = list(MessagesExtractor().from_bin(path, True))
+    assert list(MessagesExtractor().from_bin(target, True, block_size=1 << 20)) == expected
+    assert list(MessagesExtractor().from_bin(target, True, RunMode.MULTIPROCESS, num_workers=2)) == expected
+
+
+def test_async_reader_decompresses(tmp_path):
+    path = _compressed(tmp_path, "small", "gz")
+    expected = list(MessagesExtractor().from_bin(log_path("small")))
+
+    async def collect():
+        return [message async for message in MessagesExtractor().afrom_bin(path, block_size=4_096)]
+
+    assert asyncio.run(collect()) == expected
+
+
+class _CountingSource(io.BytesIO):
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def test_prefetcher_buffers_a_bounded_number_of_blocks():
+    source = _CountingSource(bytes(range(256)) * 100)
+    with Prefetcher(source, block_size=256, max_pending=2) as prefetcher:
+        assert prefetcher.read(10) == bytes(range(10))
+        threading.Event().wait(0.3)
+        # one block handed out, two queued and one waiting to be queued
+        assert source.reads <= 4
+        assert prefetcher.read(246) == bytes(range(10, 256))
+        assert len(prefetcher.read()) == 256 * 99
+        assert prefetcher.read(1) == b""
+
+
+def test_prefetcher_raises_source_errors():
+    class Broken(io.BytesIO):
+        def read(self, size=-1):
+            raise OSError("truncated archive")
+
+    with Prefetcher(Broken(), block_size=16) as prefetcher:
+        with pytest.raises(OSError, match="truncated archive"):
+            prefetcher.read(16)
@@ -0,0 +1,65 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from collections import Counter
+
+import pytest
+
+from business_logic.decimation import Buckets, Every, decimate_messages
+from business_logic.messages_extractor import MessagesExtractor
+from tests.golden import log_path
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture(scope="module")
+def messages():
+    return list(MessagesExtractor().from_bin(log_path("small")))
+
+
+def test_every_nth_per_instance(messages):
+    kept = list(MessagesExtractor().from_bin(log_path("small"), decimate={"IMU": Every(40, by="I"), "ATT": 5}))
+    counts = Counter(m["mavpackettype"] for m in messages)
+    kept_counts = Counter(m["mavpackettype"] for m in kept)
+    assert kept_counts["GPS"] == counts["GPS"]
+    assert kept_counts["ATT"] == -(-counts["ATT"] // 5)
+    imu = [m for m in messages if m["mavpackettype"] == "IMU"]
+    for instance in (0, 1):
+        rows = [m for m in imu if m["I"] == instance]
+        assert [m for m in kept if m["mavpackettype"] == "IMU" and m["I"] == instance] == rows[::40]
+
+
+def test_buckets_aggregate_each_instance(messages):
+    spec = Buckets(100_000, by="I")
+    buckets = [m for m in decimate_messages(messages, {"IMU": spec}) if m["mavpackettype"] == "IMU"]
+    imu = [m for m in messages if m["mavpackettype"] == "IMU"]
+    assert sum(b["Count"] for b in buckets) == len(imu)
+    first = next(b for b in buckets if b["I"] == 1)
+    rows = [m for m in imu if m["I"] == 1 and m["TimeUS"] // 100_000 == first["TimeUS"] // 100_000]
+    assert first["Count"] == len(rows)
+    assert first["AccX_first"] == rows[0]["AccX"] and first["AccX_last"] == rows[-1]["AccX"]
+    assert first["AccX_min"] == min(r["AccX"] for r in rows)
+    assert first["AccX_max"] == max(r["AccX"] for r in rows)
+    assert first["AccX_mean"] == pytest.approx(sum(r["AccX"] for r in rows) / len(rows))
+
+
+def test_columnar_matches_dict_path(messages):
+    decimate = {"IMU": Buckets(100_000, stats=("mean", "max"), by="I"), "ATT": Every(7), "MSG": Buckets(500_000)}
+    tables = MessagesExtractor().from_bin_columns(log_path("small"), decimate=decimate)
+    expected = [m for m in decimate_messages(messages, decimate) if m["mavpackettype"] in decimate]
+    for name in decimate:
+        rows = sorted((m for m in expected if m["mavpackettype"] == name),
+                      key=lambda m: (m["TimeUS"], m.get("I", 0)))
+        table = tables[name]
+        assert len(next(iter(table.values()))) == len(rows)
+        for i, row in enumerate(rows):
+            for col, value in row.items():
+                if col != "mavpackettype":
+                    assert table[col][i] == pytest.approx(value), (name, col, i)
+
+
+def test_invalid_spec_raises():
+    with pytest.raises(ValueError):
+        Buckets(1000, stats=("median",))
+    with pytest.raises(ValueError):
+        list(decimate_messages([], {"IMU": 0}))
@@ -0,0 +1,67 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+pytest.importorskip("pymavlink")
+
+from tests.equivalence import EquivalenceChecker, FieldComparator, ReferenceCache, compare_streams
+from tests.synthetic_log import write_log
+from utils.enums import RunMode
+
+# old_reader multiplies by 0.01 where pymavlink divides by 100, so unrounded
+# centi-scaled fields may differ in the last bit.
+TOLERANCES = {"*": 1e-9}
+
+
+@pytest.fixture(scope="module")
+def log_path(tmp_path_factory):
+    return str(write_log(tmp_path_factory.mktemp("logs") / "synthetic.bin", num_seconds=1.0))
+
+
+@pytest.mark.parametrize("run_mode", [RunMode.NORMAL, RunMode.THREADS])
+def test_streaming_matches_pymavlink(log_path, tmp_path, run_mode):
+    report = EquivalenceChecker(log_path, TOLERANCES, cache_dir=tmp_path).check_streaming(run_mode)
+    assert report.ok, report.summary()
+    assert report.types["GPS"].compared > 0
+
+
+def test_exact_comparison_reports_fields(log_path, tmp_path):
+    report = EquivalenceChecker(log_path, cache_dir=tmp_path).check_streaming()
+    assert not report.ok
+    assert set(report.types["ATT"].field_mismatches) <= {"DesYaw", "ErrYaw"}
+    assert "ATT" in report.summary()
+
+
+def test_sharded_uses_cache(log_path, tmp_path):
+    checker = EquivalenceChecker(log_path, TOLERANCES, cache_dir=tmp_path)
+    report = checker.check_sharded(num_shards=3)
+    assert ReferenceCache(log_path, tmp_path).exists
+    assert report.ok, report.summary()
+    assert report.types["IMU"].compared == ReferenceCache(log_path, tmp_path).manifest["IMU"]["count"]
+
+    cached = checker.check_streaming()
+    assert cached.ok, cached.summary()
+
+
+def test_compare_streams_counts_missing_and_extra():
+    gps = {"mavpackettype": "GPS", "Lat": 31.5}
+    att = {"mavpackettype": "ATT", "Roll": 1.0}
+    report = compare_streams([att, gps, gps], [gps, att, att], FieldComparator())
+    assert report.types["GPS"].extra == 1
+    assert report.types["ATT"].missing == 1
+    assert report.types["ATT"].compared == 1
+
+
+def test_cache_is_written_in_blocks(log_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(ReferenceCache, "BLOCK_ROWS", 64)
+    cache = ReferenceCache(log_path, tmp_path).ensure()
+    imu = cache.manifest["IMU"]
+    assert len(imu["block_ends"]) == -(-imu["count"] // 64)
+    assert len(cache.load_block("IMU", 0)["TimeUS"]) == 64
+    assert cache.first_index("IMU", 0) == 0
+    assert cache.first_index("IMU", imu["block_ends"][1]) == 128
+    assert cache.fmt_messages()[130]["Name"] == "GPS"
+
+    report = EquivalenceChecker(log_path, TOLERANCES, cache_dir=tmp_path).check_sharded(num_shards=3)
+    assert report.ok, report.summary()
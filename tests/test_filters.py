@@ -0,0 +1,82 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from business_logic.messages_extractor import MessagesExtractor
+from business_logic.predicates import compile_row_filter
+from tests.golden import log_path
+from utils.enums import RunMode
+
+GPS_FILTER = {"GPS": "I == 1 and Status >= 5"}
+
+
+def _gps(path, **kwargs):
+    return [m for m in MessagesExtractor().from_bin(path, **kwargs) if m["mavpackettype"] == "GPS"]
+
+
+@pytest.mark.parametrize("run_mode", [RunMode.NORMAL, RunMode.THREADS, RunMode.MULTIPROCESS])
+def test_expression_filter_matches_post_filter(run_mode):
+    path = log_path("small")
+    expected = [m for m in _gps(path) if m["I"] == 1 and m["Status"] >= 5]
+    actual = _gps(path, run_mode=run_mode, num_workers=2, filters=GPS_FILTER)
+    assert expected and actual == expected
+
+
+def test_filter_sees_raw_values_and_other_types_pass():
+    path = log_path("small")
+    everything = list(MessagesExtractor().from_bin(path))
+    filtered = list(MessagesExtractor().from_bin(path, filters={"GPS": "Lat > 315000000", "PARM": lambda v: False}))
+    assert all(m["Lat"] > 31.5 for m in filtered if m["mavpackettype"] == "GPS")
+    assert not [m for m in filtered if m["mavpackettype"] == "PARM"]
+    assert len([m for m in filtered if m["mavpackettype"] == "IMU"]) == \
+        len([m for m in everything if m["mavpackettype"] == "IMU"])
+
+
+def test_filter_columns_are_unpacked_but_not_returned():
+    path = log_path("small")
+    actual = _gps(path, columns={"GPS": ["Lat", "Lng"]}, filters=GPS_FILTER)
+    expected = [{"mavpackettype": "GPS", "Lat": m["Lat"], "Lng": m["Lng"]}
+                for m in _gps(path) if m["I"] == 1 and m["Status"] >= 5]
+    assert actual == expected
+
+
+def test_row_filter_compilation():
+    cols = ["TimeUS", "I", "Name"]
+    assert compile_row_filter("I in (1, 2) and not TimeUS < 10", cols)((11, 2, b"x"))
+    assert not compile_row_filter("5 < TimeUS < 10 or Name == b'y'", cols)((11, 2, b"x"))
+    with pytest.raises(ValueError, match="Alt"):
+        compile_row_filter("Alt > 3", cols, "GPS")
+    with pytest.raises(ValueError, match="Call"):
+        compile_row_filter("__import__('os')", cols)
+
+
+def test_columnar_matches_dict_path():
+    np = pytest.importorskip("numpy")
+    path = log_path("small")
+    tables = MessagesExtractor().from_bin_columns(path, filters=GPS_FILTER, columns={"GPS": ["TimeUS", "Lat"]})
+    expected = [m for m in _gps(path) if m["I"] == 1 and m["Status"] >= 5]
+    assert set(tables["GPS"]) == {"TimeUS", "Lat"}
+    assert tables["GPS"]["TimeUS"].tolist() == [m["TimeUS"] for m in expected]
+    assert tables["GPS"]["Lat"].tolist() == [m["Lat"] for m in expected]
+
+    messages = list(MessagesExtractor().from_bin(path))
+    for name in ("PARM", "MSG", "FILE", "IMU", "ATT"):
+        rows = [m for m in messages if m["mavpackettype"] == name]
+        for col, values in tables[name].items():
+            assert values.tolist() == [m[col] for m in rows], (name, col)
+
+    callable_mask = MessagesExtractor().from_bin_columns(path, wanted_types=["IMU"],
+                                                         filters={"IMU": lambda c: c["I"] == 0})
+    assert list(callable_mask) == ["IMU"]
+    assert np.all(callable_mask["IMU"]["I"] == 0)
+
+
+@pytest.mark.parametrize("name, expression", [("GPS", "not I"), ("GPS", "not I and Status >= 3"),
+                                              ("PARM", "Name == b'GPS_TYPE'"), ("PARM", "Name in (b'GPS_TYPE', b'x')")])
+def test_not_and_strings_match_on_both_paths(name, expression):
+    pytest.importorskip("numpy")
+    path = log_path("small")
+    rows = [m for m in MessagesExtractor().from_bin(path, filters={name: expression}) if m["mavpackettype"] == name]
+    table = MessagesExtractor().from_bin_columns(path, wanted_types=[name], filters={name: expression})[name]
+    assert rows and table["TimeUS"].tolist() == [m["TimeUS"] for m in rows]
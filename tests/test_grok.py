@@ -6,13 +6,17 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import math
 import pytest
-from pymavlink import mavutil
+mavutil = pytest.importorskip("pymavlink.mavutil")
 from business_logic.messages_extractor import MessagesExtractor
 from utils.enums import RunMode
 from utils.logger import AppLogger
 
 logger = AppLogger("Tests")
-BIN_PATH = r"C:\Users\Menachem\Desktop\9900\Hafifa\log_file_test_01.bin"
+BIN_PATH = os.environ.get("BIN_PATH", r"C:\Users\Menachem\Desktop\9900\Hafifa\log_file_test_01.bin")
+
+# Full pymavlink comparison on a real flight log; the synthetic logs are
+# covered by test_golden.py and test_equivalence.py.
+pytestmark = pytest.mark.skipif(not os.path.exists(BIN_PATH), reason=f"reference log not found: {BIN_PATH}")
 
 
 def fix_nan_message(message: dict):
@@ -0,0 +1,68 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from business_logic.columnar_reader import ColumnarReader
+from business_logic.messages_extractor import MessagesExtractor
+from business_logic.decimation import Every
+from tests.golden import log_path
+
+
+def _tables(**kwargs):
+    return MessagesExtractor().from_bin_columns(log_path("small"), **kwargs)
+
+
+def _rows(table, keep):
+    return {col: values[keep] for col, values in table.items()}
+
+
+def test_selected_instance_equals_filtered_table():
+    full = _tables(wanted_types=["IMU", "GPS"])
+    only = _tables(wanted_types=["IMU", "GPS"], instances={"IMU": [1]})
+    expected = _rows(full["IMU"], full["IMU"]["I"] == 1)
+    assert set(only["IMU"]) == set(expected)
+    for col in expected:
+        assert np.array_equal(only["IMU"][col], expected[col])
+    assert len(only["GPS"]["I"]) == len(full["GPS"]["I"])
+
+
+def test_tables_by_instance():
+    full = _tables()
+    split = _tables(by_instance=True, columns={"GPS": ["TimeUS", "Lat"]}, filters={"GPS": "Status >= 4"})
+    assert {key for key in split if key[0] == "IMU"} == {("IMU", 0), ("IMU", 1)}
+    assert ("ATT", None) in split and np.array_equal(split[("ATT", None)]["Roll"], full["ATT"]["Roll"])
+
+    gps = full["GPS"]
+    for instance in (0, 1):
+        expected = _rows(gps, (gps["I"] == instance) & (gps["Status"] >= 4))
+        assert list(split[("GPS", instance)]) == ["TimeUS", "Lat"]
+        assert np.array_equal(split[("GPS", instance)]["Lat"], expected["Lat"])
+
+
+def test_decimation_applies_per_instance():
+    split = _tables(wanted_types=["IMU"], by_instance=True, decimate={"IMU": Every(10)})
+    full = _tables(wanted_types=["IMU"], by_instance=True)
+    assert np.array_equal(split[("IMU", 1)]["TimeUS"], full[("IMU", 1)]["TimeUS"][::10])
+
+
+def test_instance_offsets_index():
+    with open(log_path("small"), "rb") as file:
+        data = file.read()
+    reader = ColumnarReader()
+    index = reader.instance_offsets(data)
+    offsets = reader.message_offsets(data)
+    for type_msg, groups in index.items():
+        assert np.array_equal(np.sort(np.concatenate(list(groups.values()))), offsets[type_msg])
+        has_instance = "I" in reader.fmt_messages[type_msg]["cols"]
+        assert (None in groups) != has_instance
+        for instance, positions in groups.items():
+            if instance is not None:
+                assert all(data[pos + 3 + 8] == instance for pos in positions)  # I follows TimeUS
+
+
+def test_instances_need_an_instance_column():
+    with pytest.raises(ValueError, match="no I column"):
+        _tables(instances={"ATT": [0]})
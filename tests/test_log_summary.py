@@ -0,0 +1,45 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from collections import Counter
+
+from business_logic.log_summary import summarize
+from business_logic.messages_extractor import MessagesExtractor
+from tests.golden import log_path
+from tests.synthetic_log import build_log, message_length
+
+
+def test_summary_matches_full_decode():
+    path = log_path("small")
+    messages = list(MessagesExtractor().from_bin(path))
+    summary = MessagesExtractor().summarize(path)
+
+    assert {name: s.count for name, s in summary.types.items()} == Counter(m["mavpackettype"] for m in messages)
+    gps = [m for m in messages if m["mavpackettype"] == "GPS"]
+    assert summary.types["GPS"].first_time_us == gps[0]["TimeUS"]
+    assert summary.types["GPS"].last_time_us == gps[-1]["TimeUS"]
+    assert summary.types["GPS"].bytes == len(gps) * message_length(130)
+    assert summary.types["FILE"].first_time_us is None
+    assert summary.corrupt_bytes == 0
+    assert sum(s.bytes for s in summary.types.values()) == summary.file_size
+
+
+def test_summary_reports_gaps(tmp_path):
+    data = bytearray(build_log(0.2))
+    middle = len(data) // 2
+    data[middle:middle + 50] = b"\x00" * 50
+    data += b"\xA3\x95\x83"  # truncated ATT header at the end
+    path = tmp_path / "corrupt.bin"
+    path.write_bytes(bytes(data))
+
+    summary = summarize(str(path))
+    assert summary.gaps[-1][1] == len(data)
+    assert 50 <= summary.corrupt_bytes < 50 + 2 * message_length(131) + 3
+    assert summary.gaps[0][0] < middle + 50 <= summary.gaps[0][1]
+    assert "corrupt bytes" in str(summary)
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    assert summarize(str(path)).message_count == 0
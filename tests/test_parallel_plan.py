@@ -0,0 +1,50 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "business_logic")))
+
+from business_logic import parallel_plan
+from business_logic.messages_extractor import MessagesExtractor
+from multi_process_reader import MultiProcessReader
+from business_logic.parallel_plan import MIN_CHUNK_SIZE, SERIAL_BELOW, Calibration, ParallelPlan, plan_parallel
+from tests.golden import log_path
+from utils.enums import RunMode
+
+MB = 1024 * 1024
+
+
+def test_small_files_are_serial():
+    plan = plan_parallel(SERIAL_BELOW - 1, Calibration(1e-6, 0.0))
+    assert plan.serial and plan.chunks == 1 and plan.predicted_seconds is None
+
+
+def test_plan_uses_cpus_and_splits_finer_than_workers(monkeypatch):
+    monkeypatch.setattr(parallel_plan, "available_cpus", lambda: 8)
+    plan = plan_parallel(200 * MB, Calibration(decode=1e-7, transfer=0.0))
+    assert plan.workers == 8 and plan.chunks == 32
+    assert plan.predicted_seconds < plan.serial_seconds
+
+    assert plan_parallel(200 * MB, Calibration(1e-7, 0.0), max_workers=2).workers == 2
+    assert plan_parallel(10 * MB, Calibration(1e-7, 0.0)).chunks <= 10 * MB // MIN_CHUNK_SIZE
+
+
+def test_costly_transfer_or_one_cpu_stays_serial(monkeypatch):
+    monkeypatch.setattr(parallel_plan, "available_cpus", lambda: 8)
+    assert plan_parallel(200 * MB, Calibration(decode=1e-8, transfer=1e-8)).serial
+    monkeypatch.setattr(parallel_plan, "available_cpus", lambda: 1)
+    assert plan_parallel(200 * MB, Calibration(decode=1e-7, transfer=0.0)).serial
+
+
+def test_adaptive_run_records_plan():
+    path = log_path("small")
+    expected = list(MessagesExtractor().from_bin(path))
+    assert list(MessagesExtractor().from_bin(path, run_mode=RunMode.MULTIPROCESS)) == expected
+    plan = MultiProcessReader.LAST_PLAN
+    assert plan.serial and plan.actual_seconds is not None and "actual" in str(plan)
+
+
+def test_more_chunks_than_workers(monkeypatch):
+    path = log_path("small")
+    monkeypatch.setattr(MultiProcessReader, "plan",
+                        lambda self, data, to_round, num_workers=None: ParallelPlan(len(data), 2, 2, 6))
+    messages = MultiProcessReader().process_in_parallel(path, None, False, "")
+    assert messages == list(MessagesExtractor().from_bin(path))
@@ -0,0 +1,41 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from business_logic.messages_extractor import MessagesExtractor
+from business_logic.old_reader import Reader
+from tests.golden import log_path
+from utils.enums import RunMode
+
+COLUMNS = {"GPS": ["TimeUS", "Lat", "Lng"], "PARM": ["Value"], "FILE": ["FileName", "Length"]}
+
+
+@pytest.mark.parametrize("run_mode", [RunMode.NORMAL, RunMode.THREADS, RunMode.MULTIPROCESS])
+def test_projection_keeps_requested_columns(run_mode):
+    path = log_path("small")
+    full = list(MessagesExtractor().from_bin(path, True, run_mode=run_mode, num_workers=2))
+    projected = list(MessagesExtractor().from_bin(path, True, run_mode=run_mode, num_workers=2, columns=COLUMNS))
+
+    assert len(projected) == len(full)
+    for whole, narrow in zip(full, projected):
+        wanted = COLUMNS.get(whole["mavpackettype"])
+        if wanted is None:
+            assert narrow == whole
+        else:
+            assert narrow == {"mavpackettype": whole["mavpackettype"], **{col: whole[col] for col in wanted}}
+
+
+def test_projection_pads_unwanted_fields():
+    reader = Reader()
+    config = {"Name": "GPS", "Type": 130, "Format": "QBBIHBcLLeffffB",
+              "cols": "TimeUS,I,Status,GMS,GWk,NSats,HDop,Lat,Lng,Alt,Spd,GCrs,VZ,Yaw,U".split(",")}
+    projected, unpacker = reader.compile_projection(config, ["Lng", "TimeUS"])
+    assert projected["cols"] == ["TimeUS", "Lng"]
+    assert projected["Format"] == "QL"
+    assert unpacker.format == "<Q15xi21x"
+
+
+def test_projection_rejects_unknown_column():
+    with pytest.raises(ValueError, match="Altitude"):
+        list(MessagesExtractor().from_bin(log_path("small"), columns={"GPS": ["Altitude"]}))
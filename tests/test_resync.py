@@ -0,0 +1,72 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+
+from business_logic.header_walk import HeaderWalker
+from business_logic.old_reader import Reader
+from business_logic.resync import find_header, message_lengths
+from tests.synthetic_log import build_log, message_length
+
+
+def _read(data):
+    reader = Reader()
+    return list(reader.read_messages(data, False)), reader
+
+
+def test_fake_headers_in_garbage_are_rejected():
+    clean = build_log(0.2)
+    messages, _ = _read(clean)
+    # Known type ids followed by garbage instead of the next header.
+    garbage = b"\x01\xA3\x95\x83" + bytes(10) + b"\xA3\x95\x82\x01\x02" + b"\xA3\x95\xFE" + bytes(7)
+    middle = clean.find(b"\xA3\x95\x84", len(clean) // 2)
+    data = clean[:middle] + garbage + clean[middle:]
+
+    corrupted, reader = _read(data)
+    assert corrupted == messages
+    assert reader.skipped == [(middle, middle + len(garbage))]
+
+
+def test_bad_fmt_does_not_raise_or_register():
+    clean = build_log(0.1)
+    fake_fmt = bytearray(clean[:89])
+    fake_fmt[3] = 0x90
+    fake_fmt[9:25] = b"Q?".ljust(16, b"\x00")  # '?' is not a format letter
+    tail = clean[clean.find(b"\xA3\x95\x84", len(clean) // 2):]
+    messages, _ = _read(clean + tail)
+    corrupted, reader = _read(clean + bytes(fake_fmt) + tail)
+    assert corrupted == messages
+    assert 0x90 not in reader.fmt_messages
+    assert reader.skipped[0][0] == len(clean)
+
+
+def test_random_corruption_recovers_most_messages():
+    clean = bytearray(build_log(1.0))
+    messages, _ = _read(bytes(clean))
+    rng = random.Random(7)
+    for _ in range(20):
+        pos = rng.randrange(1000, len(clean) - 100)
+        clean[pos:pos + 20] = rng.randbytes(20)
+    corrupted, reader = _read(bytes(clean))
+    assert len(corrupted) > 0.95 * len(messages)
+    assert 0 < sum(end - start for start, end in reader.skipped) < 20 * (20 + 2 * max(map(message_length, (130, 131))))
+
+
+def test_walker_and_reader_agree():
+    data = bytearray(build_log(0.5))
+    data[5000:5040] = bytes(40)
+    data[9000:9003] = b"\xA3\x95\x83"
+    messages, reader = _read(bytes(data))
+    walker = HeaderWalker()
+    positions = list(walker.walk(bytes(data)))
+    assert len(positions) == len(messages)
+    assert walker.skipped == reader.skipped
+
+
+def test_find_header_keeps_cut_tail():
+    lengths = message_lengths({0x83: {"Length": 40}}, Reader.FMT_MSG_LENGTH)
+    data = bytes(10) + b"\xA3\x95\x83" + bytes(5)
+    assert find_header(data, 0, len(data), lengths) == 10
+    assert find_header(data + b"\xA3", 0, len(data) + 1, lengths) == 10
+    assert find_header(bytes(10) + b"\xA3\x95", 0, 12, lengths) == 10
+    assert find_header(bytes(10) + b"\xA3\x95\x83" + bytes(50), 0, 63, lengths) == -1
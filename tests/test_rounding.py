@@ -0,0 +1,55 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from business_logic.columnar_reader import round_column
+from business_logic.messages_extractor import MessagesExtractor
+from business_logic.old_reader import Reader
+from tests.golden import log_path
+
+
+def _bits(values):
+    return [struct.pack("<d", value) for value in values]
+
+
+def _python(values, digits=7):
+    return [round(value, digits) for value in values]
+
+
+EDGE_CASES = [
+    0.0, -0.0, 1e-9, -1e-9, 5e-8, -5e-8, 1.5e-7, -1.5e-7, 2.5e-7, -2.5e-7,  # halves of the last digit
+    0.00390625, -0.00390625,  # 39062.5 after scaling, an exact tie
+    83.12986365, -83.12986365, 86.20044795, 30.396776250000002,  # products that land on the wrong side
+    134738418390.42566, -58180229168.484985, 1e300, -1e-300,  # too large to scale exactly
+    float("nan"), float("inf"), float("-inf"),
+]
+
+
+def test_edge_cases_match_python_round():
+    assert _bits(round_column(np.array(EDGE_CASES))) == _bits(_python(EDGE_CASES))
+
+
+@pytest.mark.parametrize("digits", [0, 2, 7])
+def test_random_halves_and_scaled_integers(digits):
+    rng = np.random.default_rng(digits)
+    halves = (rng.integers(-10 ** 9, 10 ** 9, 20_000) + 0.5) / 10.0 ** digits
+    near = np.nextafter(halves, np.inf)
+    lat = rng.integers(-2 ** 31, 2 ** 31, 20_000) * 1e-7
+    centi = rng.integers(-2 ** 31, 2 ** 31, 20_000) * 0.01
+    for values in (halves, -halves, near, lat, centi):
+        assert _bits(round_column(values, digits)) == _bits(_python(values.tolist(), digits))
+
+
+def test_columnar_rounding_equals_dict_path():
+    path = log_path("small")
+    tables = MessagesExtractor().from_bin_columns(path, to_round=True)
+    messages = list(MessagesExtractor().from_bin(path, to_round=True))
+    for name, table in tables.items():
+        rows = [m for m in messages if m["mavpackettype"] == name]
+        for col in set(table) & Reader.ROUND:
+            assert _bits(table[col].tolist()) == _bits([m[col] for m in rows]), (name, col)
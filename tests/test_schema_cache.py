@@ -0,0 +1,66 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from business_logic import schema_cache
+from business_logic.old_reader import Reader
+from business_logic.schema_cache import compile_struct, decoder_for, fmt_key, load_schemas, save_schemas, schema_for
+from tests.golden import log_path
+from tests.synthetic_log import build_log
+
+
+def _fmt_table(data):
+    reader = Reader()
+    for _ in reader.read_messages(data, False):
+        pass
+    return reader.fmt_messages
+
+
+def test_decoders_match_build_msg():
+    data = build_log(0.5)
+    reader = Reader()
+    fmt_messages = _fmt_table(data)
+    view = memoryview(data)
+    pos = 0
+    while pos < len(data):
+        msg_config = fmt_messages.get(data[pos + 2])
+        if msg_config is None:
+            pos += Reader.FMT_MSG_LENGTH
+            continue
+        values = compile_struct(msg_config["Format"]).unpack_from(view, pos + 3)
+        for to_round in (False, True):
+            assert decoder_for(msg_config, to_round)(values) == reader._build_msg(values, msg_config, to_round)
+        pos += msg_config["Length"]
+
+
+def test_identical_tables_share_one_schema():
+    first = _fmt_table(build_log(0.1, seed=1))
+    second = _fmt_table(build_log(0.3, seed=2))
+    assert first is not second and fmt_key(first) == fmt_key(second)
+    assert schema_for(first) is schema_for(second)
+    assert fmt_key(dict(reversed(list(first.items())))) == fmt_key(first)
+
+    misses = compile_struct.cache_info().misses
+    list(Reader().read_messages(build_log(0.2, seed=3), True))
+    assert compile_struct.cache_info().misses == misses
+
+
+def test_schema_does_not_follow_later_changes_to_the_table():
+    fmt_messages = _fmt_table(build_log(0.1))
+    partial = {type_msg: fmt_messages[type_msg] for type_msg in list(fmt_messages)[:3]}
+    schema = schema_for(partial)
+    partial.update(fmt_messages)
+    partial[next(iter(partial))]["Name"] = "XXXX"
+    assert len(schema.fmt_messages) == 3 and schema.key == fmt_key(schema.fmt_messages)
+    assert schema_for(partial) is not schema
+
+
+def test_saved_schemas_warm_a_fresh_cache(tmp_path):
+    fmt_messages = _fmt_table(open(log_path("small"), "rb").read())
+    schema_for(fmt_messages)
+    save_schemas(str(tmp_path / "schemas.json"))
+    schema_cache.clear()
+
+    schemas = load_schemas(str(tmp_path / "schemas.json"), to_round=False)
+    assert fmt_key(fmt_messages) in {schema.key for schema in schemas}
+    assert schema_for(fmt_messages).structs.keys() == fmt_messages.keys()
+    assert compile_struct.cache_info().currsize > 0
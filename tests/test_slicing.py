@@ -0,0 +1,70 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from business_logic import slicing
+from business_logic.messages_extractor import MessagesExtractor
+from business_logic.slicing import ALWAYS_KEPT, slice_log
+from tests.golden import log_path
+from tests.synthetic_log import build_log, write_log
+
+
+def _decode(path):
+    return list(MessagesExtractor().from_bin(str(path)))
+
+
+def test_slice_without_selection_copies_the_log(tmp_path):
+    path = log_path("small")
+    report = slice_log(path, tmp_path / "copy.bin")
+    with open(path, "rb") as file:
+        assert (tmp_path / "copy.bin").read_bytes() == file.read()
+    assert report.ranges == 1 and report.bytes_written == os.path.getsize(path)
+
+
+def test_slice_keeps_fmt_and_selected_messages_in_window(tmp_path):
+    path = log_path("small")
+    window = (1_500_000, 2_000_000)
+    report = slice_log(path, tmp_path / "gps.bin", time_range=window, types=["GPS", "FILE"])
+
+    expected = [m for m in _decode(path)
+                if m["mavpackettype"] in ALWAYS_KEPT | {"FILE"}
+                or (m["mavpackettype"] == "GPS" and window[0] <= m["TimeUS"] < window[1])]
+    actual = _decode(tmp_path / "gps.bin")
+    assert actual == expected
+    assert report.messages == len(expected)
+    assert any(m["mavpackettype"] == "GPS" for m in actual)
+
+
+def test_open_time_range(tmp_path):
+    path = log_path("small")
+    slice_log(path, tmp_path / "tail.bin", time_range=(1_900_000, None))
+    kept = [m for m in _decode(tmp_path / "tail.bin") if "TimeUS" in m]
+    assert kept and min(m["TimeUS"] for m in kept) >= 1_900_000
+
+
+def test_corrupt_bytes_are_not_copied(tmp_path):
+    data = bytearray(build_log(1.0))
+    cut = data.find(b"\xA3\x95\x83", len(data) // 2)
+    source = tmp_path / "corrupt.bin"
+    source.write_bytes(bytes(data[:cut]) + b"\x01garbage\xA3" + bytes(data[cut:]))
+
+    report = slice_log(source, tmp_path / "clean.bin")
+    assert report.skipped == [(cut, cut + 9)]
+    assert report.ranges == 2
+    assert (tmp_path / "clean.bin").read_bytes() == bytes(data)
+
+
+@pytest.mark.parametrize("kernel_copy", [True, False])
+def test_large_ranges_are_copied_by_the_kernel_or_in_memory(tmp_path, monkeypatch, kernel_copy):
+    source = write_log(tmp_path / "log.bin", 3.0)
+    monkeypatch.setattr(slicing, "COPY_MIN_SIZE", 1)
+    monkeypatch.setattr(slicing, "WRITE_BUFFER_SIZE", 64)
+    if not kernel_copy:
+        def unsupported(*args):
+            raise OSError("copy_file_range not supported")
+        monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+
+    slice_log(source, tmp_path / "imu.bin", types=["IMU", "ATT"])
+    expected = [m for m in _decode(source) if m["mavpackettype"] in ALWAYS_KEPT | {"IMU", "ATT"}]
+    assert _decode(tmp_path / "imu.bin") == expected
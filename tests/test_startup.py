@@ -0,0 +1,39 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import multiprocessing
+
+import pytest
+
+from benchmarks.import_budget import LAZY_MODULES, import_time
+from business_logic import parallel_plan
+from business_logic.messages_extractor import MessagesExtractor
+from utils.enums import RunMode
+from tests.golden import log_path
+
+
+@pytest.mark.parametrize("module", ["business_logic.messages_extractor", "business_logic.worker"])
+def test_optional_backends_are_imported_lazily(module):
+    _, loaded = import_time(module)
+    assert not set(LAZY_MODULES) & loaded
+
+
+def test_worker_does_not_import_the_pool_side():
+    _, loaded = import_time("business_logic.worker")
+    assert not {"business_logic.parallel_plan", "business_logic.backends", "utils.logger"} & loaded
+
+
+@pytest.mark.skipif("forkserver" not in multiprocessing.get_all_start_methods(), reason="no forkserver")
+def test_forkserver_pool(monkeypatch):
+    monkeypatch.setattr(parallel_plan, "START_METHOD", None)
+    parallel_plan.set_start_method("forkserver")
+    assert parallel_plan.pool_context().get_start_method() == "forkserver"
+
+    path = log_path("small")
+    pooled = list(MessagesExtractor().from_bin(path, run_mode=RunMode.MULTIPROCESS, num_workers=2))
+    assert pooled == list(MessagesExtractor().from_bin(path))
+
+
+def test_unknown_start_method():
+    with pytest.raises(ValueError, match="start method"):
+        parallel_plan.set_start_method("vfork")
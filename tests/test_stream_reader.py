@@ -0,0 +1,60 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import tracemalloc
+
+import pytest
+
+from benchmarks.resync_fuzz import CORRUPTIONS
+
+from business_logic.messages_extractor import MessagesExtractor
+from business_logic.old_reader import Reader
+from business_logic.stream_reader import StreamReader
+from tests.golden import log_path
+from tests.synthetic_log import build_log
+
+
+@pytest.mark.parametrize("block_size", [89, 1000, 4096, 10 ** 9])
+def test_blocks_match_whole_file(block_size):
+    path = log_path("small")
+    with open(path, "rb") as file:
+        expected = list(Reader().read_messages(file.read(), True))
+    assert list(StreamReader(block_size).messages(path, True)) == expected
+
+
+@pytest.mark.parametrize("corruption", CORRUPTIONS)
+def test_corrupted_log_does_not_depend_on_block_size(tmp_path, corruption):
+    data = CORRUPTIONS[corruption](build_log(2.0, seed=1), random.Random(1))
+    path = tmp_path / "corrupted.bin"
+    path.write_bytes(data)
+    expected = repr(list(Reader().read_messages(data, False)))  # repr: corrupted floats include NaN
+    for block_size in (89, 97, 331, 4096):
+        assert repr(list(StreamReader(block_size).messages(str(path)))) == expected, block_size
+
+
+def test_wanted_type_and_filters_across_blocks():
+    path = log_path("small")
+    expected = list(MessagesExtractor().from_bin(path, wanted_type="GPS", filters={"GPS": "I == 1"},
+                                                 block_size=10 ** 9))
+    assert list(MessagesExtractor().from_bin(path, wanted_type="GPS", filters={"GPS": "I == 1"},
+                                             block_size=777)) == expected
+    assert expected and all(m["I"] == 1 for m in expected)
+
+
+def test_peak_memory_does_not_follow_file_size():
+    path = log_path("large")
+    block_size = 256 * 1024
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in MessagesExtractor().from_bin(path, block_size=block_size))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert count > 100_000
+    assert peak < 4 * block_size + 1024 * 1024 < os.path.getsize(path)
+
+
+def test_block_size_must_fit_a_fmt():
+    with pytest.raises(ValueError):
+        StreamReader(10)
@@ -0,0 +1,43 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from business_logic.messages_extractor import MessagesExtractor
+from business_logic.schema_cache import STRING_CACHE_SIZE, decode_name, decode_text
+from tests.synthetic_log import write_log
+
+
+def test_names_are_interned_and_text_is_cached():
+    name = decode_name(b"GPS_TYPE" + bytes(8))
+    assert name == "GPS_TYPE" and name is sys.intern("GPS_" + "TYPE")
+    assert decode_text(b"EKF3 IMU0\x00garbage") == "EKF3 IMU0"
+    assert decode_text.cache_info().maxsize == decode_name.cache_info().maxsize == STRING_CACHE_SIZE
+
+
+def test_repeated_strings_share_one_object(tmp_path):
+    path = write_log(tmp_path / "log.bin", 4.0)
+    messages = list(MessagesExtractor().from_bin(str(path)))
+    texts = [m["Message"] for m in messages if m["mavpackettype"] == "MSG"]
+    assert len(texts) > len(set(texts))
+    by_value = {}
+    for text in texts:
+        assert by_value.setdefault(text, text) is text
+
+
+def test_lazy_string_columns_decode_on_demand(tmp_path):
+    np = pytest.importorskip("numpy")
+    from business_logic.columnar_reader import decode_column
+
+    path = str(write_log(tmp_path / "log.bin", 4.0))
+    eager = MessagesExtractor().from_bin_columns(path, wanted_types=["PARM", "MSG"])
+    lazy = MessagesExtractor().from_bin_columns(path, wanted_types=["PARM", "MSG"], lazy_strings=True)
+
+    assert lazy["PARM"]["Name"].dtype == np.dtype("S16") and lazy["MSG"]["Message"].dtype == np.dtype("S64")
+    assert np.array_equal(lazy["PARM"]["Value"], eager["PARM"]["Value"])
+    for name, col in (("PARM", "Name"), ("MSG", "Message")):
+        assert eager[name][col].dtype == object
+        assert decode_column(lazy[name][col]).tolist() == eager[name][col].tolist()
+
+    dicts = [m["Message"] for m in MessagesExtractor().from_bin(path, wanted_type="MSG")]
+    assert eager["MSG"]["Message"].tolist() == dicts
@@ -0,0 +1,73 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import itertools
+
+import pytest
+
+from business_logic.messages_extractor import MessagesExtractor
+from business_logic.time_merge import merge_by_time, merge_columns, split_instances, stream_key
+from utils.enums import RunMode
+from tests.golden import log_path
+
+
+def _msg(name, time=None, **fields):
+    message = {"mavpackettype": name, **fields}
+    if time is not None:
+        message["TimeUS"] = time
+    return message
+
+
+def test_merge_keeps_ties_and_untimed_messages_in_stream_order():
+    first = [_msg("A", 1), _msg("FILE"), _msg("A", 5)]
+    second = [_msg("B", 1), _msg("B", 3), _msg("B", 5)]
+    merged = [(m["mavpackettype"], m.get("TimeUS")) for m in merge_by_time([first, second])]
+    assert merged == [("A", 1), ("FILE", None), ("B", 1), ("B", 3), ("A", 5), ("B", 5)]
+
+
+def test_merge_is_lazy():
+    def ticks(name, step):
+        for tick in itertools.count():
+            yield _msg(name, tick * step)
+
+    merged = itertools.islice(merge_by_time([ticks("A", 3), ticks("B", 2)]), 6)
+    assert [m["TimeUS"] for m in merged] == [0, 0, 2, 3, 4, 6]
+
+
+def test_merged_streams_of_a_log():
+    path = log_path("small")
+    streams = [("GPS", 0), ("GPS", 1), "ATT"]
+    merged = list(MessagesExtractor().from_bin_merged(path, streams, block_size=4_096))
+
+    wanted = {("GPS", 0), ("GPS", 1), ("ATT", None)}
+    expected = [m for m in MessagesExtractor().from_bin(path) if stream_key(m) in wanted]
+    assert merged == sorted(expected, key=lambda m: m["TimeUS"])
+    assert {stream_key(m) for m in merged} == wanted
+
+
+def test_merged_instance_of_a_type_without_instances():
+    with pytest.raises(ValueError, match="ATT has no I column"):
+        next(MessagesExtractor().from_bin_merged(log_path("small"), [("GPS", 0), ("ATT", 0)]))
+
+
+@pytest.mark.parametrize("run_mode", [RunMode.NORMAL, RunMode.MULTIPROCESS])
+def test_from_bin_in_time_order(run_mode):
+    path = log_path("small")
+    file_order = list(MessagesExtractor().from_bin(path))
+    ordered = list(MessagesExtractor().from_bin(path, run_mode=run_mode, num_workers=2, order_by_time=True))
+    times = [m["TimeUS"] for m in ordered if "TimeUS" in m]
+    assert times == sorted(times)
+    assert sorted(map(repr, ordered)) == sorted(map(repr, file_order))
+
+
+def test_merge_columns_over_instances():
+    np = pytest.importorskip("numpy")
+    tables = MessagesExtractor().from_bin_columns(log_path("small"), wanted_types=["GPS", "BARO"])
+    streams = split_instances(tables)
+    assert set(streams) == {("GPS", 0), ("GPS", 1), ("BARO", 0)}
+
+    merged = list(merge_columns(streams))
+    times = [int(streams[key]["TimeUS"][row]) for key, row in merged]
+    assert times == sorted(times)
+    assert len(merged) == len(tables["GPS"]["TimeUS"]) + len(tables["BARO"]["TimeUS"])
+    assert np.array_equal(streams[("GPS", 1)]["I"], np.ones(len(streams[("GPS", 1)]["I"])))
@@ -0,0 +1,37 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from business_logic.messages_extractor import MessagesExtractor
+from business_logic.track import extract_track
+from tests.golden import log_path
+from tests.synthetic_log import build_log
+
+
+def _expected(path, instance, min_status):
+    return [(m["Lat"], m["Lng"]) for m in MessagesExtractor().from_bin(path, wanted_type="GPS")
+            if m["I"] == instance and m["Status"] >= min_status]
+
+
+@pytest.mark.parametrize("instance, min_status", [(0, 3), (1, 3), (0, 0), (1, 6)])
+def test_track_matches_full_decode(instance, min_status):
+    path = log_path("small")
+    track = extract_track(path, instance, min_status)
+    assert track.shape == (len(_expected(path, instance, min_status)), 2)
+    assert [tuple(point) for point in track] == _expected(path, instance, min_status)
+
+
+def test_track_of_corrupted_and_empty_logs(tmp_path):
+    data = bytearray(build_log(1.0))
+    gps = data.find(b"\xA3\x95\x82", len(data) // 2)
+    data[gps + 10:gps + 13] = b"\xA3\x95\x82"  # fake GPS header inside a GPS payload
+    path = tmp_path / "damaged.bin"
+    path.write_bytes(bytes(data))
+    assert [tuple(point) for point in MessagesExtractor().extract_track(str(path))] == _expected(str(path), 0, 3)
+
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    assert extract_track(str(empty)).shape == (0, 2)
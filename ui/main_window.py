@@ -1,7 +1,6 @@
 import flet as ft
 
 from ui.map_view import MapView
-from business_logic.messages_extractor import CoordinateExtractor
 from utils.logger import AppLogger
 
 
@@ -46,8 +45,14 @@ class MainWindow:
             self._add_coordinates_from_file(path)
 
     def _add_coordinates_from_file(self, path: str) -> None:
+        # Imported here so the window opens before the decoder is loaded.
+        from business_logic.messages_extractor import MessagesExtractor
+
         print(f"Chosen file: {path}")
-        coordinates: list[tuple[float, float]] = CoordinateExtractor().from_bin(path)
+        coordinates = MessagesExtractor().extract_track(path)
+        if not len(coordinates):
+            self.logger.warning(f"No GPS fix in {path}")
+            return
         self.map_view.append_coordinates(coordinates)
         self.page.update()
 
@@ -16,4 +16,5 @@ class RunMode(Enum):
     
     NORMAL = "Normal Run"
     THREADS = "Threaded Run"
-    MULTIPROCESS = "Multiprocess Run"
\ No newline at end of file
+    MULTIPROCESS = "Multiprocess Run"
+    AUTO = "Auto Run"
\ No newline at end of file
@@ -1,5 +1,4 @@
 import logging
-from logging.handlers import RotatingFileHandler
 import os
 from pathlib import Path
 from utils.config import LoggerConfig
@@ -9,15 +8,6 @@ class AppLogger:
     _initialized_loggers = set()
 
     def __init__(self, name: str = None):
-        log_filename: str = LoggerConfig().file_name
-        logs_dir : Path = LoggerConfig().logs_folder
-        logs_dir.mkdir(parents=True, exist_ok=True)
-        log_file = logs_dir / log_filename
-        if not log_file.exists():
-            log_file.touch()
-
-
-
         if not name:
             name = __name__
 
@@ -26,6 +16,16 @@ class AppLogger:
         self.logger.propagate = False  # לא שולח הודעות למעלה
 
         if name not in AppLogger._initialized_loggers:
+            # Handlers are set up once per name, so readers created per block or chunk cost a lookup only.
+            from logging.handlers import RotatingFileHandler
+
+            log_filename: str = LoggerConfig().file_name
+            logs_dir : Path = LoggerConfig().logs_folder
+            logs_dir.mkdir(parents=True, exist_ok=True)
+            log_file = logs_dir / log_filename
+            if not log_file.exists():
+                log_file.touch()
+
             # למסוף
             console_handler = logging.StreamHandler()
             console_formatter = logging.Formatter(